@@ -1,16 +1,34 @@
 from flask import Flask
-from flask_mongoengine import MongoEngine
+from mongoengine import connect
 from app.config import Config
+from app.utils.rate_limit import limiter
+from app.utils.compression import init_compression
+from app.utils.json_provider import FastJSONProvider
+from app.utils.feature_cache import patient_feature_cache
+from app.utils.analytics import summaries
+from app.utils.executor import init_executors
+from app.utils.db_monitor import db_monitor
 
-db = MongoEngine()
-
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
+    app.json = FastJSONProvider(app)
 
-    db.init_app(app)
+    # Registers the command listener, so it must precede connect()
+    db_monitor.init_app(app)
+    connect(**app.config['MONGODB_SETTINGS'])
+    limiter.init_app(app)
+    init_compression(app)
+    patient_feature_cache.init_app(app)
+    summaries.init_app(app)
+    init_executors(app)
 
-    from app.routes import main
+    from app.routes import main, user, prediction, patient, analytics, job
     app.register_blueprint(main.bp)
+    app.register_blueprint(user.bp)
+    app.register_blueprint(prediction.bp)
+    app.register_blueprint(patient.bp)
+    app.register_blueprint(analytics.bp)
+    app.register_blueprint(job.bp)
 
-    return app
\ No newline at end of file
+    return app
@@ -8,4 +8,58 @@ class Config:
     # MongoDB settings
     MONGODB_SETTINGS = {
         'host': os.environ.get('MONGODB_URI') or 'mongodb://localhost:27017/hospital_db'
-    } 
\ No newline at end of file
+    }
+
+    # Mongo commands slower than this are logged to app.slow_queries with
+    # their filter shape (values redacted)
+    DB_SLOW_COMMAND_MS = float(os.environ.get('DB_SLOW_COMMAND_MS', '100'))
+
+    # Rate limiting: token-bucket budgets per route group, keyed by user.
+    # Shared through Redis when it answers, otherwise kept in-process.
+    REDIS_URL = os.environ.get('REDIS_URL')
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_BUDGETS = {
+        'default': '120 per minute',
+        'auth': '10 per minute',
+        'predict': '60 per minute',
+        'batch': '5 per minute'
+    }
+
+    # Bulk patient ingestion: rows per request and per unordered bulk write
+    BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS', '50000'))
+    BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', '1000'))
+
+    # Preprocessed patient rows for predict-by-patient; entries older than
+    # FEATURE_CACHE_MAX_AGE seconds are revalidated against updated_at
+    FEATURE_CACHE_MAX_ENTRIES = int(os.environ.get('FEATURE_CACHE_MAX_ENTRIES', '10000'))
+    FEATURE_CACHE_MAX_AGE = float(os.environ.get('FEATURE_CACHE_MAX_AGE', '30'))
+
+    # CPU-bound work (inference, password hashing) runs on bounded pools so
+    # it is capped by cores, not by server threads; tasks beyond workers +
+    # EXECUTOR_MAX_PENDING get a 503. ASYNC_MAX_CONNECTIONS caps concurrent
+    # requests per worker under serve_async.py.
+    INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', str(os.cpu_count() or 1)))
+    HASHING_WORKERS = int(os.environ.get('HASHING_WORKERS', '2'))
+    EXECUTOR_MAX_PENDING = int(os.environ.get('EXECUTOR_MAX_PENDING', '64'))
+    ASYNC_MAX_CONNECTIONS = int(os.environ.get('ASYNC_MAX_CONNECTIONS', '1000'))
+
+    # Bulk scoring jobs (python -m app.utils.jobs): worker processes per
+    # runner at lowered priority, so online traffic keeps a core, and a cap
+    # on each user's queued + running jobs. A runner silent for
+    # JOB_LEASE_SECONDS loses its job to another, which resumes it.
+    JOB_RESULTS_DIR = os.environ.get('JOB_RESULTS_DIR', 'job_results')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', str(max(1, (os.cpu_count() or 1) - 1))))
+    JOB_NICENESS = int(os.environ.get('JOB_NICENESS', '10'))
+    JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', '60'))
+    JOB_SHARD_SIZE = int(os.environ.get('JOB_SHARD_SIZE', '5000'))
+    JOB_MAX_ACTIVE_PER_USER = int(os.environ.get('JOB_MAX_ACTIVE_PER_USER', '2'))
+
+    # Predictions older than PREDICTION_ARCHIVE_AFTER_DAYS are moved into
+    # compressed patient/month buckets by python -m app.utils.archive
+    PREDICTION_ARCHIVE_AFTER_DAYS = int(os.environ.get('PREDICTION_ARCHIVE_AFTER_DAYS', '180'))
+    PREDICTION_ARCHIVE_BATCH_SIZE = int(os.environ.get('PREDICTION_ARCHIVE_BATCH_SIZE', '1000'))
+
+    # Response compression: gzip, or br when brotli is installed
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_LEVEL = 6
+    COMPRESS_BR_QUALITY = 4
@@ -0,0 +1,55 @@
+from app.models.summary import ReadmissionSummary
+from app.utils.analytics import PATIENT_DIMENSIONS, AGE_BAND_LABELS
+from http import HTTPStatus
+from typing import Dict, Any, Tuple, Optional
+from datetime import datetime
+
+class AnalyticsController:
+    @staticmethod
+    def get_readmission_rates(dimension: str) -> Tuple[Dict[str, Any], int]:
+        """
+        Readmission rate per value of a dimension, read from the summary counters
+        """
+        if dimension not in PATIENT_DIMENSIONS:
+            return {'error': f"by must be one of: {', '.join(PATIENT_DIMENSIONS)}"}, HTTPStatus.BAD_REQUEST
+        try:
+            summaries = ReadmissionSummary.objects(dimension=dimension, patients__gt=0)
+            rows = [summary.to_dict() for summary in summaries]
+            if dimension == 'age_band':
+                rows.sort(key=lambda row: AGE_BAND_LABELS.index(row['key']))
+            else:
+                rows.sort(key=lambda row: row['key'])
+
+            patients = sum(row['patients'] for row in rows)
+            readmitted = sum(row['readmitted'] for row in rows)
+            return {
+                'by': dimension,
+                'groups': rows,
+                'total': {
+                    'patients': patients,
+                    'readmitted': readmitted,
+                    'readmission_rate': readmitted / patients if patients else None
+                }
+            }, HTTPStatus.OK
+        except Exception as e:
+            return {'error': f'Failed to fetch readmission rates: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+    @staticmethod
+    def get_risk_level_counts(start: Optional[str] = None, end: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+        """
+        Predictions per risk level per day, optionally between two ISO dates (inclusive)
+        """
+        try:
+            query = {'dimension': 'risk_day'}
+            # Day keys are YYYY-MM-DD, so string order is date order
+            if start:
+                query['key__gte'] = datetime.fromisoformat(start).strftime('%Y-%m-%d')
+            if end:
+                query['key__lte'] = datetime.fromisoformat(end).strftime('%Y-%m-%d')
+        except ValueError:
+            return {'error': 'from and to must be ISO dates'}, HTTPStatus.BAD_REQUEST
+        try:
+            summaries = ReadmissionSummary.objects(**query).order_by('key')
+            return {'days': [summary.to_dict() for summary in summaries]}, HTTPStatus.OK
+        except Exception as e:
+            return {'error': f'Failed to fetch risk level counts: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
@@ -0,0 +1,106 @@
+import os
+from bson import ObjectId
+from app.models.scoring_job import ScoringJob
+from app.models.user import User
+from app.utils.jobs import normalize_filters, shard_path
+from http import HTTPStatus
+from typing import Dict, Any, Tuple, Optional, Iterator
+
+# Bytes per read when streaming results
+RESULTS_CHUNK_SIZE = 64 * 1024
+
+
+def _visible_job(job_id: str, user: User) -> Optional[ScoringJob]:
+    """The job if it exists and belongs to the user (admins see every job)"""
+    # A malformed id names no job; querying with it would raise a ValidationError
+    if not ObjectId.is_valid(job_id):
+        return None
+    job = ScoringJob.objects(id=job_id).first()
+    if job is None or (user.role != 'admin' and job.user.id != user.id):
+        return None
+    return job
+
+
+class JobController:
+    @staticmethod
+    def submit_scoring_job(data: Dict[str, Any], user: User, shard_size: int,
+                           max_active: int) -> Tuple[Dict[str, Any], int]:
+        """
+        Queue a bulk scoring job over the patients matching the filters
+        """
+        filters, error = normalize_filters(data or {})
+        if error:
+            return {'error': error}, HTTPStatus.BAD_REQUEST
+
+        try:
+            active = ScoringJob.objects(user=user.id, status__in=['queued', 'running']).count()
+            if active >= max_active:
+                return {'error': f"At most {max_active} queued or running jobs per user"}, HTTPStatus.TOO_MANY_REQUESTS
+
+            job = ScoringJob(user=user, filters=filters, shard_size=shard_size)
+            job.save()
+            return job.to_dict(), HTTPStatus.ACCEPTED
+        except Exception as e:
+            return {'error': f'Failed to submit job: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+    @staticmethod
+    def get_job(job_id: str, user: User) -> Tuple[Dict[str, Any], int]:
+        """
+        Status and progress of a job
+        """
+        try:
+            job = _visible_job(job_id, user)
+            if not job:
+                return {'error': 'Job not found'}, HTTPStatus.NOT_FOUND
+            return job.to_dict(), HTTPStatus.OK
+        except Exception as e:
+            return {'error': f'Failed to fetch job: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+    @staticmethod
+    def cancel_job(job_id: str, user: User) -> Tuple[Dict[str, Any], int]:
+        """
+        Cancel a queued or running job; its runner stops at the next heartbeat
+        """
+        try:
+            job = _visible_job(job_id, user)
+            if not job:
+                return {'error': 'Job not found'}, HTTPStatus.NOT_FOUND
+            cancelled = ScoringJob.objects(id=job.id, status__in=['queued', 'running']).update_one(
+                set__status='cancelled'
+            )
+            if not cancelled:
+                return {'error': f"Job is already {job.status}"}, HTTPStatus.CONFLICT
+            job.reload()
+            return job.to_dict(), HTTPStatus.OK
+        except Exception as e:
+            return {'error': f'Failed to cancel job: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+    @staticmethod
+    def get_results(job_id: str, user: User, results_dir: str) -> Tuple[Any, int]:
+        """
+        Result files of a completed job, in shard order, or an error response
+        """
+        try:
+            job = _visible_job(job_id, user)
+            if not job:
+                return {'error': 'Job not found'}, HTTPStatus.NOT_FOUND
+            if job.status != 'completed':
+                return {'error': f"Job is {job.status}; results are available once it completes"}, HTTPStatus.CONFLICT
+            paths = [shard_path(results_dir, str(job.id), shard.index) for shard in job.shards]
+            missing = [path for path in paths if not os.path.exists(path)]
+            if missing:
+                return {'error': 'Job results are no longer available'}, HTTPStatus.GONE
+            return paths, HTTPStatus.OK
+        except Exception as e:
+            return {'error': f'Failed to fetch job results: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def stream_files(paths) -> Iterator[bytes]:
+    """Concatenate files in fixed-size chunks without loading them"""
+    for path in paths:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(RESULTS_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
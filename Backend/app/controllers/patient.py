@@ -0,0 +1,244 @@
+from app.config import Config
+from app.models.patient import Patient
+from app.models.user import User
+from app.models.scoring_run import ScoringRun
+from app.utils.model import get_model_manager
+from app.utils.json_provider import loads_bytes
+from app.utils.feature_cache import patient_feature_cache
+from app.utils.analytics import load_summary_state, patient_deltas, apply_deltas
+from app.utils.dates import parse_dates, days_between, readmitted_within, readmission_window_end
+from collections import Counter
+from http import HTTPStatus
+from typing import Dict, Any, Tuple, List, Optional
+from datetime import datetime
+import time
+import logging
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# Per-row errors echoed back; the counts always cover every row
+MAX_REPORTED_ERRORS = 1000
+
+# Dashboard rows: enough to identify and triage a patient
+AT_RISK_FIELDS = [
+    'medical_record_number', 'age', 'gender', 'primary_diagnosis', 'discharge_to',
+    'days_in_hospital', 'risk_level', 'risk_probability', 'risk_model_version', 'risk_scored_at'
+]
+MAX_AT_RISK_LIMIT = 500
+
+PATIENT_FIELDS = [
+    'age', 'gender', 'primary_diagnosis', 'num_procedures',
+    'days_in_hospital', 'comorbidity_score', 'discharge_to'
+]
+
+
+def _patient_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Model fields of a validated row, typed as the Patient document stores them"""
+    fields = {
+        'age': int(record['age']),
+        'gender': record['gender'],
+        'primary_diagnosis': record['primary_diagnosis'],
+        'num_procedures': int(record['num_procedures']),
+        'days_in_hospital': int(record['days_in_hospital']),
+        'comorbidity_score': float(record['comorbidity_score']),
+        'discharge_to': record['discharge_to']
+    }
+    if isinstance(record.get('readmitted'), bool):
+        fields['readmitted'] = record['readmitted']
+    return fields
+
+
+def derive_from_dates(frame: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[int, Dict[str, str]]]:
+    """
+    Fill days_in_hospital from admission_date/discharge_date and readmitted
+    from readmission_date (within 30 days of discharge) on rows that do not
+    give them, parsing each date column with one detected format. A blank
+    readmission_date says nothing, so readmitted stays unset there.
+    """
+    errors: Dict[int, Dict[str, str]] = {}
+    if 'discharge_date' not in frame.columns:
+        return frame, errors
+
+    def parse(field):
+        parsed = parse_dates(frame[field])
+        for row, message in parsed.errors(field).items():
+            errors.setdefault(row, {})[field] = message
+        return parsed.values
+
+    frame = frame.copy()
+    discharge = parse('discharge_date')
+    if 'admission_date' in frame.columns:
+        days = days_between(parse('admission_date'), discharge)
+        for row in np.flatnonzero(days < 0):
+            errors.setdefault(int(row), {})['discharge_date'] = 'discharge_date cannot be before admission_date'
+        if 'days_in_hospital' not in frame.columns:
+            frame['days_in_hospital'] = None
+        fill = (frame['days_in_hospital'].isna() & (days >= 0)).to_numpy()
+        frame['days_in_hospital'] = frame['days_in_hospital'].astype(object)
+        frame.loc[fill, 'days_in_hospital'] = days[fill].astype(int)
+
+    if 'readmission_date' in frame.columns:
+        readmission = parse('readmission_date')
+        within = readmitted_within(discharge, readmission)
+        if 'readmitted' not in frame.columns:
+            frame['readmitted'] = None
+        # Only rows with both dates, and False only once the window has closed;
+        # the rest are left unset so the stored label survives
+        closed = readmission_window_end(discharge) < np.datetime64(datetime.utcnow())
+        known = ~np.isnat(discharge) & ~np.isnat(readmission) & (within | closed)
+        fill = frame['readmitted'].isna().to_numpy() & known
+        frame['readmitted'] = frame['readmitted'].astype(object)
+        frame.loc[fill, 'readmitted'] = [bool(value) for value in within[fill]]
+    return frame, errors
+
+
+def parse_bulk_payload(body: bytes) -> List[Dict[str, Any]]:
+    """Parse a JSON array or newline-delimited JSON objects"""
+    text = body.strip()
+    if not text:
+        return []
+    if text.startswith(b'['):
+        rows = loads_bytes(text)
+    else:
+        rows = [loads_bytes(line) for line in text.splitlines() if line.strip()]
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError('Every row must be a JSON object')
+    return rows
+
+
+class PatientController:
+    @staticmethod
+    def bulk_upsert(rows: List[Dict[str, Any]], user: User,
+                    batch_size: Optional[int] = None) -> Tuple[Dict[str, Any], int]:
+        """
+        Validate rows together and upsert the valid ones by medical record
+        number with unordered bulk writes; invalid rows are reported, not fatal
+        """
+        started = time.perf_counter()
+        batch_size = batch_size or Config.BULK_BATCH_SIZE
+        if not rows:
+            return {'error': 'No patient rows provided'}, HTTPStatus.BAD_REQUEST
+
+        frame, date_errors = derive_from_dates(pd.DataFrame.from_records(rows))
+        frame, errors = get_model_manager().preprocessor.validator.validate_frame(
+            frame, required=['medical_record_number'] + PATIENT_FIELDS
+        )
+        for row, row_errors in date_errors.items():
+            errors.setdefault(row, {}).update(row_errors)
+        if 'readmitted' in frame.columns:
+            labels = frame['readmitted']
+            bad_label = (labels.notna() & ~labels.map(type).isin([bool, np.bool_])).to_numpy()
+            for row in np.flatnonzero(bad_label):
+                errors.setdefault(int(row), {})['readmitted'] = 'readmitted must be true or false'
+
+        valid = np.ones(len(frame), dtype=bool)
+        valid[list(errors)] = False
+        # The last valid row wins for a repeated record number, as in sequential
+        # upserts; rows without one already failed validation
+        mrn = frame['medical_record_number'].astype(str)
+        candidates = valid & frame['medical_record_number'].notna().to_numpy()
+        superseded = np.zeros(len(frame), dtype=bool)
+        superseded[candidates] = mrn[candidates].duplicated(keep='last').to_numpy()
+        valid &= ~superseded
+
+        columns = PATIENT_FIELDS + (['readmitted'] if 'readmitted' in frame.columns else [])
+        records = frame.loc[valid, columns].to_dict('records')
+        positions = np.flatnonzero(valid)
+
+        now = datetime.utcnow()
+        collection = Patient._get_collection()
+        inserted = updated = 0
+        summary_deltas = Counter()
+        for start in range(0, len(records), batch_size):
+            batch_positions = positions[start:start + batch_size]
+            batch_records = records[start:start + batch_size]
+            before = load_summary_state(mrn.iat[position] for position in batch_positions)
+
+            operations = []
+            for position, record in zip(batch_positions, batch_records):
+                fields_to_set = _patient_fields(record)
+                fields_to_set['updated_at'] = now
+                on_insert = {'user': user.id, 'created_at': now}
+                if 'readmitted' not in fields_to_set:
+                    on_insert['readmitted'] = False
+                operations.append(UpdateOne(
+                    {'medical_record_number': mrn.iat[position]},
+                    {'$set': fields_to_set, '$setOnInsert': on_insert},
+                    upsert=True
+                ))
+            failed_indexes = set()
+            try:
+                result = collection.bulk_write(operations, ordered=False)
+                details = result.bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+                for error in details.get('writeErrors', []):
+                    failed_indexes.add(error['index'])
+                    errors[int(batch_positions[error['index']])] = {'_write': error.get('errmsg', 'Write failed')}
+            inserted += details.get('nUpserted', 0)
+            updated += details.get('nMatched', 0)
+
+            for index, (position, record) in enumerate(zip(batch_positions, batch_records)):
+                patient_feature_cache.invalidate(medical_record_number=mrn.iat[position])
+                if index in failed_indexes:
+                    continue
+                previous = before.get(mrn.iat[position])
+                after = {**(previous or {'readmitted': False}), **_patient_fields(record)}
+                summary_deltas.update(patient_deltas(previous, after))
+
+        # Summaries are rebuildable, so a failure here must not fail the import
+        try:
+            apply_deltas(summary_deltas)
+        except Exception as e:
+            logger.warning(f"Failed to update readmission summaries: {str(e)}")
+
+        elapsed = time.perf_counter() - started
+        failed_rows = sorted(errors)
+        response = {
+            'received': len(rows),
+            'inserted': inserted,
+            'updated': updated,
+            'superseded': int(superseded.sum()),
+            'failed': len(failed_rows),
+            'errors': [{'row': row, 'errors': errors[row]} for row in failed_rows[:MAX_REPORTED_ERRORS]],
+            'errors_truncated': len(failed_rows) > MAX_REPORTED_ERRORS,
+            'elapsed_ms': round(elapsed * 1000, 2),
+            'rows_per_second': round(len(rows) / elapsed, 1) if elapsed else None
+        }
+        return response, HTTPStatus.OK
+
+    @staticmethod
+    def get_patients_at_risk(level: str = 'High', limit: int = 100,
+                             min_probability: Optional[float] = None) -> Tuple[Dict[str, Any], int]:
+        """
+        Patients at a materialized risk level, highest probability first,
+        served from the (risk_level, -risk_probability) index
+        """
+        if level not in ('Low', 'Medium', 'High'):
+            return {'error': 'level must be one of: Low, Medium, High'}, HTTPStatus.BAD_REQUEST
+        try:
+            query = {'risk_level': level}
+            if min_probability is not None:
+                query['risk_probability__gte'] = min_probability
+            documents = (Patient.objects(**query)
+                         .only(*AT_RISK_FIELDS)
+                         .order_by('-risk_probability')
+                         .limit(max(1, min(limit, MAX_AT_RISK_LIMIT)))
+                         .as_pymongo())
+            patients = []
+            for document in documents:
+                document['id'] = str(document.pop('_id'))
+                patients.append(document)
+
+            last_run = ScoringRun.objects(status='completed').only('started_at', 'model_version').first()
+            return {
+                'patients': patients,
+                'scored_through': last_run.started_at if last_run else None,
+                'model_version': last_run.model_version if last_run else None
+            }, HTTPStatus.OK
+        except Exception as e:
+            return {'error': f'Failed to fetch patients at risk: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
@@ -1,74 +1,226 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional, List
 from http import HTTPStatus
-import numpy as np
-from app.models.prediction import Prediction  # You'll need to create this model
-from app.utils.model_loader import load_model  # You'll need to create this utility
+from bson import ObjectId
+from app.models.patient import Patient
+from app.models.prediction import Prediction, PREDICTION_FIELD_SOURCES
+from app.models.user import User
+from app.utils.config import Config
+from app.utils.http_cache import make_etag
+from app.utils.fields import projection, etag_parts
+from app.utils.model import get_model_manager
+from app.utils.feature_cache import patient_feature_cache, CachedPatientFeatures
+from app.utils.executor import ExecutorBusy, inference_executor
+from app.utils.archive import archived_history, find_archived
+
+PATIENT_PROJECTION = ['medical_record_number', 'updated_at'] + Config.REQUIRED_FEATURES
+
+
+def _patient_query(identifier: str) -> Dict[str, Any]:
+    """Match a patient by id or medical record number"""
+    if ObjectId.is_valid(identifier):
+        return {'$or': [{'_id': ObjectId(identifier)}, {'medical_record_number': identifier}]}
+    return {'medical_record_number': identifier}
 
 class PredictionController:
     @staticmethod
-    def process_prediction(data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    def process_prediction(data: Dict[str, Any], user: User) -> Tuple[Dict[str, Any], int]:
         """
         Process a medical prediction request
         """
         try:
             # Validate input data
-            required_fields = ['patient_data']  # Add specific required fields based on your model
-            if not all(field in data for field in required_fields):
-                return {
-                    'error': f'Missing required fields: {", ".join(required_fields)}'
-                }, HTTPStatus.BAD_REQUEST
-
-            # Load the ML model (you'll need to implement this)
-            model = load_model()
-
-            # Preprocess the data (implement preprocessing based on your needs)
-            processed_data = np.array(data['patient_data'])
-
-            # Make prediction
-            prediction_result = model.predict(processed_data)
-
-            # Create prediction record
-            prediction = Prediction(
-                patient_data=data['patient_data'],
-                prediction_result=prediction_result.tolist(),
-                confidence_score=float(np.max(prediction_result)),  # Adjust based on your model output
-                timestamp=datetime.utcnow()
-            )
-            prediction.save()
+            if not data or 'patient_id' not in data:
+                return {'error': 'Missing required fields: patient_id'}, HTTPStatus.BAD_REQUEST
 
-            return {
-                'prediction': prediction_result.tolist(),
-                'confidence': float(np.max(prediction_result)),
-                'prediction_id': str(prediction.id)
-            }, HTTPStatus.OK
+            patient = Patient.objects(id=data['patient_id']).first()
+            if not patient:
+                return {'error': 'Patient not found'}, HTTPStatus.NOT_FOUND
+
+            # Run the model on the submitted features
+            features = {k: data[k] for k in Config.REQUIRED_FEATURES if k in data}
+            result, status_code = get_model_manager().predict(features)
+            if status_code != HTTPStatus.OK:
+                return {'error': result['error']}, status_code
 
+            prediction = PredictionController._save_prediction(patient, user, features, result)
+            return prediction.to_dict(), HTTPStatus.CREATED
+
+        except ExecutorBusy:
+            return {'error': 'Prediction capacity exhausted, please retry'}, HTTPStatus.SERVICE_UNAVAILABLE
         except ValueError as e:
             return {'error': f'Invalid input data: {str(e)}'}, HTTPStatus.BAD_REQUEST
         except Exception as e:
             return {'error': f'Prediction failed: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
 
     @staticmethod
-    def get_prediction_history(user_id: str) -> Tuple[Dict[str, Any], int]:
+    def predict_for_patient(identifier: str, user: User) -> Tuple[Dict[str, Any], int]:
+        """
+        Predict from a stored patient's features. Preprocessed rows are cached
+        per patient and updated_at, so re-scoring skips preprocessing and,
+        within the cache's max age, the database read.
+        """
+        try:
+            manager = get_model_manager()
+            entry = patient_feature_cache.get(identifier, manager.model_version)
+            if entry is not None and patient_feature_cache.is_fresh(entry):
+                patient_feature_cache.record('hits')
+            else:
+                entry = PredictionController._load_patient_features(identifier, entry, manager)
+                if isinstance(entry, tuple):
+                    return entry
+
+            result, status_code = manager.predict_preprocessed(entry.features, entry.row)
+            if status_code != HTTPStatus.OK:
+                return {'error': result['error']}, status_code
+
+            # A reference by id is all Prediction needs; nothing is dereferenced
+            patient = Patient(id=ObjectId(entry.patient_id))
+            prediction = PredictionController._save_prediction(patient, user, entry.features, result)
+            return prediction.to_dict(), HTTPStatus.CREATED
+
+        except ExecutorBusy:
+            return {'error': 'Prediction capacity exhausted, please retry'}, HTTPStatus.SERVICE_UNAVAILABLE
+        except Exception as e:
+            return {'error': f'Prediction failed: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+    @staticmethod
+    def _load_patient_features(identifier: str, entry: Optional[CachedPatientFeatures], manager):
+        """
+        Revalidate a stale entry by updated_at, or read the model fields and
+        preprocess them; returns the entry or an error response tuple
+        """
+        query = _patient_query(entry.patient_id if entry else identifier)
+        if entry is not None:
+            current = Patient.objects(__raw__=query).only('updated_at').as_pymongo().first()
+            if current and current.get('updated_at') == entry.updated_at:
+                patient_feature_cache.touch(entry)
+                patient_feature_cache.record('revalidations')
+                return entry
+
+        patient_feature_cache.record('misses')
+        document = Patient.objects(__raw__=query).only(*PATIENT_PROJECTION).as_pymongo().first()
+        if not document:
+            patient_feature_cache.invalidate(entry.patient_id if entry else None)
+            return {'error': 'Patient not found'}, HTTPStatus.NOT_FOUND
+
+        features = {k: document.get(k) for k in Config.REQUIRED_FEATURES}
+        is_valid, error_message = manager.preprocessor.validate_features(features)
+        if not is_valid:
+            return {'error': f'Stored patient features are invalid: {error_message}'}, HTTPStatus.UNPROCESSABLE_ENTITY
+
+        entry = CachedPatientFeatures(
+            patient_id=str(document['_id']),
+            medical_record_number=document['medical_record_number'],
+            updated_at=document.get('updated_at'),
+            model_version=manager.model_version,
+            features=features,
+            row=manager.preprocessor.preprocess_features(features)
+        )
+        patient_feature_cache.put(entry)
+        return entry
+
+    @staticmethod
+    def _save_prediction(patient: Patient, user: User, features: Dict[str, Any],
+                         result: Dict[str, Any]) -> Prediction:
+        """Store a completed model result"""
+        prediction = Prediction.create(
+            patient=patient,
+            user=user,
+            input_features=features,
+            readmission_probability=result['readmission_probability'],
+            risk_level=result['risk_level'],
+            confidence_score=result['confidence_score'],
+            contributing_factors=result['contributing_factors'],
+            recommendations=result['recommendations'],
+            model_version=result['model_version'],
+            status=result['status']
+        )
+        prediction.save()
+        return prediction
+
+    @staticmethod
+    def get_serving_stats() -> Tuple[Dict[str, Any], int]:
+        """
+        Counters of this worker's prediction path: coalesced duplicate
+        requests and patient feature cache outcomes
+        """
+        try:
+            manager = get_model_manager()
+            return {
+                'model_version': manager.model_version,
+                'single_flight': manager.in_flight.stats(),
+                'inference_executor': inference_executor.stats(),
+                'feature_cache': patient_feature_cache.stats()
+            }, HTTPStatus.OK
+        except Exception as e:
+            return {'error': f'Failed to fetch serving stats: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+    @staticmethod
+    def get_prediction_history(user_id: str, fields: Optional[List[str]] = None) -> Tuple[Dict[str, Any], int]:
         """
-        Get prediction history for a user
+        Get prediction history for a user, reading only the requested fields
         """
         try:
-            predictions = Prediction.objects(user_id=user_id).order_by('-timestamp')
+            documents = list(Prediction._get_collection()
+                             .find({'user': ObjectId(user_id)}, projection(fields, PREDICTION_FIELD_SOURCES, 'created_at'))
+                             .sort('created_at', -1))
+            # Older predictions live in the archive; a pass interrupted between
+            # its write and delete can leave one in both tiers
+            seen = {document['_id'] for document in documents}
+            documents.extend(document for document in archived_history(user_id) if document['_id'] not in seen)
+            documents.sort(key=lambda document: document['created_at'], reverse=True)
             return {
-                'predictions': [pred.to_dict() for pred in predictions]
+                'predictions': [Prediction.raw_to_dict(document, fields) for document in documents]
             }, HTTPStatus.OK
         except Exception as e:
             return {'error': f'Failed to fetch prediction history: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
 
     @staticmethod
-    def get_prediction_by_id(prediction_id: str) -> Tuple[Dict[str, Any], int]:
+    def get_prediction_by_id(prediction_id: str, fields: Optional[List[str]] = None) -> Tuple[Dict[str, Any], int]:
         """
-        Get a specific prediction by ID
+        Get a specific prediction by ID, reading only the requested fields
         """
         try:
-            prediction = Prediction.objects(id=prediction_id).first()
-            if not prediction:
+            document = Prediction._get_collection().find_one(
+                {'_id': ObjectId(prediction_id)}, projection(fields, PREDICTION_FIELD_SOURCES)
+            ) or find_archived(prediction_id)
+            if not document:
                 return {'error': 'Prediction not found'}, HTTPStatus.NOT_FOUND
-            return prediction.to_dict(), HTTPStatus.OK
+            return Prediction.raw_to_dict(document, fields), HTTPStatus.OK
         except Exception as e:
-            return {'error': f'Failed to fetch prediction: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR 
\ No newline at end of file
+            return {'error': f'Failed to fetch prediction: {str(e)}'}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+    @staticmethod
+    def get_prediction_history_etag(user_id: str, fields: Optional[List[str]] = None) -> Optional[str]:
+        """
+        ETag for a user's history from its size and latest update,
+        answered from the (user, updated_at) index without loading documents
+        """
+        try:
+            collection = Prediction._get_collection()
+            query = {'user': ObjectId(user_id)}
+            count = collection.count_documents(query)
+            latest = collection.find_one(query, {'_id': 0, 'updated_at': 1}, sort=[('updated_at', -1)])
+            return make_etag('history', user_id, count, latest['updated_at'] if latest else None, *etag_parts(fields))
+        except Exception:
+            return None
+
+    @staticmethod
+    def get_prediction_validator(prediction_id: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, str]]:
+        """
+        Owner and ETag of a prediction, read with a two-field projection
+        so authorization and revalidation never load the full document
+        """
+        try:
+            document = Prediction._get_collection().find_one(
+                {'_id': ObjectId(prediction_id)},
+                {'user': 1, 'updated_at': 1}
+            ) or find_archived(prediction_id)
+        except Exception:
+            return None
+        if not document:
+            return None
+        return {
+            'user_id': str(document['user']),
+            'etag': make_etag('prediction', prediction_id, document.get('updated_at'), *etag_parts(fields))
+        }
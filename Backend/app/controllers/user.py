@@ -1,9 +1,13 @@
-from app.models.user import User
+from bson import ObjectId
+from app.models.user import User, USER_FIELD_SOURCES
 from http import HTTPStatus
-from typing import Dict, Any, Tuple, Union, List
+from typing import Dict, Any, Tuple, Union, List, Optional
 from datetime import datetime, timedelta
 import jwt
 from flask import current_app
+from app.utils.http_cache import make_etag
+from app.utils.fields import projection, etag_parts
+from app.utils.executor import ExecutorBusy, hashing_executor
 
 class UserController:
     @staticmethod
@@ -28,7 +32,8 @@ class UserController:
                 full_name=data.get('full_name', ''),
                 role=data.get('role', 'user')
             )
-            user.set_password(data['password'])
+            # pbkdf2 is deliberately slow; keep it off the request threads
+            hashing_executor.run(user.set_password, data['password'])
             user.save()
             
             # Generate token
@@ -37,6 +42,8 @@ class UserController:
             response = user.to_dict()
             response['token'] = token
             return response, HTTPStatus.CREATED
+        except ExecutorBusy:
+            return {'error': 'Server busy, please retry'}, HTTPStatus.SERVICE_UNAVAILABLE
         except Exception as e:
             return {'error': str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -53,7 +60,7 @@ class UserController:
             user = User.objects(username=data['username']).first() or \
                   User.objects(email=data['username']).first()
 
-            if not user or not user.check_password(data['password']):
+            if not user or not hashing_executor.run(user.check_password, data['password']):
                 return {'error': 'Invalid credentials'}, HTTPStatus.UNAUTHORIZED
 
             if not user.is_active:
@@ -66,6 +73,8 @@ class UserController:
             response['token'] = token
             return response, HTTPStatus.OK
 
+        except ExecutorBusy:
+            return {'error': 'Server busy, please retry'}, HTTPStatus.SERVICE_UNAVAILABLE
         except Exception as e:
             return {'error': str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -105,26 +114,40 @@ class UserController:
             return {'error': 'Invalid token'}, HTTPStatus.UNAUTHORIZED
 
     @staticmethod
-    def get_all_users() -> Tuple[Union[List[Dict[str, Any]], Dict[str, str]], int]:
+    def get_all_users(fields: Optional[List[str]] = None) -> Tuple[Union[List[Dict[str, Any]], Dict[str, str]], int]:
         """
-        Get all users
+        Get all users, reading only the requested fields
         """
         try:
-            users = User.objects.all()
-            return [user.to_dict() for user in users], HTTPStatus.OK
+            users = User._get_collection().find({}, projection(fields, USER_FIELD_SOURCES))
+            return [User.raw_to_dict(user, fields) for user in users], HTTPStatus.OK
         except Exception as e:
             return {'error': str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
 
     @staticmethod
-    def get_user_by_id(user_id: str) -> Tuple[Dict[str, Any], int]:
+    def get_all_users_etag(fields: Optional[List[str]] = None) -> Optional[str]:
         """
-        Get a user by ID
+        ETag for the user listing from its size and latest update,
+        without loading user documents
         """
         try:
-            user = User.objects(id=user_id).first()
+            collection = User._get_collection()
+            count = collection.count_documents({})
+            latest = collection.find_one({}, {'_id': 0, 'updated_at': 1}, sort=[('updated_at', -1)])
+            return make_etag('users', count, latest['updated_at'] if latest else None, *etag_parts(fields))
+        except Exception:
+            return None
+
+    @staticmethod
+    def get_user_by_id(user_id: str, fields: Optional[List[str]] = None) -> Tuple[Dict[str, Any], int]:
+        """
+        Get a user by ID, reading only the requested fields
+        """
+        try:
+            user = User._get_collection().find_one({'_id': ObjectId(user_id)}, projection(fields, USER_FIELD_SOURCES))
             if not user:
                 return {'error': 'User not found'}, HTTPStatus.NOT_FOUND
-            return user.to_dict(), HTTPStatus.OK
+            return User.raw_to_dict(user, fields), HTTPStatus.OK
         except Exception as e:
             return {'error': str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -150,7 +173,7 @@ class UserController:
 
             # Update password if provided
             if data.get('password'):
-                user.set_password(data['password'])
+                hashing_executor.run(user.set_password, data['password'])
 
             # Update other fields
             for field in ['username', 'email', 'full_name', 'role', 'is_active']:
@@ -159,6 +182,8 @@ class UserController:
 
             user.save()
             return user.to_dict(), HTTPStatus.OK
+        except ExecutorBusy:
+            return {'error': 'Server busy, please retry'}, HTTPStatus.SERVICE_UNAVAILABLE
         except Exception as e:
             return {'error': str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -0,0 +1,155 @@
+import os
+import io
+import json
+import time
+import argparse
+import logging
+from typing import Dict, Any, List, Optional
+import numpy as np
+import joblib
+from sklearn.metrics import roc_auc_score
+from app.utils.compact_forest import CompactForest
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMPACT_MODEL_FILE = 'readmission_model_compact.pkl'
+REPORT_FILE = 'compression_report.json'
+
+
+def artifact_size(model) -> int:
+    """Size of the model as an uncompressed joblib pickle"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+
+def profile(model, X: np.ndarray, y: np.ndarray, rounds: int = 200, min_batch: int = 10000) -> Dict[str, Any]:
+    """Size, single-row latency, batch throughput and AUC of a model"""
+    row = X[:1]
+    model.predict_proba(row)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+
+    batch = np.tile(X, (max(1, -(-min_batch // len(X))), 1))
+    start = time.perf_counter()
+    model.predict_proba(batch)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'size_bytes': artifact_size(model),
+        'latency_ms_p50': float(np.median(timings) * 1000),
+        'throughput_rows_per_sec': float(len(batch) / batch_seconds),
+        'auc': float(roc_auc_score(y, model.predict_proba(X)[:, 1]))
+    }
+
+
+def search(forest, X: np.ndarray, y: np.ndarray, tolerance: float,
+           depths: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    Find the cheapest (tree count, depth) whose holdout AUC stays within
+    tolerance of the full forest. Cost is trees x depth, the number of
+    node visits per row; ties go to the higher AUC.
+    """
+    baseline_auc = roc_auc_score(y, forest.predict_proba(X)[:, 1])
+    full_depth = max(tree.tree_.max_depth for tree in forest.estimators_)
+    depths = depths or list(range(1, full_depth + 1))
+
+    best = None
+    candidates = []
+    for depth in depths:
+        per_tree = CompactForest.from_forest(forest, max_depth=depth, leaf_dtype=np.float32).tree_proba(X)
+        # Prefix means score every tree count from one pass over the trees
+        prefix = np.cumsum(per_tree, axis=0, dtype=np.float64) / np.arange(1, len(per_tree) + 1)[:, np.newaxis]
+        for n_trees in range(1, len(prefix) + 1):
+            auc = roc_auc_score(y, prefix[n_trees - 1])
+            if auc < baseline_auc - tolerance:
+                continue
+            candidate = {'n_trees': n_trees, 'max_depth': depth, 'auc': float(auc), 'cost': n_trees * depth}
+            candidates.append(candidate)
+            if best is None or (candidate['cost'], -candidate['auc']) < (best['cost'], -best['auc']):
+                best = candidate
+            # Larger prefixes at this depth only cost more
+            break
+
+    return {
+        'baseline_auc': float(baseline_auc),
+        'tolerance': tolerance,
+        'selected': best or {'n_trees': len(forest.estimators_), 'max_depth': full_depth,
+                             'auc': float(baseline_auc), 'cost': len(forest.estimators_) * full_depth},
+        'candidates': candidates
+    }
+
+
+def compress(forest, X: np.ndarray, y: np.ndarray, tolerance: float = 0.005,
+             leaf_dtype=np.float16) -> tuple:
+    """Prune and quantize a forest, returning (compact model, report)"""
+    if not hasattr(forest, 'estimators_') or not hasattr(forest.estimators_[0], 'tree_'):
+        raise ValueError(f"Compression supports random forests, not {type(forest).__name__}")
+
+    result = search(forest, X, y, tolerance)
+    selected = result['selected']
+    compact = CompactForest.from_forest(
+        forest, n_trees=selected['n_trees'], max_depth=selected['max_depth'], leaf_dtype=leaf_dtype
+    )
+
+    before = profile(forest, X, y)
+    after = profile(compact, X, y)
+    report = {
+        'search': result,
+        'leaf_dtype': np.dtype(leaf_dtype).name,
+        'threshold_dtype': 'float32',
+        'n_nodes': {'before': int(sum(tree.tree_.node_count for tree in forest.estimators_)),
+                    'after': compact.n_nodes},
+        'before': before,
+        'after': after,
+        'auc_delta': after['auc'] - before['auc']
+    }
+    return compact, report
+
+
+def main():
+    """Compress the trained forest and report the trade-off"""
+    from app.ml_models.train_model import ModelTrainer
+    from app.ml_models.matrix_cache import MatrixCache
+
+    parser = argparse.ArgumentParser(description='Prune and quantize the serving random forest')
+    parser.add_argument('--data', default='data/hospital_readmissions.csv',
+                        help='Training data; its holdout split is used for validation')
+    parser.add_argument('--model-dir', default=os.path.join('app', 'ml_models'))
+    parser.add_argument('--tolerance', type=float, default=0.005, help='Allowed holdout AUC drop')
+    parser.add_argument('--leaf-dtype', choices=['float16', 'float32'], default='float16')
+    args = parser.parse_args()
+
+    try:
+        forest = joblib.load(os.path.join(args.model_dir, 'readmission_model.pkl'))
+        trainer = ModelTrainer(args.data, cache=MatrixCache())
+        _, X_test, _, y_test = trainer.load_scaled_data()
+        y_test = np.asarray(y_test)
+        if not np.issubdtype(y_test.dtype, np.number):
+            y_test = (y_test == forest.classes_[1]).astype(int)
+
+        compact, report = compress(forest, np.asarray(X_test), y_test, args.tolerance, np.dtype(args.leaf_dtype))
+
+        joblib.dump(compact, os.path.join(args.model_dir, COMPACT_MODEL_FILE))
+        with open(os.path.join(args.model_dir, REPORT_FILE), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+        selected = report['search']['selected']
+        logger.info(f"Selected {selected['n_trees']} trees at depth {selected['max_depth']}")
+        for label, stats in (('before', report['before']), ('after', report['after'])):
+            logger.info(f"  {label:<6} {stats['size_bytes'] / 1024:>10.1f} KiB  "
+                        f"{stats['latency_ms_p50']:>8.3f} ms/row  "
+                        f"{stats['throughput_rows_per_sec']:>12.0f} rows/s  AUC {stats['auc']:.4f}")
+        logger.info(f"Serve it with MODEL_PATH={os.path.join(args.model_dir, COMPACT_MODEL_FILE)}")
+    except Exception as e:
+        logger.error(f"Error compressing model: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
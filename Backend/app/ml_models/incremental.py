@@ -0,0 +1,245 @@
+import os
+import copy
+import shutil
+import tempfile
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+import joblib
+from mongoengine import connect
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import roc_auc_score
+from app.ml_models.ingest import EncodedDataset, CATEGORICAL_FEATURES, NUMERICAL_FEATURES
+from app.ml_models.mongo_source import export_patients
+from app.ml_models.train_model import ModelTrainer, load_metadata
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _affine(old_scaler, new_scaler) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-feature (a, c) such that old_scaled = new_scaled * a + c
+    for any raw input
+    """
+    old_mean = old_scaler.mean_ if old_scaler.mean_ is not None else 0.0
+    new_mean = new_scaler.mean_ if new_scaler.mean_ is not None else 0.0
+    a = new_scaler.scale_ / old_scaler.scale_
+    c = (new_mean - old_mean) / old_scaler.scale_
+    return a, c
+
+
+def _rebase_tree(tree, a: np.ndarray, c: np.ndarray) -> None:
+    """Move split thresholds into the new scaled space (a > 0 keeps split directions)"""
+    nodes = tree.tree_
+    split = nodes.feature >= 0
+    features = nodes.feature[split]
+    nodes.threshold[split] = (nodes.threshold[split] - c[features]) / a[features]
+
+
+def rebase_model(model, old_scaler, new_scaler) -> None:
+    """
+    Rewrite a fitted model in place so it gives the same outputs on inputs
+    scaled with new_scaler as it did on inputs scaled with old_scaler
+    """
+    a, c = _affine(old_scaler, new_scaler)
+    if hasattr(model, 'estimators_'):
+        # RandomForest holds a list of trees, GradientBoosting an array of them
+        for tree in np.ravel(model.estimators_):
+            _rebase_tree(tree, a, c)
+    elif hasattr(model, 'tree_'):
+        _rebase_tree(model, a, c)
+    elif hasattr(model, 'coefs_'):
+        # MLP: only the first layer sees the inputs
+        model.intercepts_[0] = model.intercepts_[0] + c @ model.coefs_[0]
+        model.coefs_[0] = model.coefs_[0] * a[:, np.newaxis]
+    elif hasattr(model, 'coef_'):
+        model.intercept_ = model.intercept_ + model.coef_ @ c
+        model.coef_ = model.coef_ * a
+    else:
+        raise ValueError(f"Cannot rebase {type(model).__name__} onto new scaler statistics")
+
+
+def next_version(version: str) -> str:
+    """Bump the patch component of a dotted version, keeping the full train's +build suffix"""
+    version, plus, build = version.partition('+')
+    parts = version.split('.')
+    if parts[-1].isdigit():
+        parts[-1] = str(int(parts[-1]) + 1)
+        return '.'.join(parts) + plus + build
+    return f"{version}.1{plus}{build}"
+
+
+class IncrementalUpdater:
+    """
+    Update the current model with patients labelled since it was trained,
+    at a cost proportional to the new data rather than the full history
+    """
+
+    def __init__(self, model_dir: str = os.path.join('app', 'ml_models'), new_trees: int = 10,
+                 tolerance: float = 0.01, holdout: float = 0.2, min_samples: int = 200,
+                 batch_size: int = 10000, random_state: int = 42):
+        self.model_dir = model_dir
+        self.new_trees = new_trees
+        self.tolerance = tolerance
+        self.holdout = holdout
+        self.min_samples = min_samples
+        self.batch_size = batch_size
+        self.random_state = random_state
+
+        self.model = joblib.load(os.path.join(model_dir, 'readmission_model.pkl'))
+        self.scaler = joblib.load(os.path.join(model_dir, 'scaler.pkl'))
+        self.label_encoders = joblib.load(os.path.join(model_dir, 'label_encoders.pkl'))
+        self.feature_names = joblib.load(os.path.join(model_dir, 'feature_names.pkl'))
+        self.metadata = load_metadata(model_dir)
+
+    def _align(self, dataset: EncodedDataset) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Re-express the export's categorical codes with the current model's
+        encoders, dropping rows whose categories the model has never seen
+        """
+        X = np.array(dataset.X, dtype=np.float32)
+        y = np.array(dataset.y, dtype=np.int8)
+        keep = np.ones(len(y), dtype=bool)
+        for i, feature in enumerate(CATEGORICAL_FEATURES, start=len(NUMERICAL_FEATURES)):
+            known = {value: code for code, value in enumerate(self.label_encoders[feature].classes_)}
+            lookup = np.array([known.get(value, -1) for value in dataset.label_encoders[feature].classes_],
+                              dtype=np.int16)
+            if not len(lookup):
+                continue
+            codes = lookup[X[:, i].astype(np.int16)]
+            keep &= codes >= 0
+            X[:, i] = codes
+
+        if not keep.all():
+            logger.warning(f"Dropping {int((~keep).sum())} rows with categories unknown to the current model")
+        return X[keep], y[keep]
+
+    def _update_model(self, model, X: np.ndarray, y: np.ndarray):
+        """Grow a forest/boosting ensemble, or continue partial_fit training"""
+        params = model.get_params()
+        if 'warm_start' in params and 'n_estimators' in params:
+            model.set_params(warm_start=True, n_estimators=params['n_estimators'] + self.new_trees)
+            model.fit(X, y)
+            model.set_params(warm_start=False)
+        elif hasattr(model, 'partial_fit'):
+            model.partial_fit(X, y)
+        else:
+            raise ValueError(f"{type(model).__name__} supports neither warm_start nor partial_fit")
+        return model
+
+    def run(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+            output_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Train on patients updated in [since, until) and save a new model
+        version if it does not regress on a holdout of that data
+        """
+        if since is None:
+            if not self.metadata.get('trained_through'):
+                raise ValueError("Current model has no trained_through metadata; pass since explicitly")
+            since = datetime.fromisoformat(self.metadata['trained_through'])
+        until = until or datetime.utcnow()
+
+        work_dir = tempfile.mkdtemp(prefix='incremental_')
+        try:
+            export_patients(work_dir, batch_size=self.batch_size,
+                            filters={'updated_at__gte': since, 'updated_at__lt': until})
+            X, y = self._align(EncodedDataset(work_dir))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        if len(y) < self.min_samples:
+            raise ValueError(f"Only {len(y)} new labelled patients since {since.isoformat()}, "
+                             f"need at least {self.min_samples}")
+        if len(np.unique(y)) < 2:
+            raise ValueError("New data contains a single outcome class; cannot update or validate")
+
+        X_train, X_val, y_train, y_val = train_test_split(
+            X, y, test_size=self.holdout, random_state=self.random_state, stratify=y
+        )
+
+        # Baseline: the current model on the holdout, with its own scaler
+        baseline_auc = roc_auc_score(y_val, self.model.predict_proba(self.scaler.transform(X_val))[:, 1])
+
+        # Running moments: fold the new rows into the scaler statistics,
+        # then move the existing model into the new scaled space
+        scaler = copy.deepcopy(self.scaler)
+        scaler.partial_fit(X_train)
+        model = copy.deepcopy(self.model)
+        rebase_model(model, self.scaler, scaler)
+        model = self._update_model(model, scaler.transform(X_train), y_train)
+
+        updated_auc = roc_auc_score(y_val, model.predict_proba(scaler.transform(X_val))[:, 1])
+        logger.info(f"Holdout AUC: current {baseline_auc:.4f}, updated {updated_auc:.4f}")
+
+        result = {
+            'since': since.isoformat(),
+            'until': until.isoformat(),
+            'n_new_samples': int(len(y_train)),
+            'n_validation_samples': int(len(y_val)),
+            'baseline_auc': float(baseline_auc),
+            'updated_auc': float(updated_auc),
+            'accepted': bool(updated_auc >= baseline_auc - self.tolerance)
+        }
+        if not result['accepted']:
+            logger.warning(f"Update rejected: AUC dropped by more than {self.tolerance}")
+            return result
+
+        parent_version = self.metadata.get('version', '1.0.0')
+        trainer = ModelTrainer('mongodb:patients')
+        trainer.model = model
+        trainer.scaler = scaler
+        trainer.label_encoders = self.label_encoders
+        trainer.feature_names = self.feature_names
+        trainer.metadata = {
+            'version': next_version(parent_version),
+            'parent_version': parent_version,
+            'trained_at': datetime.utcnow().isoformat(),
+            'trained_through': until.isoformat(),
+            'n_samples': int(self.metadata.get('n_samples', 0)) + len(y_train),
+            'incremental': True,
+            'validation': result
+        }
+        trainer.save_model(output_dir or self.model_dir)
+        result['version'] = trainer.metadata['version']
+        logger.info(f"Saved model version {result['version']} (parent {parent_version})")
+        return result
+
+
+def main():
+    """Incrementally update the current model from newly labelled patients"""
+    from app.config import Config
+
+    parser = argparse.ArgumentParser(description='Update the readmission model with newly labelled patients')
+    parser.add_argument('--model-dir', default=os.path.join('app', 'ml_models'))
+    parser.add_argument('--output', help='Where to save the new version (default: model dir)')
+    parser.add_argument('--since', type=datetime.fromisoformat,
+                        help="ISO date; defaults to the current model's trained_through")
+    parser.add_argument('--new-trees', type=int, default=10, help='Trees added to forest/boosting models')
+    parser.add_argument('--tolerance', type=float, default=0.01, help='Allowed holdout AUC drop')
+    parser.add_argument('--min-samples', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    try:
+        connect(**Config.MONGODB_SETTINGS)
+        updater = IncrementalUpdater(
+            model_dir=args.model_dir,
+            new_trees=args.new_trees,
+            tolerance=args.tolerance,
+            min_samples=args.min_samples,
+            batch_size=args.batch_size
+        )
+        result = updater.run(since=args.since, output_dir=args.output)
+        if not result['accepted']:
+            raise SystemExit(1)
+    except Exception as e:
+        logger.error(f"Error updating model: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import os
+import json
+import argparse
+import logging
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.preprocessing import LabelEncoder
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NUMERICAL_FEATURES = ['age', 'num_procedures', 'days_in_hospital', 'comorbidity_score']
+CATEGORICAL_FEATURES = ['gender', 'primary_diagnosis', 'discharge_to']
+FEATURE_NAMES = NUMERICAL_FEATURES + CATEGORICAL_FEATURES
+LABEL = 'readmitted'
+
+# Compact parse dtypes: nullable ints so missing values can be dropped rather than failing the chunk
+CSV_DTYPES = {
+    'age': 'Int8',
+    'num_procedures': 'Int8',
+    'days_in_hospital': 'Int16',
+    'comorbidity_score': 'float32',
+    'gender': 'category',
+    'primary_diagnosis': 'category',
+    'discharge_to': 'category',
+    LABEL: 'category'
+}
+
+# Labels arrive as 0/1, booleans or Yes/No depending on the extract
+LABEL_VALUES = {
+    '1': 1, 'yes': 1, 'true': 1, 'y': 1,
+    '0': 0, 'no': 0, 'false': 0, 'n': 0
+}
+
+MANIFEST = 'manifest.json'
+FEATURES_FILE = 'features.f32'
+LABELS_FILE = 'labels.i8'
+ENCODERS_FILE = 'label_encoders.pkl'
+
+
+class IncrementalLabelEncoder:
+    """
+    Label encoding built in one streaming pass: codes are assigned in
+    first-seen order, then remapped to LabelEncoder's sorted order at the end
+    """
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, column: pd.Series) -> np.ndarray:
+        """Encode a categorical chunk column to first-seen codes"""
+        categorical = column.astype('category')
+        lookup = np.empty(len(categorical.cat.categories), dtype=np.int16)
+        for i, value in enumerate(categorical.cat.categories):
+            lookup[i] = self.codes.setdefault(str(value), len(self.codes))
+        return lookup[categorical.cat.codes.to_numpy()]
+
+    def sorted_remap(self) -> np.ndarray:
+        """Array mapping first-seen code to sorted (LabelEncoder) code"""
+        classes = sorted(self.codes)
+        remap = np.empty(len(classes), dtype=np.int16)
+        for sorted_code, value in enumerate(classes):
+            remap[self.codes[value]] = sorted_code
+        return remap
+
+    def to_label_encoder(self) -> LabelEncoder:
+        """Equivalent fitted sklearn LabelEncoder"""
+        encoder = LabelEncoder()
+        encoder.classes_ = np.array(sorted(self.codes), dtype=object)
+        return encoder
+
+
+def encode_label(column: pd.Series) -> np.ndarray:
+    """Map the readmitted column to int8 0/1, -1 where unrecognised"""
+    normalised = column.astype(str).str.strip().str.lower()
+    return normalised.map(LABEL_VALUES).fillna(-1).to_numpy(dtype=np.int8)
+
+
+def encode_chunk(chunk: pd.DataFrame,
+                 encoders: Dict[str, IncrementalLabelEncoder]) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Encode a chunk into a float32 feature block and int8 labels,
+    dropping rows with missing features or unrecognised labels
+    """
+    labels = encode_label(chunk[LABEL])
+    valid = chunk[FEATURE_NAMES].notna().all(axis=1).to_numpy() & (labels >= 0)
+    chunk = chunk[valid]
+
+    block = np.empty((len(chunk), len(FEATURE_NAMES)), dtype=np.float32)
+    for i, feature in enumerate(NUMERICAL_FEATURES):
+        block[:, i] = chunk[feature].to_numpy(dtype=np.float32)
+    for i, feature in enumerate(CATEGORICAL_FEATURES, start=len(NUMERICAL_FEATURES)):
+        block[:, i] = encoders[feature].encode(chunk[feature])
+    return block, labels[valid], int((~valid).sum())
+
+
+def ingest_csv(csv_path: str, output_dir: str, chunksize: int = 100000) -> Dict[str, Any]:
+    """
+    Stream a CSV into an encoded float32 feature matrix and int8 labels
+    on disk, with label encoders built in the same single pass
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    features_path = os.path.join(output_dir, FEATURES_FILE)
+    labels_path = os.path.join(output_dir, LABELS_FILE)
+
+    encoders = {feature: IncrementalLabelEncoder() for feature in CATEGORICAL_FEATURES}
+    n_rows = 0
+    dropped = 0
+
+    reader = pd.read_csv(
+        csv_path,
+        usecols=FEATURE_NAMES + [LABEL],
+        dtype=CSV_DTYPES,
+        chunksize=chunksize
+    )
+    with open(features_path, 'wb') as features_file, open(labels_path, 'wb') as labels_file:
+        for chunk in reader:
+            block, labels, invalid = encode_chunk(chunk, encoders)
+            features_file.write(block.tobytes())
+            labels_file.write(labels.tobytes())
+            n_rows += len(block)
+            dropped += invalid
+            logger.info(f"Ingested {n_rows} rows ({dropped} dropped)")
+
+    return finalize_dataset(output_dir, n_rows, encoders, chunksize, {
+        'source': os.path.abspath(csv_path),
+        'dropped_rows': dropped
+    })
+
+
+def finalize_dataset(output_dir: str, n_rows: int, encoders: Dict[str, IncrementalLabelEncoder],
+                     chunksize: int = 100000, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Remap categorical codes to sorted order in place, then write the
+    fitted label encoders and the manifest next to the raw arrays
+    """
+    features_path = os.path.join(output_dir, FEATURES_FILE)
+    if n_rows:
+        X = np.memmap(features_path, dtype=np.float32, mode='r+', shape=(n_rows, len(FEATURE_NAMES)))
+        remaps = {feature: encoder.sorted_remap() for feature, encoder in encoders.items()}
+        for start in range(0, n_rows, chunksize):
+            block = X[start:start + chunksize]
+            for i, feature in enumerate(CATEGORICAL_FEATURES, start=len(NUMERICAL_FEATURES)):
+                block[:, i] = remaps[feature][block[:, i].astype(np.int16)]
+        X.flush()
+        del X
+
+    label_encoders = {feature: encoder.to_label_encoder() for feature, encoder in encoders.items()}
+    joblib.dump(label_encoders, os.path.join(output_dir, ENCODERS_FILE))
+
+    manifest = {
+        **(extra or {}),
+        'n_rows': n_rows,
+        'feature_names': FEATURE_NAMES,
+        'features_dtype': 'float32',
+        'labels_dtype': 'int8'
+    }
+    with open(os.path.join(output_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def is_encoded_dataset(path: str) -> bool:
+    """Check whether path is a directory written by ingest_csv"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST))
+
+
+class EncodedDataset:
+    """Read-only memory-mapped view of an ingested dataset"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.feature_names: List[str] = self.manifest['feature_names']
+        n_rows = self.manifest['n_rows']
+        self.X = np.memmap(os.path.join(path, FEATURES_FILE), dtype=np.float32, mode='r',
+                           shape=(n_rows, len(self.feature_names)))
+        self.y = np.memmap(os.path.join(path, LABELS_FILE), dtype=np.int8, mode='r', shape=(n_rows,))
+        self.label_encoders = joblib.load(os.path.join(path, ENCODERS_FILE))
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def iter_rows(self, index: np.ndarray, chunksize: int = 100000) -> Iterable[np.ndarray]:
+        """Gather rows for sorted indices in bounded chunks"""
+        for start in range(0, len(index), chunksize):
+            yield np.asarray(self.X[index[start:start + chunksize]])
+
+    def gather(self, index: np.ndarray, scaler=None, chunksize: int = 100000) -> np.ndarray:
+        """Materialize the selected rows once, as float32, scaling chunk by chunk"""
+        out = np.empty((len(index), len(self.feature_names)), dtype=np.float32)
+        start = 0
+        for block in self.iter_rows(index, chunksize):
+            out[start:start + len(block)] = scaler.transform(block) if scaler is not None else block
+            start += len(block)
+        return out
+
+
+def main():
+    """Ingest a CSV export into an encoded on-disk dataset"""
+    parser = argparse.ArgumentParser(description='Stream a readmissions CSV into an encoded memory-mapped dataset')
+    parser.add_argument('csv_path')
+    parser.add_argument('output_dir')
+    parser.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args()
+
+    try:
+        manifest = ingest_csv(args.csv_path, args.output_dir, args.chunksize)
+        logger.info(f"Wrote {manifest['n_rows']} rows to {args.output_dir} "
+                    f"({manifest['dropped_rows']} rows dropped for missing or invalid values)")
+    except Exception as e:
+        logger.error(f"Error ingesting data: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
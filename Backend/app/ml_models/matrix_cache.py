@@ -0,0 +1,124 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import logging
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+import joblib
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join('app', 'ml_models', '.matrix_cache')
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Bump when the cached layout or preprocessing semantics change
+CACHE_FORMAT = 1
+
+ARRAYS = ('X_train', 'X_test', 'y_train', 'y_test')
+LAST_USED = 'last_used'
+
+
+def hash_data(path: str, block_size: int = 1 << 20) -> str:
+    """sha256 of a file, or of every file in a dataset directory"""
+    digest = hashlib.sha256()
+    paths = [path] if os.path.isfile(path) else [
+        os.path.join(path, name) for name in sorted(os.listdir(path))
+    ]
+    for file_path in paths:
+        digest.update(os.path.basename(file_path).encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(data_path: str, config: Dict[str, Any]) -> str:
+    """Content address: the data bytes plus the preprocessing config"""
+    payload = json.dumps({'format': CACHE_FORMAT, 'data': hash_data(data_path), 'config': config},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class MatrixCache:
+    """
+    On-disk cache of split, encoded and scaled training matrices with
+    the fitted encoders and scaler. Arrays are stored as .npy and opened
+    memory-mapped; total size is capped with least-recently-used eviction.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        """Return (arrays, objects) for key, or None on a miss"""
+        entry = self._entry(key)
+        if not os.path.exists(os.path.join(entry, LAST_USED)):
+            return None
+        try:
+            arrays = {name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode='r') for name in ARRAYS}
+            objects = joblib.load(os.path.join(entry, 'objects.pkl'))
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        # Recency is tracked through the marker's mtime
+        os.utime(os.path.join(entry, LAST_USED))
+        return arrays, objects
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray], objects: Dict[str, Any]) -> None:
+        """Store an entry atomically, then evict down to the size cap"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{key}.", dir=self.cache_dir)
+        try:
+            for name in ARRAYS:
+                array = np.asarray(arrays[name])
+                if array.dtype == object:
+                    array = array.astype(str)
+                np.save(os.path.join(staging, f"{name}.npy"), array, allow_pickle=False)
+            joblib.dump(objects, os.path.join(staging, 'objects.pkl'))
+            # The marker is written last, so a complete entry is one that has it
+            open(os.path.join(staging, LAST_USED), 'w').close()
+            os.replace(staging, self._entry(key))
+        except OSError:
+            # Another run stored the same key first; its entry is equivalent
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.exists(os.path.join(self._entry(key), LAST_USED)):
+                raise
+        self.evict(keep=key)
+
+    def entries(self) -> Dict[str, Tuple[float, int]]:
+        """Complete entries as key -> (last used, size in bytes)"""
+        result = {}
+        if not os.path.isdir(self.cache_dir):
+            return result
+        for key in os.listdir(self.cache_dir):
+            entry = self._entry(key)
+            marker = os.path.join(entry, LAST_USED)
+            if key.startswith('.') or not os.path.exists(marker):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+            result[key] = (os.path.getmtime(marker), size)
+        return result
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used entries until under max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size in entries.values())
+        for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            logger.info(f"Evicted training matrix cache entry {key} ({size} bytes)")
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
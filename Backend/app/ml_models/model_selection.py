@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, ParameterGrid
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.metrics import roc_auc_score
+from threadpoolctl import threadpool_limits
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Model families compared in hospital.ipynb, with their search grids
+SEARCH_SPACES = {
+    'logistic_regression': (
+        LogisticRegression(max_iter=1000),
+        {'C': [0.01, 0.1, 1.0, 10.0]}
+    ),
+    'random_forest': (
+        RandomForestClassifier(random_state=42, n_jobs=1),
+        {'n_estimators': [100, 300], 'max_depth': [10, 20, None], 'min_samples_leaf': [1, 4]}
+    ),
+    'gradient_boosting': (
+        GradientBoostingClassifier(random_state=42),
+        {'n_estimators': [100, 300], 'learning_rate': [0.05, 0.1], 'max_depth': [3, 5]}
+    ),
+    'neural_net': (
+        MLPClassifier(max_iter=500, early_stopping=True, random_state=42),
+        {'hidden_layer_sizes': [(16, 8), (32, 16)], 'alpha': [1e-4, 1e-3]}
+    )
+}
+
+# Training data shared with pool workers through memory-mapped files
+_X: Optional[np.ndarray] = None
+_y: Optional[np.ndarray] = None
+_folds: Optional[np.ndarray] = None
+
+
+def _init_worker(run_dir: str, threads_per_fit: int):
+    """Load the shared arrays and cap BLAS/OpenMP threads for every fit"""
+    global _X, _y, _folds
+    _X = np.load(os.path.join(run_dir, 'X.npy'), mmap_mode='r')
+    _y = np.load(os.path.join(run_dir, 'y.npy'), mmap_mode='r')
+    _folds = np.load(os.path.join(run_dir, 'folds.npy'))
+    # Without a cap each process would start one native thread per core
+    threadpool_limits(limits=threads_per_fit)
+
+
+def _single_row_latency_ms(model, X: np.ndarray, rounds: int = 5, calls: int = 20) -> float:
+    """Best-of-rounds mean latency of predict_proba on one row (robust to pool contention)"""
+    row = np.ascontiguousarray(X[:1])
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            model.predict_proba(row)
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best * 1000
+
+
+def _run_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Fit one candidate on one fold and score it"""
+    estimator, _ = SEARCH_SPACES[task['family']]
+    model = clone(estimator).set_params(**task['params'])
+
+    val_mask = _folds == task['fold']
+    X_train, y_train = _X[~val_mask], _y[~val_mask]
+    X_val, y_val = _X[val_mask], _y[val_mask]
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    return {
+        'key': task['key'],
+        'family': task['family'],
+        'params': task['params'],
+        'fold': task['fold'],
+        'auc': float(roc_auc_score(y_val, model.predict_proba(X_val)[:, 1])),
+        'fit_seconds': fit_seconds,
+        'latency_ms': _single_row_latency_ms(model, X_val)
+    }
+
+
+def _params_for_json(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Make tuples (e.g. hidden_layer_sizes) JSON round-trippable"""
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in params.items()}
+
+
+def _params_from_json(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of _params_for_json"""
+    return {k: tuple(v) if isinstance(v, list) else v for k, v in params.items()}
+
+
+class ModelSelector:
+    """
+    Cross-validated hyperparameter search over several model families,
+    run in parallel across processes with resumable per-fold results
+    """
+
+    def __init__(self,
+                 families: Optional[List[str]] = None,
+                 n_splits: int = 5,
+                 n_jobs: Optional[int] = None,
+                 threads_per_fit: int = 1,
+                 max_latency_ms: float = 5.0,
+                 cache_dir: str = os.path.join('app', 'ml_models', '.selection_cache'),
+                 random_state: int = 42):
+        """Initialize the selector"""
+        unknown = set(families or []) - set(SEARCH_SPACES)
+        if unknown:
+            raise ValueError(f"Unknown model families: {', '.join(sorted(unknown))}")
+        self.families = families or list(SEARCH_SPACES)
+        self.n_splits = n_splits
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.threads_per_fit = threads_per_fit
+        self.max_latency_ms = max_latency_ms
+        self.cache_dir = cache_dir
+        self.random_state = random_state
+        self.results: List[Dict[str, Any]] = []
+
+    def _fingerprint(self, X: np.ndarray, y: np.ndarray) -> str:
+        """Identify the data and CV setup so cached folds are only reused when valid"""
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(X).tobytes())
+        digest.update(np.ascontiguousarray(y).tobytes())
+        digest.update(f"{X.shape}{self.n_splits}{self.random_state}".encode())
+        return digest.hexdigest()[:16]
+
+    def _fold_assignment(self, X: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Validation fold number for every row"""
+        folds = np.empty(len(y), dtype=np.int8)
+        splitter = StratifiedKFold(n_splits=self.n_splits, shuffle=True, random_state=self.random_state)
+        for fold, (_, val_index) in enumerate(splitter.split(X, y)):
+            folds[val_index] = fold
+        return folds
+
+    def _tasks(self) -> List[Dict[str, Any]]:
+        """One task per (family, parameter set, fold)"""
+        tasks = []
+        for family in self.families:
+            _, grid = SEARCH_SPACES[family]
+            for params in ParameterGrid(grid):
+                params = _params_for_json(params)
+                for fold in range(self.n_splits):
+                    key = hashlib.sha1(json.dumps(
+                        [family, params, fold], sort_keys=True
+                    ).encode()).hexdigest()
+                    tasks.append({'key': key, 'family': family, 'params': params, 'fold': fold})
+        return tasks
+
+    def search(self, X: np.ndarray, y: np.ndarray) -> List[Dict[str, Any]]:
+        """Run every uncached fold in the process pool and aggregate per candidate"""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        run_dir = os.path.join(self.cache_dir, self._fingerprint(X, y))
+        os.makedirs(run_dir, exist_ok=True)
+
+        fold_results = []
+        pending = []
+        for task in self._tasks():
+            cached_path = os.path.join(run_dir, f"{task['key']}.json")
+            if os.path.exists(cached_path):
+                with open(cached_path, encoding='utf-8') as f:
+                    fold_results.append(json.load(f))
+            else:
+                pending.append(task)
+
+        logger.info(f"{len(fold_results)} fold results cached, {len(pending)} to run on {self.n_jobs} processes")
+
+        if pending:
+            shared = {'X': X, 'y': y, 'folds': self._fold_assignment(X, y)}
+            for name, array in shared.items():
+                np.save(os.path.join(run_dir, f"{name}.npy"), array)
+
+            with ProcessPoolExecutor(
+                max_workers=self.n_jobs,
+                initializer=_init_worker,
+                initargs=(run_dir, self.threads_per_fit)
+            ) as executor:
+                futures = [executor.submit(_run_fold, task) for task in pending]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    result = future.result()
+                    # Write atomically so an interrupted run never leaves a torn cache entry
+                    cached_path = os.path.join(run_dir, f"{result['key']}.json")
+                    with open(cached_path + '.tmp', 'w', encoding='utf-8') as f:
+                        json.dump(result, f)
+                    os.replace(cached_path + '.tmp', cached_path)
+                    fold_results.append(result)
+                    logger.info(f"[{done}/{len(pending)}] {result['family']} {result['params']} "
+                                f"fold {result['fold']}: AUC {result['auc']:.4f}")
+
+            for name in shared:
+                os.remove(os.path.join(run_dir, f"{name}.npy"))
+
+        self.results = self._aggregate(fold_results)
+        return self.results
+
+    def _aggregate(self, fold_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Mean AUC and median latency per candidate, best first"""
+        candidates: Dict[str, Dict[str, Any]] = {}
+        for result in fold_results:
+            if result['family'] not in self.families:
+                continue
+            key = json.dumps([result['family'], result['params']], sort_keys=True)
+            candidate = candidates.setdefault(key, {
+                'family': result['family'],
+                'params': result['params'],
+                'aucs': [],
+                'latencies_ms': [],
+                'fit_seconds': []
+            })
+            candidate['aucs'].append(result['auc'])
+            candidate['latencies_ms'].append(result['latency_ms'])
+            candidate['fit_seconds'].append(result['fit_seconds'])
+
+        summary = []
+        for candidate in candidates.values():
+            summary.append({
+                'family': candidate['family'],
+                'params': candidate['params'],
+                'mean_auc': float(np.mean(candidate['aucs'])),
+                'std_auc': float(np.std(candidate['aucs'])),
+                'latency_ms': float(np.median(candidate['latencies_ms'])),
+                'mean_fit_seconds': float(np.mean(candidate['fit_seconds'])),
+                'folds': len(candidate['aucs']),
+                'within_latency_budget': float(np.median(candidate['latencies_ms'])) <= self.max_latency_ms
+            })
+        summary.sort(key=lambda c: c['mean_auc'], reverse=True)
+        return summary
+
+    def best_candidate(self) -> Dict[str, Any]:
+        """Highest mean AUC among candidates that meet the latency budget"""
+        eligible = [c for c in self.results if c['within_latency_budget'] and c['folds'] == self.n_splits]
+        if not eligible:
+            raise ValueError(f"No candidate meets the {self.max_latency_ms} ms single-row latency budget")
+        return eligible[0]
+
+    def build_best(self) -> Tuple[Any, Dict[str, Any]]:
+        """Unfitted estimator for the winning candidate"""
+        best = self.best_candidate()
+        estimator, _ = SEARCH_SPACES[best['family']]
+        return clone(estimator).set_params(**_params_from_json(best['params'])), best
+
+
+def main():
+    """Run the model selection pipeline and save the winner"""
+    from app.ml_models.train_model import ModelTrainer
+    from app.ml_models.matrix_cache import MatrixCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+
+    parser = argparse.ArgumentParser(description='Select the best readmission model across families')
+    parser.add_argument('--data', default='data/hospital_readmissions.csv')
+    parser.add_argument('--output', default='app/ml_models')
+    parser.add_argument('--families', help=f"Comma-separated subset of: {', '.join(SEARCH_SPACES)}")
+    parser.add_argument('--n-splits', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--threads-per-fit', type=int, default=1, help='BLAS/OpenMP threads per worker')
+    parser.add_argument('--max-latency-ms', type=float, default=5.0, help='Single-row inference budget')
+    parser.add_argument('--cache-dir', default=os.path.join('app', 'ml_models', '.selection_cache'))
+    parser.add_argument('--matrix-cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='Cache of encoded/scaled training matrices')
+    parser.add_argument('--matrix-cache-max-bytes', type=int, default=DEFAULT_MAX_BYTES)
+    args = parser.parse_args()
+
+    try:
+        trainer = ModelTrainer(args.data, cache=MatrixCache(args.matrix_cache_dir, args.matrix_cache_max_bytes))
+        started_at = datetime.utcnow()
+        X_train_scaled, X_test_scaled, y_train, y_test = trainer.load_scaled_data()
+
+        selector = ModelSelector(
+            families=args.families.split(',') if args.families else None,
+            n_splits=args.n_splits,
+            n_jobs=args.n_jobs,
+            threads_per_fit=args.threads_per_fit,
+            max_latency_ms=args.max_latency_ms,
+            cache_dir=args.cache_dir
+        )
+        results = selector.search(X_train_scaled, np.asarray(y_train))
+
+        logger.info("\nCandidates (best mean AUC first):")
+        for candidate in results:
+            logger.info(f"  {candidate['family']:<20} AUC {candidate['mean_auc']:.4f} ± {candidate['std_auc']:.4f}  "
+                        f"{candidate['latency_ms']:.2f} ms  {candidate['params']}"
+                        f"{'' if candidate['within_latency_budget'] else '  (over latency budget)'}")
+
+        # Refit the winner on the whole training split
+        model, best = selector.build_best()
+        model.fit(X_train_scaled, y_train)
+        test_auc = roc_auc_score(y_test, model.predict_proba(X_test_scaled)[:, 1])
+        logger.info(f"\nSelected {best['family']} {best['params']}: CV AUC {best['mean_auc']:.4f}, test AUC {test_auc:.4f}")
+
+        trainer.model = model
+        trainer.metadata.update({
+            'trained_at': datetime.utcnow().isoformat(),
+            'trained_through': started_at.isoformat(),
+            'n_samples': int(len(y_train)),
+            'test_auc': float(test_auc),
+            'incremental': False
+        })
+        trainer.save_model(args.output)
+
+        with open(os.path.join(args.output, 'selection_report.json'), 'w', encoding='utf-8') as f:
+            json.dump({'selected': best, 'test_auc': test_auc, 'candidates': results}, f, indent=2)
+
+    except Exception as e:
+        logger.error(f"Error in model selection: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
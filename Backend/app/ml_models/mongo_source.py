@@ -0,0 +1,129 @@
+import os
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+import numpy as np
+import pandas as pd
+from mongoengine import connect
+from app.models.patient import Patient
+from app.ml_models.ingest import (
+    FEATURE_NAMES, CATEGORICAL_FEATURES, LABEL, FEATURES_FILE, LABELS_FILE,
+    IncrementalLabelEncoder, encode_chunk, finalize_dataset
+)
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def patient_window(created_after: Optional[datetime] = None,
+                   created_before: Optional[datetime] = None) -> Dict[str, Any]:
+    """Query filters selecting patients created inside the window"""
+    filters = {}
+    if created_after:
+        filters['created_at__gte'] = created_after
+    if created_before:
+        filters['created_at__lt'] = created_before
+    return filters
+
+
+def export_patients(output_dir: str, created_after: Optional[datetime] = None,
+                    created_before: Optional[datetime] = None, batch_size: int = 10000,
+                    filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Stream labelled patients into an encoded on-disk dataset that
+    ModelTrainer reads like an ingested CSV.
+
+    Raw pymongo dicts with only the features and label are read in
+    cursor batches and written into arrays preallocated from the count,
+    so memory stays bounded by batch_size whatever the collection size.
+    """
+    # Pin the upper bound so documents inserted mid-export can't overflow the arrays
+    created_before = created_before or datetime.utcnow()
+    query = {**patient_window(created_after, created_before), **(filters or {})}
+    capacity = Patient.objects(**query).count()
+
+    os.makedirs(output_dir, exist_ok=True)
+    features_path = os.path.join(output_dir, FEATURES_FILE)
+    labels_path = os.path.join(output_dir, LABELS_FILE)
+    encoders = {feature: IncrementalLabelEncoder() for feature in CATEGORICAL_FEATURES}
+    n_rows = 0
+    dropped = 0
+
+    if capacity:
+        X = np.memmap(features_path, dtype=np.float32, mode='w+', shape=(capacity, len(FEATURE_NAMES)))
+        y = np.memmap(labels_path, dtype=np.int8, mode='w+', shape=(capacity,))
+
+        cursor = (Patient.objects(**query)
+                  .only(*FEATURE_NAMES, LABEL)
+                  .exclude('id')
+                  .limit(capacity)
+                  .batch_size(batch_size)
+                  .as_pymongo())
+
+        def flush(docs):
+            nonlocal n_rows, dropped
+            block, labels, invalid = encode_chunk(pd.DataFrame.from_records(docs, columns=FEATURE_NAMES + [LABEL]), encoders)
+            X[n_rows:n_rows + len(block)] = block
+            y[n_rows:n_rows + len(labels)] = labels
+            n_rows += len(block)
+            dropped += invalid
+            logger.info(f"Exported {n_rows}/{capacity} patients ({dropped} dropped)")
+
+        docs = []
+        for doc in cursor:
+            docs.append(doc)
+            if len(docs) == batch_size:
+                flush(docs)
+                docs = []
+        if docs:
+            flush(docs)
+
+        X.flush()
+        y.flush()
+        del X, y
+
+    # Drop the unused tail left by deletions or invalid rows
+    with open(features_path, 'ab') as f:
+        f.truncate(n_rows * len(FEATURE_NAMES) * np.dtype(np.float32).itemsize)
+    with open(labels_path, 'ab') as f:
+        f.truncate(n_rows)
+
+    return finalize_dataset(output_dir, n_rows, encoders, batch_size, {
+        'source': 'mongodb:patients',
+        'created_after': created_after.isoformat() if created_after else None,
+        'created_before': created_before.isoformat(),
+        'dropped_rows': dropped
+    })
+
+
+def main():
+    """Export patients from MongoDB and optionally train on them"""
+    from app.config import Config
+    from app.ml_models.train_model import ModelTrainer
+
+    parser = argparse.ArgumentParser(description='Stream labelled patients into an encoded training dataset')
+    parser.add_argument('output_dir')
+    parser.add_argument('--created-after', type=datetime.fromisoformat, help='ISO date, inclusive')
+    parser.add_argument('--created-before', type=datetime.fromisoformat, help='ISO date, exclusive')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--train-output', help='Train on the export and save the model here')
+    args = parser.parse_args()
+
+    try:
+        connect(**Config.MONGODB_SETTINGS)
+        manifest = export_patients(args.output_dir, args.created_after, args.created_before, args.batch_size)
+        logger.info(f"Exported {manifest['n_rows']} patients to {args.output_dir}")
+
+        if args.train_output:
+            trainer = ModelTrainer(args.output_dir)
+            trainer.train()
+            trainer.save_model(args.train_output)
+    except Exception as e:
+        logger.error(f"Error exporting patients: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,40 @@ from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import classification_report, roc_auc_score
 import joblib
 import os
+import sys
+import json
 import logging
 from datetime import datetime
+from typing import Optional
+from app.ml_models.ingest import EncodedDataset, is_encoded_dataset
+from app.ml_models.matrix_cache import MatrixCache, cache_key
+from app.utils.config import Config
+
+METADATA_FILE = "model_metadata.json"
+
+# Split settings; part of the matrix cache key
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+
+def load_metadata(model_dir: str) -> dict:
+    """Read the metadata saved next to the current model, if any"""
+    path = os.path.join(model_dir, METADATA_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ModelTrainer:
-    def __init__(self, data_path: str):
-        """Initialize model trainer"""
+    def __init__(self, data_path: str, cache: Optional[MatrixCache] = None):
+        """Initialize model trainer from a CSV or an ingested dataset directory"""
         self.data_path = data_path
+        self.cache = cache
         self.model = RandomForestClassifier(
             n_estimators=100,
             max_depth=10,
@@ -24,6 +47,8 @@ class ModelTrainer:
         )
         self.scaler = StandardScaler()
         self.label_encoders = {}
+        # Saved as model_metadata.json; incremental updates read it back
+        self.metadata = {'version': Config.MODEL_VERSION}
         
     def load_data(self) -> tuple:
         """Load and prepare the dataset"""
@@ -51,7 +76,7 @@ class ModelTrainer:
             
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
+                X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
             )
             
             # Store feature names for later use
@@ -62,16 +87,86 @@ class ModelTrainer:
         except Exception as e:
             logger.error(f"Error loading data: {str(e)}")
             raise
-    
-    def train(self):
-        """Train the model"""
+
+    def load_encoded_data(self, chunksize: int = 100000) -> tuple:
+        """
+        Split and scale an ingested dataset straight from its memory map.
+        Only the scaled float32 train/test matrices are ever materialized.
+        """
         try:
-            # Load and split data
+            dataset = EncodedDataset(self.data_path)
+            self.label_encoders = dataset.label_encoders
+            self.feature_names = dataset.feature_names
+
+            train_index, test_index = train_test_split(
+                np.arange(len(dataset), dtype=np.int64), test_size=TEST_SIZE,
+                random_state=RANDOM_STATE, stratify=dataset.y
+            )
+            # Sorted indices keep reads from the memory map sequential
+            train_index.sort()
+            test_index.sort()
+
+            for block in dataset.iter_rows(train_index, chunksize):
+                self.scaler.partial_fit(block)
+
+            X_train_scaled = dataset.gather(train_index, self.scaler, chunksize)
+            X_test_scaled = dataset.gather(test_index, self.scaler, chunksize)
+            return X_train_scaled, X_test_scaled, dataset.y[train_index], dataset.y[test_index]
+
+        except Exception as e:
+            logger.error(f"Error loading encoded data: {str(e)}")
+            raise
+
+    def preprocessing_config(self) -> dict:
+        """Everything besides the data bytes that shapes the scaled matrices"""
+        return {
+            'source': 'encoded' if is_encoded_dataset(self.data_path) else 'csv',
+            'test_size': TEST_SIZE,
+            'random_state': RANDOM_STATE,
+            'scaler': type(self.scaler).__name__,
+            'scaler_params': self.scaler.get_params()
+        }
+
+    def load_scaled_data(self) -> tuple:
+        """Load, split and scale features, reusing cached matrices for unchanged data"""
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.data_path, self.preprocessing_config())
+            cached = self.cache.get(key)
+            if cached is not None:
+                arrays, objects = cached
+                self.scaler = objects['scaler']
+                self.label_encoders = objects['label_encoders']
+                self.feature_names = objects['feature_names']
+                logger.info(f"Using cached training matrices {key}")
+                return arrays['X_train'], arrays['X_test'], arrays['y_train'], arrays['y_test']
+
+        if is_encoded_dataset(self.data_path):
+            X_train_scaled, X_test_scaled, y_train, y_test = self.load_encoded_data()
+        else:
             X_train, X_test, y_train, y_test = self.load_data()
-            
-            # Scale features
             X_train_scaled = self.scaler.fit_transform(X_train)
             X_test_scaled = self.scaler.transform(X_test)
+
+        if key is not None:
+            self.cache.put(key, {
+                'X_train': X_train_scaled,
+                'X_test': X_test_scaled,
+                'y_train': y_train,
+                'y_test': y_test
+            }, {
+                'scaler': self.scaler,
+                'label_encoders': self.label_encoders,
+                'feature_names': self.feature_names
+            })
+        return X_train_scaled, X_test_scaled, y_train, y_test
+    
+    def train(self):
+        """Train the model"""
+        try:
+            # Load, split and scale data
+            started_at = datetime.utcnow()
+            X_train_scaled, X_test_scaled, y_train, y_test = self.load_scaled_data()
             
             # Train model
             logger.info("Training model...")
@@ -85,7 +180,18 @@ class ModelTrainer:
             logger.info("\nClassification Report:")
             logger.info(classification_report(y_test, y_pred))
             
-            logger.info(f"\nROC AUC Score: {roc_auc_score(y_test, y_pred_proba):.3f}")
+            test_auc = roc_auc_score(y_test, y_pred_proba)
+            logger.info(f"\nROC AUC Score: {test_auc:.3f}")
+            self.metadata.update({
+                # Unique per full train, so a retrained model never reuses a version
+                'version': f"{Config.MODEL_VERSION}+{started_at:%Y%m%d%H%M%S}",
+                'trained_at': datetime.utcnow().isoformat(),
+                # Patients updated after this are new to the model
+                'trained_through': started_at.isoformat(),
+                'n_samples': int(len(y_train)),
+                'test_auc': float(test_auc),
+                'incremental': False
+            })
             
             # Feature importance
             importance = pd.DataFrame({
@@ -138,13 +244,20 @@ class ModelTrainer:
             if os.path.exists(latest_encoders_path):
                 os.remove(latest_encoders_path)
                 
-            os.symlink(model_path, latest_model_path)
-            os.symlink(scaler_path, latest_scaler_path)
-            os.symlink(encoders_path, latest_encoders_path)
+            # Link by file name: symlink targets resolve relative to the link's directory
+            os.symlink(os.path.basename(model_path), latest_model_path)
+            os.symlink(os.path.basename(scaler_path), latest_scaler_path)
+            os.symlink(os.path.basename(encoders_path), latest_encoders_path)
             
             # Save feature names
             feature_names_path = os.path.join(output_dir, "feature_names.pkl")
             joblib.dump(self.feature_names, feature_names_path)
+
+            # Save metadata last so it never describes a half-written model
+            metadata_path = os.path.join(output_dir, METADATA_FILE)
+            with open(metadata_path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump({**self.metadata, 'model_file': os.path.basename(model_path)}, f, indent=2)
+            os.replace(metadata_path + ".tmp", metadata_path)
             
             return True
             
@@ -155,8 +268,9 @@ class ModelTrainer:
 def main():
     """Main function to train and save the model"""
     try:
-        # Initialize trainer
-        trainer = ModelTrainer("data/hospital_readmissions.csv")
+        # Initialize trainer; pass an ingested dataset directory for large extracts
+        data_path = sys.argv[1] if len(sys.argv) > 1 else "data/hospital_readmissions.csv"
+        trainer = ModelTrainer(data_path, cache=MatrixCache())
         
         # Train model
         trainer.train()
@@ -19,6 +19,12 @@ class Patient(Document):
     comorbidity_score = FloatField(required=True, min_value=0)
     discharge_to = StringField(required=True)
     readmitted = BooleanField(default=False)
+
+    # Materialized risk, written by the population scoring job
+    risk_level = StringField(choices=['Low', 'Medium', 'High'])
+    risk_probability = FloatField(min_value=0, max_value=1)
+    risk_model_version = StringField()
+    risk_scored_at = DateTimeField()
     
     # Timestamps
     created_at = DateTimeField(default=datetime.utcnow)
@@ -30,7 +36,12 @@ class Patient(Document):
             'medical_record_number',
             'user',
             'primary_diagnosis',
-            'readmitted'
+            'readmitted',
+            # Windowed training exports and incremental updates
+            'created_at',
+            'updated_at',
+            # Dashboard: patients at a risk level, highest probability first
+            ('risk_level', '-risk_probability')
         ]
     }
 
@@ -48,8 +59,13 @@ class Patient(Document):
             'comorbidity_score': self.comorbidity_score,
             'discharge_to': self.discharge_to,
             'readmitted': self.readmitted,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'risk_level': self.risk_level,
+            'risk_probability': self.risk_probability,
+            'risk_model_version': self.risk_model_version,
+            'risk_scored_at': self.risk_scored_at,
+            # Encoded as ISO 8601 by the app's JSON provider
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
     def save(self, *args, **kwargs):
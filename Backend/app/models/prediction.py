@@ -1,17 +1,21 @@
 from mongoengine import (
-    Document, ReferenceField, DictField,
-    DateTimeField, FloatField, StringField
+    Document, ReferenceField, DictField, IntField,
+    DateTimeField, FloatField, StringField, ValidationError
 )
 from datetime import datetime
+from typing import Optional, List
 from .patient import Patient
 from .user import User
+from app.utils.prediction_encoding import (
+    encode_prediction, decode_prediction, decode_features, decode_factors, decode_recommendations, CURRENT_VERSION
+)
 
 class Prediction(Document):
     patient = ReferenceField(Patient, required=True)
     user = ReferenceField(User, required=True)  # User who requested the prediction
     
     # Input Data
-    input_features = DictField(required=True)
+    input_features = DictField(default=None)
     
     # Prediction Results
     readmission_probability = FloatField(required=True, min_value=0, max_value=1)
@@ -19,10 +23,16 @@ class Prediction(Document):
     confidence_score = FloatField(required=True, min_value=0, max_value=1)
     
     # Important factors that contributed to the prediction
-    contributing_factors = DictField()
+    contributing_factors = DictField(default=None)
     
     # Recommendations based on the prediction
-    recommendations = DictField()
+    recommendations = DictField(default=None)
+
+    # Compact storage: features, factors and recommendation rule ids packed
+    # against rule table `encoding` (app.utils.prediction_encoding) in place
+    # of the three dicts above, which are then left unset
+    encoding = IntField(db_field='enc')
+    packed = DictField(db_field='pk', default=None)
     
     # Metadata
     model_version = StringField(required=True)
@@ -41,34 +51,114 @@ class Prediction(Document):
             'user',
             'created_at',
             'risk_level',
-            'status'
+            'status',
+            # History listing: a user's predictions, newest first
+            ('user', '-created_at'),
+            # Covers the history ETag lookup (count + latest updated_at)
+            ('user', '-updated_at')
         ],
         'ordering': ['-created_at']
     }
 
+    @classmethod
+    def create(cls, input_features: dict, contributing_factors: dict, recommendations: dict, **kwargs) -> 'Prediction':
+        """A new prediction, packed when it fits the current rule table and stored in full otherwise"""
+        packed = encode_prediction(input_features, contributing_factors, recommendations)
+        if packed is None:
+            return cls(input_features=input_features, contributing_factors=contributing_factors,
+                       recommendations=recommendations, **kwargs)
+        return cls(encoding=CURRENT_VERSION, packed=packed, **kwargs)
+
+    def clean(self):
+        if not self.input_features and not self.packed:
+            raise ValidationError('input_features is required')
+
+    def expanded(self) -> tuple:
+        """(input_features, contributing_factors, recommendations), unpacked if stored compact"""
+        if self.packed:
+            return decode_prediction(self.packed, self.encoding)
+        return self.input_features or {}, self.contributing_factors or {}, self.recommendations or {}
+
     def to_dict(self) -> dict:
         """Convert prediction object to dictionary"""
+        input_features, contributing_factors, recommendations = self.expanded()
         return {
             'id': str(self.id),
             'patient_id': str(self.patient.id),
             'user_id': str(self.user.id),
-            'input_features': self.input_features,
+            'input_features': input_features,
             'readmission_probability': self.readmission_probability,
             'risk_level': self.risk_level,
             'confidence_score': self.confidence_score,
-            'contributing_factors': self.contributing_factors,
-            'recommendations': self.recommendations,
+            'contributing_factors': contributing_factors,
+            'recommendations': recommendations,
             'model_version': self.model_version,
             'prediction_type': self.prediction_type,
             'status': self.status,
             'error_message': self.error_message,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            # Encoded as ISO 8601 by the app's JSON provider
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
+    @staticmethod
+    def raw_to_dict(document: dict, fields: Optional[List[str]] = None) -> dict:
+        """
+        to_dict for a raw document, e.g. a projected read or one from the
+        archive; with fields, only those are built (and unpacked)
+        """
+        return {name: RAW_FIELD_BUILDERS[name](document) for name in (fields or RAW_FIELD_BUILDERS)}
+
     def save(self, *args, **kwargs):
         """Update timestamp on save"""
         if not self.created_at:
             self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
-        return super(Prediction, self).save(*args, **kwargs) 
\ No newline at end of file
+        return super(Prediction, self).save(*args, **kwargs) 
+
+
+def _unpacked(name: str, decode):
+    """Builder for a dict stored either in full or packed"""
+    def build(document: dict):
+        if document.get('pk'):
+            return decode(document['pk'], document['enc'])
+        return document.get(name) or {}
+    return build
+
+
+# Response field -> stored fields it is built from; the fields= allowlist
+PREDICTION_FIELD_SOURCES = {
+    'id': ['_id'],
+    'patient_id': ['patient'],
+    'user_id': ['user'],
+    'input_features': ['input_features', 'enc', 'pk.x'],
+    'readmission_probability': ['readmission_probability'],
+    'risk_level': ['risk_level'],
+    'confidence_score': ['confidence_score'],
+    'contributing_factors': ['contributing_factors', 'enc', 'pk.f', 'pk.w'],
+    'recommendations': ['recommendations', 'enc', 'pk.r'],
+    'model_version': ['model_version'],
+    'prediction_type': ['prediction_type'],
+    'status': ['status'],
+    'error_message': ['error_message'],
+    'created_at': ['created_at'],
+    'updated_at': ['updated_at']
+}
+
+RAW_FIELD_BUILDERS = {
+    'id': lambda document: str(document['_id']),
+    'patient_id': lambda document: str(document['patient']),
+    'user_id': lambda document: str(document['user']),
+    'input_features': _unpacked('input_features', decode_features),
+    'readmission_probability': lambda document: document.get('readmission_probability'),
+    'risk_level': lambda document: document.get('risk_level'),
+    'confidence_score': lambda document: document.get('confidence_score'),
+    'contributing_factors': _unpacked('contributing_factors', decode_factors),
+    'recommendations': _unpacked('recommendations', decode_recommendations),
+    'model_version': lambda document: document.get('model_version'),
+    'prediction_type': lambda document: document.get('prediction_type', 'readmission'),
+    'status': lambda document: document.get('status', 'pending'),
+    'error_message': lambda document: document.get('error_message'),
+    'created_at': lambda document: document.get('created_at'),
+    'updated_at': lambda document: document.get('updated_at')
+}
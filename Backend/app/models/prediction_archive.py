@@ -0,0 +1,30 @@
+from mongoengine import Document, ObjectIdField, StringField, IntField, DateTimeField, ListField, BinaryField
+
+class PredictionArchive(Document):
+    """
+    Predictions of one patient for one calendar month, moved out of the
+    predictions collection by the archiver (python -m app.utils.archive).
+    The documents themselves are stored as zlib-compressed BSON chunks,
+    one per archival pass; only the fields needed to find a bucket are
+    kept uncompressed.
+    """
+    # Raw ids rather than references: buckets are read as raw documents and never dereferenced
+    patient = ObjectIdField(required=True)
+    # YYYY-MM of the predictions' created_at
+    month = StringField(required=True)
+    users = ListField(ObjectIdField())
+    prediction_ids = ListField(ObjectIdField())
+    chunks = ListField(BinaryField())
+    count = IntField(default=0)
+    first_created_at = DateTimeField()
+    last_created_at = DateTimeField()
+
+    meta = {
+        'collection': 'prediction_archive',
+        'indexes': [
+            {'fields': ('patient', 'month'), 'unique': True},
+            # History by user, and lookups of one archived prediction
+            ('users', '-month'),
+            'prediction_ids'
+        ]
+    }
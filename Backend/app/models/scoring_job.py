@@ -0,0 +1,79 @@
+from mongoengine import (Document, EmbeddedDocument, StringField, IntField, DateTimeField, DictField,
+                         ObjectIdField, ReferenceField, EmbeddedDocumentListField)
+from datetime import datetime
+from .user import User
+
+class JobShard(EmbeddedDocument):
+    """A contiguous _id range of the job's patients, scored by one worker task"""
+    index = IntField(required=True)
+    start_id = ObjectIdField(required=True)
+    end_id = ObjectIdField(required=True)
+    size = IntField(default=0)
+    status = StringField(default='pending', choices=['pending', 'running', 'completed'])
+    scored = IntField(default=0)
+    failed = IntField(default=0)
+    attempts = IntField(default=0)
+    finished_at = DateTimeField()
+
+class ScoringJob(Document):
+    """
+    A bulk scoring job run by the job runner (python -m app.utils.jobs).
+    Progress is checkpointed per shard, so a runner that dies is replaced
+    by another that resumes from the pending shards once the lease expires.
+    """
+    user = ReferenceField(User, required=True)
+    status = StringField(default='queued', choices=['queued', 'running', 'completed', 'failed', 'cancelled'])
+    # Patient filters the job was submitted with
+    filters = DictField()
+    shard_size = IntField(default=5000)
+    model_version = StringField()
+
+    shards = EmbeddedDocumentListField(JobShard)
+    total = IntField()
+    scored = IntField(default=0)
+    failed = IntField(default=0)
+
+    # Runner holding the job and its last sign of life
+    runner = StringField()
+    heartbeat_at = DateTimeField()
+    error_message = StringField()
+
+    created_at = DateTimeField(default=datetime.utcnow)
+    started_at = DateTimeField()
+    finished_at = DateTimeField()
+
+    meta = {
+        'collection': 'scoring_jobs',
+        'indexes': [
+            ('status', 'created_at'),
+            ('user', 'status')
+        ],
+        'ordering': ['-created_at']
+    }
+
+    def to_dict(self) -> dict:
+        """Convert job to dictionary with its progress"""
+        completed = [shard for shard in self.shards if shard.status == 'completed']
+        done = sum(shard.size for shard in completed)
+        return {
+            'id': str(self.id),
+            'user_id': str(self.user.id) if self.user else None,
+            'status': self.status,
+            'filters': self.filters,
+            'model_version': self.model_version,
+            'progress': {
+                'total': self.total,
+                'processed': done,
+                'scored': self.scored,
+                'failed': self.failed,
+                'shards': len(self.shards),
+                'shards_completed': len(completed),
+                'percent': round(100.0 * done / self.total, 1) if self.total else (100.0 if self.status == 'completed' else 0.0)
+            },
+            'error_message': self.error_message,
+            # Encoded as ISO 8601 by the app's JSON provider
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'heartbeat_at': self.heartbeat_at
+        }
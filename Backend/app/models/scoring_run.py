@@ -0,0 +1,45 @@
+from mongoengine import Document, StringField, IntField, DateTimeField
+from datetime import datetime
+
+class ScoringRun(Document):
+    """One pass of the population risk scoring job"""
+    model_version = StringField(required=True)
+    # Lower bound on updated_at this run scanned from; unset for a full rescore.
+    # The next run uses this run's started_at.
+    watermark = DateTimeField()
+    full_rescore = StringField(choices=['first_run', 'model_changed', 'requested'])
+    status = StringField(default='running', choices=['running', 'completed', 'failed'])
+    scanned = IntField(default=0)
+    scored = IntField(default=0)
+    skipped = IntField(default=0)
+    failed = IntField(default=0)
+    error_message = StringField()
+
+    started_at = DateTimeField(default=datetime.utcnow)
+    finished_at = DateTimeField()
+
+    meta = {
+        'collection': 'scoring_runs',
+        'indexes': [
+            ('status', '-started_at')
+        ],
+        'ordering': ['-started_at']
+    }
+
+    def to_dict(self) -> dict:
+        """Convert scoring run to dictionary"""
+        return {
+            'id': str(self.id),
+            'model_version': self.model_version,
+            'watermark': self.watermark,
+            'full_rescore': self.full_rescore,
+            'status': self.status,
+            'scanned': self.scanned,
+            'scored': self.scored,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'error_message': self.error_message,
+            # Encoded as ISO 8601 by the app's JSON provider
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
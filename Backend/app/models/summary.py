@@ -0,0 +1,32 @@
+from mongoengine import Document, StringField, IntField, DictField
+
+class ReadmissionSummary(Document):
+    """
+    Pre-aggregated counter for one value of one dimension, kept current
+    with $inc as patients and predictions are written
+    """
+    # primary_diagnosis, discharge_to, age_band, or risk_day for prediction counts
+    dimension = StringField(required=True)
+    key = StringField(required=True)
+    patients = IntField(default=0)
+    readmitted = IntField(default=0)
+    # risk_day only: predictions per risk level
+    risk_counts = DictField()
+
+    meta = {
+        'collection': 'readmission_summaries',
+        'indexes': [
+            {'fields': ('dimension', 'key'), 'unique': True}
+        ]
+    }
+
+    def to_dict(self) -> dict:
+        """Convert summary counter to dictionary"""
+        if self.dimension == 'risk_day':
+            return {'day': self.key, **{level: self.risk_counts.get(level, 0) for level in ('Low', 'Medium', 'High')}}
+        return {
+            'key': self.key,
+            'patients': self.patients,
+            'readmitted': self.readmitted,
+            'readmission_rate': self.readmitted / self.patients if self.patients else None
+        }
@@ -1,5 +1,6 @@
 from mongoengine import Document, StringField, EmailField, DateTimeField, BooleanField
 from datetime import datetime
+from typing import Optional, List
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class User(Document):
@@ -17,7 +18,9 @@ class User(Document):
         'indexes': [
             'username',
             'email',
-            'role'
+            'role',
+            # Listing ETag: latest updated_at
+            '-updated_at'
         ]
     }
 
@@ -38,13 +41,35 @@ class User(Document):
             'full_name': self.full_name,
             'role': self.role,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            # Encoded as ISO 8601 by the app's JSON provider
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
+    @staticmethod
+    def raw_to_dict(document: dict, fields: Optional[List[str]] = None) -> dict:
+        """to_dict for a raw, possibly projected, document; with fields, only those"""
+        names = fields or USER_FIELD_SOURCES
+        defaults = {'role': 'user', 'is_active': True}
+        return {name: str(document['_id']) if name == 'id' else document.get(name, defaults.get(name)) for name in names}
+
     def save(self, *args, **kwargs):
         """Update timestamp on save"""
         if not self.created_at:
             self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
-        return super(User, self).save(*args, **kwargs) 
\ No newline at end of file
+        return super(User, self).save(*args, **kwargs) 
+
+
+# Response field -> stored fields it is built from; the fields= allowlist.
+# password_hash is never selectable.
+USER_FIELD_SOURCES = {
+    'id': ['_id'],
+    'username': ['username'],
+    'email': ['email'],
+    'full_name': ['full_name'],
+    'role': ['role'],
+    'is_active': ['is_active'],
+    'created_at': ['created_at'],
+    'updated_at': ['updated_at']
+}
@@ -0,0 +1,39 @@
+from flask import Blueprint, jsonify, request
+from app.controllers.analytics import AnalyticsController
+from app.middleware.auth import token_required, doctor_required
+from app.utils.rate_limit import limiter
+from http import HTTPStatus
+
+bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
+
+@bp.route('/readmissions', methods=['GET'])
+@token_required
+@doctor_required
+@limiter.limit()
+def get_readmission_rates():
+    """
+    Readmission rates by primary_diagnosis, discharge_to or age_band (?by=)
+    """
+    try:
+        response, status_code = AnalyticsController.get_readmission_rates(
+            request.args.get('by', 'primary_diagnosis')
+        )
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@bp.route('/risk-levels', methods=['GET'])
+@token_required
+@doctor_required
+@limiter.limit()
+def get_risk_level_counts():
+    """
+    Daily prediction counts per risk level (?from=&to= ISO dates)
+    """
+    try:
+        response, status_code = AnalyticsController.get_risk_level_counts(
+            request.args.get('from'), request.args.get('to')
+        )
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
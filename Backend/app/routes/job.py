@@ -0,0 +1,76 @@
+from flask import Blueprint, Response, jsonify, request, current_app
+from app.controllers.job import JobController, stream_files
+from app.middleware.auth import token_required, doctor_required
+from app.utils.rate_limit import limiter
+from http import HTTPStatus
+
+bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+@bp.route('/score', methods=['POST'])
+@token_required
+@doctor_required
+@limiter.limit('batch')
+def submit_scoring_job():
+    """
+    Queue a bulk scoring job (doctors only)
+    Body filters: gender, primary_diagnosis, discharge_to (string or list),
+    created_after, created_before (ISO dates), medical_record_numbers
+    """
+    try:
+        response, status_code = JobController.submit_scoring_job(
+            request.get_json(silent=True),
+            request.current_user,
+            current_app.config['JOB_SHARD_SIZE'],
+            current_app.config['JOB_MAX_ACTIVE_PER_USER']
+        )
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@bp.route('/<job_id>', methods=['GET'])
+@token_required
+@doctor_required
+@limiter.limit()
+def get_job(job_id):
+    """
+    Poll a job's status and progress
+    """
+    try:
+        response, status_code = JobController.get_job(job_id, request.current_user)
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@bp.route('/<job_id>/cancel', methods=['POST'])
+@token_required
+@doctor_required
+@limiter.limit()
+def cancel_job(job_id):
+    """
+    Cancel a queued or running job
+    """
+    try:
+        response, status_code = JobController.cancel_job(job_id, request.current_user)
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@bp.route('/<job_id>/results', methods=['GET'])
+@token_required
+@doctor_required
+@limiter.limit()
+def download_results(job_id):
+    """
+    Stream a completed job's results as NDJSON, one patient per line
+    """
+    try:
+        paths, status_code = JobController.get_results(
+            job_id, request.current_user, current_app.config['JOB_RESULTS_DIR']
+        )
+        if status_code != HTTPStatus.OK:
+            return jsonify(paths), status_code
+        response = Response(stream_files(paths), mimetype='application/x-ndjson')
+        response.headers['Content-Disposition'] = f'attachment; filename="scoring-job-{job_id}.ndjson"'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -1,4 +1,7 @@
 from flask import Blueprint, jsonify
+from app.middleware.auth import token_required, admin_required
+from app.utils.db_monitor import db_monitor
+from http import HTTPStatus
 
 bp = Blueprint('main', __name__)
 
@@ -8,4 +11,16 @@ def index():
 
 @bp.route('/health')
 def health_check():
-    return jsonify({"status": "healthy"}) 
\ No newline at end of file
+    return jsonify({"status": "healthy"})
+
+@bp.route('/api/db/stats', methods=['GET'])
+@token_required
+@admin_required
+def get_db_stats():
+    """
+    Database round trips and time per route for this worker (admin only)
+    """
+    try:
+        return jsonify(db_monitor.stats()), HTTPStatus.OK
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -0,0 +1,54 @@
+from flask import Blueprint, jsonify, request, current_app
+from app.controllers.patient import PatientController, parse_bulk_payload
+from app.middleware.auth import token_required, doctor_required
+from app.utils.rate_limit import limiter
+from http import HTTPStatus
+
+bp = Blueprint('patients', __name__, url_prefix='/api/patients')
+
+@bp.route('/bulk', methods=['POST'])
+@token_required
+@doctor_required
+@limiter.limit('batch')
+def bulk_upsert_patients():
+    """
+    Upsert patients by medical record number (doctors only)
+    Accepts a JSON array or NDJSON (application/x-ndjson)
+    Rows may give admission_date, discharge_date and readmission_date in
+    place of days_in_hospital and readmitted
+    """
+    try:
+        try:
+            rows = parse_bulk_payload(request.get_data(cache=False))
+        except ValueError as e:
+            return jsonify({'error': f"Invalid payload: {str(e)}"}), HTTPStatus.BAD_REQUEST
+
+        max_rows = current_app.config['BULK_MAX_ROWS']
+        if len(rows) > max_rows:
+            return jsonify({'error': f"At most {max_rows} rows per request"}), HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+        response, status_code = PatientController.bulk_upsert(
+            rows, request.current_user, current_app.config['BULK_BATCH_SIZE']
+        )
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@bp.route('/at-risk', methods=['GET'])
+@token_required
+@doctor_required
+@limiter.limit()
+def get_patients_at_risk():
+    """
+    Patients at a risk level from the scoring job (doctors only)
+    Query params: level (default High), limit, min_probability
+    """
+    try:
+        response, status_code = PatientController.get_patients_at_risk(
+            level=request.args.get('level', 'High'),
+            limit=request.args.get('limit', 100, type=int),
+            min_probability=request.args.get('min_probability', type=float)
+        )
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
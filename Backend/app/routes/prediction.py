@@ -1,6 +1,10 @@
 from flask import Blueprint, jsonify, request
 from app.controllers.prediction import PredictionController
-from app.middleware.auth import token_required, doctor_required
+from app.middleware.auth import token_required, doctor_required, admin_required
+from app.utils.rate_limit import limiter
+from app.utils.http_cache import is_not_modified, not_modified_response, with_etag
+from app.utils.fields import parse_fields
+from app.models.prediction import PREDICTION_FIELD_SOURCES
 from http import HTTPStatus
 
 bp = Blueprint('predictions', __name__, url_prefix='/api/predictions')
@@ -8,56 +12,108 @@ bp = Blueprint('predictions', __name__, url_prefix='/api/predictions')
 @bp.route('/', methods=['POST'])
 @token_required
 @doctor_required
+@limiter.limit('predict')
 def create_prediction():
     """
     Create a new prediction (doctors only)
     """
     try:
         data = request.get_json()
-        # Add current user to the request data
-        data['user_id'] = str(request.current_user.id)
-        response, status_code = PredictionController.process_prediction(data)
+        response, status_code = PredictionController.process_prediction(data, request.current_user)
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@bp.route('/patient/<identifier>', methods=['POST'])
+@token_required
+@doctor_required
+@limiter.limit('predict')
+def create_patient_prediction(identifier):
+    """
+    Predict for a stored patient by id or medical record number (doctors only)
+    """
+    try:
+        response, status_code = PredictionController.predict_for_patient(identifier, request.current_user)
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@bp.route('/stats', methods=['GET'])
+@token_required
+@admin_required
+def get_serving_stats():
+    """
+    Prediction path counters for this worker (admin only)
+    """
+    try:
+        response, status_code = PredictionController.get_serving_stats()
         return jsonify(response), status_code
     except Exception as e:
         return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 @bp.route('/history/<user_id>', methods=['GET'])
 @token_required
+@limiter.limit()
 def get_prediction_history(user_id):
     """
     Get prediction history for a user
     Users can only view their own predictions
     Doctors and admins can view any user's predictions
+    ?fields=id,risk_level,created_at returns only those fields
     """
     try:
         current_user = request.current_user
         if str(current_user.id) != user_id and current_user.role not in ['doctor', 'admin']:
             return jsonify({'error': 'Unauthorized'}), HTTPStatus.FORBIDDEN
 
-        response, status_code = PredictionController.get_prediction_history(user_id)
-        return jsonify(response), status_code
+        fields, error = parse_fields(request.args.get('fields'), PREDICTION_FIELD_SOURCES)
+        if error:
+            return jsonify({'error': error}), HTTPStatus.BAD_REQUEST
+
+        # Answer repeat polls from the index before loading any predictions
+        etag = PredictionController.get_prediction_history_etag(user_id, fields)
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+
+        response, status_code = PredictionController.get_prediction_history(user_id, fields)
+        return with_etag(jsonify(response), etag, status_code)
     except Exception as e:
         return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 @bp.route('/<prediction_id>', methods=['GET'])
 @token_required
+@limiter.limit()
 def get_prediction(prediction_id):
     """
     Get a specific prediction
     Users can only view their own predictions
     Doctors and admins can view any prediction
+    ?fields= selects the returned fields
     """
     try:
-        response, status_code = PredictionController.get_prediction_by_id(prediction_id)
+        current_user = request.current_user
+
+        fields, error = parse_fields(request.args.get('fields'), PREDICTION_FIELD_SOURCES)
+        if error:
+            return jsonify({'error': error}), HTTPStatus.BAD_REQUEST
+
+        # Authorize and revalidate from a projection before loading the prediction
+        validator = PredictionController.get_prediction_validator(prediction_id, fields)
+        if validator:
+            if str(current_user.id) != validator['user_id'] and current_user.role not in ['doctor', 'admin']:
+                return jsonify({'error': 'Unauthorized'}), HTTPStatus.FORBIDDEN
+            if is_not_modified(validator['etag']):
+                return not_modified_response(validator['etag'])
+
+        response, status_code = PredictionController.get_prediction_by_id(prediction_id, fields)
         
-        # Check authorization
+        # Check authorization; user_id may not be among the selected fields
         if status_code == HTTPStatus.OK:
-            current_user = request.current_user
-            prediction_user_id = response.get('user_id')
+            prediction_user_id = validator['user_id'] if validator else response.get('user_id')
             
             if str(current_user.id) != prediction_user_id and current_user.role not in ['doctor', 'admin']:
                 return jsonify({'error': 'Unauthorized'}), HTTPStatus.FORBIDDEN
         
-        return jsonify(response), status_code
+        return with_etag(jsonify(response), validator and validator['etag'], status_code)
     except Exception as e:
         return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR 
\ No newline at end of file
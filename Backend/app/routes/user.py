@@ -2,10 +2,15 @@ from flask import Blueprint, jsonify, request
 from app.controllers.user import UserController
 from http import HTTPStatus
 from app.middleware.auth import token_required, admin_required
+from app.utils.rate_limit import limiter
+from app.utils.http_cache import is_not_modified, not_modified_response, with_etag
+from app.utils.fields import parse_fields
+from app.models.user import USER_FIELD_SOURCES
 
 bp = Blueprint('users', __name__, url_prefix='/api/users')
 
 @bp.route('/register', methods=['POST'])
+@limiter.limit('auth')
 def register():
     """Register a new user"""
     try:
@@ -16,6 +21,7 @@ def register():
         return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 @bp.route('/login', methods=['POST'])
+@limiter.limit('auth')
 def login():
     """Login user and return token"""
     try:
@@ -26,6 +32,7 @@ def login():
         return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 @bp.route('/verify-token', methods=['POST'])
+@limiter.limit('auth')
 def verify_token():
     """Verify JWT token"""
     try:
@@ -42,26 +49,41 @@ def verify_token():
 @bp.route('/', methods=['GET'])
 @token_required
 @admin_required
+@limiter.limit()
 def get_users():
-    """Get all users (admin only)"""
+    """Get all users (admin only); ?fields=username,role returns only those fields"""
     try:
-        response, status_code = UserController.get_all_users()
-        return jsonify(response), status_code
+        fields, error = parse_fields(request.args.get('fields'), USER_FIELD_SOURCES)
+        if error:
+            return jsonify({'error': error}), HTTPStatus.BAD_REQUEST
+
+        etag = UserController.get_all_users_etag(fields)
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+
+        response, status_code = UserController.get_all_users(fields)
+        return with_etag(jsonify(response), etag, status_code)
     except Exception as e:
         return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 @bp.route('/<user_id>', methods=['GET'])
 @token_required
+@limiter.limit()
 def get_user(user_id):
-    """Get user by ID"""
+    """Get user by ID; ?fields= selects the returned fields"""
     try:
-        response, status_code = UserController.get_user_by_id(user_id)
+        fields, error = parse_fields(request.args.get('fields'), USER_FIELD_SOURCES)
+        if error:
+            return jsonify({'error': error}), HTTPStatus.BAD_REQUEST
+
+        response, status_code = UserController.get_user_by_id(user_id, fields)
         return jsonify(response), status_code
     except Exception as e:
         return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 @bp.route('/<user_id>', methods=['PUT'])
 @token_required
+@limiter.limit()
 def update_user(user_id):
     """Update user"""
     try:
@@ -79,6 +101,7 @@ def update_user(user_id):
 @bp.route('/<user_id>', methods=['DELETE'])
 @token_required
 @admin_required
+@limiter.limit()
 def delete_user(user_id):
     """Delete user (admin only)"""
     try:
@@ -0,0 +1,190 @@
+import logging
+from collections import Counter
+from itertools import chain
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable, Tuple
+import numpy as np
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.models.patient import Patient
+from app.models.prediction import Prediction
+from app.models.summary import ReadmissionSummary
+from app.utils.archive import iter_archived
+
+logger = logging.getLogger(__name__)
+
+PATIENT_DIMENSIONS = ['primary_diagnosis', 'discharge_to', 'age_band']
+# Fields a patient's counters depend on
+SUMMARY_FIELDS = ['primary_diagnosis', 'discharge_to', 'age', 'readmitted']
+
+AGE_BAND_EDGES = [18, 40, 65, 80]
+AGE_BAND_LABELS = ['0-17', '18-39', '40-64', '65-79', '80+']
+
+
+def age_band(age: Any) -> Optional[str]:
+    """Band label for an age"""
+    if age is None:
+        return None
+    return AGE_BAND_LABELS[int(np.digitize(age, AGE_BAND_EDGES))]
+
+
+def patient_deltas(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Counter:
+    """
+    Counter changes when a patient goes from before to after
+    (None for a patient that did not exist / no longer exists)
+    """
+    deltas = Counter()
+    for state, sign in ((before, -1), (after, 1)):
+        if not state:
+            continue
+        readmitted = 1 if state.get('readmitted') else 0
+        keys = {
+            'primary_diagnosis': state.get('primary_diagnosis'),
+            'discharge_to': state.get('discharge_to'),
+            'age_band': age_band(state.get('age'))
+        }
+        for dimension, key in keys.items():
+            if key is None:
+                continue
+            deltas[(dimension, str(key), 'patients')] += sign
+            deltas[(dimension, str(key), 'readmitted')] += sign * readmitted
+    return deltas
+
+
+def risk_delta(created_at: datetime, risk_level: str) -> Counter:
+    """Counter change for one stored prediction"""
+    return Counter({('risk_day', created_at.strftime('%Y-%m-%d'), f'risk_counts.{risk_level}'): 1})
+
+
+def apply_deltas(deltas: Counter) -> None:
+    """$inc every non-zero counter with one unordered bulk write"""
+    increments: Dict[Tuple[str, str], Dict[str, int]] = {}
+    for (dimension, key, field), amount in deltas.items():
+        if amount:
+            increments.setdefault((dimension, key), {})[field] = amount
+    if not increments:
+        return
+    ReadmissionSummary._get_collection().bulk_write([
+        UpdateOne({'dimension': dimension, 'key': key}, {'$inc': fields}, upsert=True)
+        for (dimension, key), fields in increments.items()
+    ], ordered=False)
+
+
+def load_summary_state(medical_record_numbers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Stored summary fields of patients by record number, in one projected read"""
+    documents = Patient._get_collection().find(
+        {'medical_record_number': {'$in': list(medical_record_numbers)}},
+        {'_id': 0, 'medical_record_number': 1, **{field: 1 for field in SUMMARY_FIELDS}}
+    )
+    return {document['medical_record_number']: document for document in documents}
+
+
+class SummaryMaintainer:
+    """Keeps readmission summaries current as documents are written through mongoengine"""
+
+    def init_app(self, app):
+        """Connect to document signals"""
+        from mongoengine import signals
+
+        signals.pre_save.connect(self._before_patient_save, sender=Patient, weak=False)
+        signals.post_save.connect(self._after_patient_save, sender=Patient, weak=False)
+        signals.post_delete.connect(self._after_patient_delete, sender=Patient, weak=False)
+        signals.post_save.connect(self._after_prediction_save, sender=Prediction, weak=False)
+        app.extensions['readmission_summaries'] = self
+
+    def _before_patient_save(self, sender, document, **kwargs):
+        # One projected read of the stored state so the old counters can be decremented
+        before = None
+        if document.pk is not None:
+            before = Patient._get_collection().find_one({'_id': document.pk}, {field: 1 for field in SUMMARY_FIELDS})
+        document._summary_before = before
+
+    def _after_patient_save(self, sender, document, **kwargs):
+        try:
+            after = {field: getattr(document, field) for field in SUMMARY_FIELDS}
+            apply_deltas(patient_deltas(getattr(document, '_summary_before', None), after))
+        except Exception as e:
+            # Counters are rebuildable; never fail the write that triggered them
+            logger.warning(f"Failed to update readmission summaries: {str(e)}")
+
+    def _after_patient_delete(self, sender, document, **kwargs):
+        try:
+            apply_deltas(patient_deltas({field: getattr(document, field) for field in SUMMARY_FIELDS}, None))
+        except Exception as e:
+            logger.warning(f"Failed to update readmission summaries: {str(e)}")
+
+    def _after_prediction_save(self, sender, document, created=False, **kwargs):
+        if not created or document.status != 'completed':
+            return
+        try:
+            apply_deltas(risk_delta(document.created_at, document.risk_level))
+        except Exception as e:
+            logger.warning(f"Failed to update risk summaries: {str(e)}")
+
+
+def rebuild_summaries(batch_size: int = 10000) -> Dict[str, int]:
+    """
+    Recompute every counter in one pass over patients and predictions,
+    archived ones included, then swap the result in atomically
+    """
+    deltas = Counter()
+    n_patients = 0
+    for document in Patient.objects.only(*SUMMARY_FIELDS).batch_size(batch_size).as_pymongo():
+        deltas.update(patient_deltas(None, document))
+        n_patients += 1
+
+    n_predictions = 0
+    predictions = (Prediction.objects(status='completed')
+                   .only('created_at', 'risk_level')
+                   .batch_size(batch_size)
+                   .as_pymongo())
+    for document in chain(predictions, (document for document in iter_archived() if document.get('status') == 'completed')):
+        if document.get('created_at') and document.get('risk_level'):
+            deltas.update(risk_delta(document['created_at'], document['risk_level']))
+            n_predictions += 1
+
+    documents = {}
+    for (dimension, key, field), amount in deltas.items():
+        document = documents.setdefault((dimension, key), {
+            '_id': ObjectId(), 'dimension': dimension, 'key': key,
+            'patients': 0, 'readmitted': 0, 'risk_counts': {}
+        })
+        if field.startswith('risk_counts.'):
+            document['risk_counts'][field.split('.', 1)[1]] = amount
+        else:
+            document[field] = amount
+
+    collection = ReadmissionSummary._get_collection()
+    staging = collection.database[f"{collection.name}_rebuild"]
+    staging.drop()
+    if documents:
+        staging.insert_many(list(documents.values()))
+    staging.create_index([('dimension', 1), ('key', 1)], unique=True)
+    if documents:
+        staging.rename(collection.name, dropTarget=True)
+    else:
+        collection.delete_many({})
+    return {'patients': n_patients, 'predictions': n_predictions, 'counters': len(documents)}
+
+
+summaries = SummaryMaintainer()
+
+
+def main():
+    """Rebuild readmission summaries from scratch"""
+    from mongoengine import connect
+    from app.config import Config
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        connect(**Config.MONGODB_SETTINGS)
+        result = rebuild_summaries()
+        logger.info(f"Rebuilt {result['counters']} counters from {result['patients']} patients "
+                    f"and {result['predictions']} predictions")
+    except Exception as e:
+        logger.error(f"Error rebuilding summaries: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
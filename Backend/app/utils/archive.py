@@ -0,0 +1,134 @@
+import zlib
+import time
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable
+import bson
+from bson import ObjectId, Binary
+from pymongo import UpdateOne
+from app.models.prediction import Prediction
+from app.models.prediction_archive import PredictionArchive
+
+logger = logging.getLogger(__name__)
+
+# zlib level for archive chunks: written once, read rarely
+COMPRESSION_LEVEL = 6
+
+
+def month_key(created_at: datetime) -> str:
+    return created_at.strftime('%Y-%m')
+
+
+def encode_chunk(documents: List[Dict[str, Any]]) -> Binary:
+    """Compress raw prediction documents into one chunk"""
+    return Binary(zlib.compress(bson.encode({'predictions': documents}), COMPRESSION_LEVEL))
+
+
+def decode_chunks(chunks: Iterable[bytes]) -> List[Dict[str, Any]]:
+    """Raw prediction documents of a bucket's chunks"""
+    documents = []
+    for chunk in chunks:
+        documents.extend(bson.decode(zlib.decompress(chunk))['predictions'])
+    return documents
+
+
+def archive_predictions(older_than: datetime, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Move predictions created before older_than into patient/month buckets,
+    oldest first, one batch at a time. Each batch is written to the archive
+    before it is deleted from the hot collection, and ids already in a bucket
+    are skipped, so an interrupted pass is safely re-run.
+    """
+    hot = Prediction._get_collection()
+    archive = PredictionArchive._get_collection()
+    archived = batches = 0
+    while True:
+        documents = list(hot.find({'created_at': {'$lt': older_than}}).sort('created_at', 1).limit(batch_size))
+        if not documents:
+            break
+        ids = [document['_id'] for document in documents]
+        done = set()
+        for bucket in archive.find({'prediction_ids': {'$in': ids}}, {'prediction_ids': 1}):
+            done.update(bucket['prediction_ids'])
+
+        buckets: Dict[tuple, List[Dict[str, Any]]] = {}
+        for document in documents:
+            if document['_id'] not in done:
+                buckets.setdefault((document['patient'], month_key(document['created_at'])), []).append(document)
+
+        operations = [
+            UpdateOne({'patient': patient, 'month': month}, {
+                '$push': {'chunks': encode_chunk(group)},
+                '$addToSet': {
+                    'users': {'$each': list({document['user'] for document in group})},
+                    'prediction_ids': {'$each': [document['_id'] for document in group]}
+                },
+                '$inc': {'count': len(group)},
+                '$min': {'first_created_at': group[0]['created_at']},
+                '$max': {'last_created_at': group[-1]['created_at']}
+            }, upsert=True)
+            for (patient, month), group in buckets.items()
+        ]
+        if operations:
+            archive.bulk_write(operations, ordered=False)
+        hot.delete_many({'_id': {'$in': ids}})
+        archived += len(documents) - len(done & set(ids))
+        batches += 1
+    return {'archived': archived, 'batches': batches}
+
+
+def archived_history(user_id: str) -> List[Dict[str, Any]]:
+    """A user's archived predictions as raw documents, newest first"""
+    user = ObjectId(user_id)
+    documents = []
+    for bucket in PredictionArchive._get_collection().find({'users': user}, {'chunks': 1}):
+        documents.extend(document for document in decode_chunks(bucket['chunks']) if document['user'] == user)
+    documents.sort(key=lambda document: document['created_at'], reverse=True)
+    return documents
+
+
+def find_archived(prediction_id: str) -> Optional[Dict[str, Any]]:
+    """One archived prediction as a raw document, or None"""
+    identifier = ObjectId(prediction_id)
+    bucket = PredictionArchive._get_collection().find_one({'prediction_ids': identifier}, {'chunks': 1})
+    if bucket is None:
+        return None
+    return next((document for document in decode_chunks(bucket['chunks']) if document['_id'] == identifier), None)
+
+
+def iter_archived(batch_size: int = 100) -> Iterable[Dict[str, Any]]:
+    """Every archived prediction as a raw document"""
+    for bucket in PredictionArchive._get_collection().find({}, {'chunks': 1}).batch_size(batch_size):
+        yield from decode_chunks(bucket['chunks'])
+
+
+def main():
+    """Archive old predictions, once or every --interval seconds"""
+    from mongoengine import connect
+    from app.config import Config
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Move old predictions into the compressed archive')
+    parser.add_argument('--older-than-days', type=int, default=Config.PREDICTION_ARCHIVE_AFTER_DAYS)
+    parser.add_argument('--batch-size', type=int, default=Config.PREDICTION_ARCHIVE_BATCH_SIZE)
+    parser.add_argument('--interval', type=float, help='Repeat every this many seconds instead of exiting')
+    args = parser.parse_args()
+
+    try:
+        connect(**Config.MONGODB_SETTINGS)
+        PredictionArchive.ensure_indexes()
+        while True:
+            cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+            result = archive_predictions(cutoff, args.batch_size)
+            logger.info(f"Archived {result['archived']} predictions created before {cutoff:%Y-%m-%d}")
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+    except Exception as e:
+        logger.error(f"Error archiving predictions: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import numpy as np
+from typing import Optional
+
+
+class CompactForest:
+    """
+    Binary random forest flattened into contiguous arrays.
+
+    Leaves point to themselves, so every row walks a fixed number of
+    steps and a whole batch is scored with a few vectorized gathers per
+    level instead of a Python loop over trees. Thresholds are stored as
+    the largest float32 not above the original, which keeps splits exact
+    for the float32 inputs trees compare against.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, depth: int, classes: np.ndarray,
+                 feature_importances: np.ndarray):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.classes_ = classes
+        self.n_features_in_ = len(feature_importances)
+        # Kept from the full forest; they drive contributing factors, not scores
+        self.feature_importances_ = feature_importances
+
+    @classmethod
+    def from_forest(cls, forest, n_trees: Optional[int] = None, max_depth: Optional[int] = None,
+                    leaf_dtype=np.float16) -> 'CompactForest':
+        """Flatten the first n_trees of a fitted forest, truncated to max_depth"""
+        if len(forest.classes_) != 2:
+            raise ValueError("CompactForest supports binary classifiers only")
+        trees = forest.estimators_[:n_trees] if n_trees else forest.estimators_
+
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        depth = 0
+        for estimator in trees:
+            tree = estimator.tree_
+            proba = tree.value[:, 0, :] / tree.value[:, 0, :].sum(axis=1, keepdims=True)
+            roots.append(len(feature))
+            # Depth-first copy; nodes at max_depth become leaves scored by their own value
+            stack = [(0, 0, None, False)]
+            while stack:
+                node, node_depth, parent, is_right = stack.pop()
+                new_id = len(feature)
+                if parent is not None:
+                    (right if is_right else left)[parent] = new_id
+                is_leaf = tree.children_left[node] < 0 or (max_depth is not None and node_depth >= max_depth)
+                feature.append(0 if is_leaf else tree.feature[node])
+                threshold.append(0.0 if is_leaf else tree.threshold[node])
+                left.append(new_id)
+                right.append(new_id)
+                value.append(proba[node, 1])
+                depth = max(depth, node_depth)
+                if not is_leaf:
+                    stack.append((tree.children_right[node], node_depth + 1, new_id, True))
+                    stack.append((tree.children_left[node], node_depth + 1, new_id, False))
+
+        threshold = np.asarray(threshold, dtype=np.float64)
+        threshold32 = threshold.astype(np.float32)
+        rounded_up = threshold32.astype(np.float64) > threshold
+        threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+
+        return cls(
+            feature=np.asarray(feature, dtype=np.int16),
+            threshold=threshold32,
+            left=np.asarray(left, dtype=np.int32),
+            right=np.asarray(right, dtype=np.int32),
+            value=np.asarray(value, dtype=leaf_dtype),
+            roots=np.asarray(roots, dtype=np.int32),
+            depth=depth,
+            classes=forest.classes_,
+            feature_importances=forest.feature_importances_
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def tree_proba(self, X: np.ndarray, chunk_size: int = 4096) -> np.ndarray:
+        """Positive-class probability of every tree, shape (n_trees, n_samples)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        out = np.empty((self.n_trees, len(X)), dtype=np.float32)
+        for start in range(0, len(X), chunk_size):
+            block = X[start:start + chunk_size]
+            rows = np.arange(len(block))[:, np.newaxis]
+            node = np.broadcast_to(self.roots, (len(block), self.n_trees))
+            for _ in range(self.depth):
+                go_left = block[rows, self.feature[node]] <= self.threshold[node]
+                node = np.where(go_left, self.left[node], self.right[node])
+            out[:, start:start + len(block)] = self.value[node].T
+        return out
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities averaged over trees, like RandomForestClassifier"""
+        positive = self.tree_proba(X).mean(axis=0, dtype=np.float64)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
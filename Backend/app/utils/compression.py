@@ -0,0 +1,67 @@
+import gzip
+from flask import request, current_app
+
+try:
+    import brotli
+except ImportError:  # Optional: br is only offered when installed
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/html',
+    'text/plain',
+    'text/csv',
+    'application/x-ndjson'
+}
+
+
+def choose_encoding() -> str:
+    """Pick the best encoding the client accepts, preferring br over gzip"""
+    accept = request.accept_encodings
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_quality = None, 0
+    for encoding in candidates:
+        quality = accept[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_response(response):
+    """Compress eligible responses above the configured size threshold"""
+    if (response.status_code < 200 or response.status_code >= 300
+            or response.status_code == 204
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    data = response.get_data()
+    if len(data) < current_app.config.get('COMPRESS_MIN_SIZE', 1024):
+        return response
+
+    encoding = choose_encoding()
+    if encoding == 'br':
+        body = brotli.compress(data, quality=current_app.config.get('COMPRESS_BR_QUALITY', 4))
+    elif encoding == 'gzip':
+        body = gzip.compress(data, compresslevel=current_app.config.get('COMPRESS_LEVEL', 6), mtime=0)
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+
+    # A compressed body is a different representation: give it its own strong ETag
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+
+    return response
+
+
+def init_compression(app):
+    """Register response compression on the app"""
+    app.after_request(compress_response)
@@ -32,7 +32,7 @@ class Config:
         }
     
     # ML Model Configuration
-    MODEL_PATH = os.path.join('app', 'ml_models', 'readmission_model.pkl')
+    MODEL_PATH = os.getenv('MODEL_PATH', os.path.join('app', 'ml_models', 'readmission_model.pkl'))
     MODEL_VERSION = os.getenv('MODEL_VERSION', '1.0.0')
     
     # Feature Configuration
@@ -5,6 +5,7 @@ import joblib
 import os
 from datetime import datetime
 from .config import Config
+from .validation import FeatureValidator
 
 class DataPreprocessor:
     def __init__(self):
@@ -17,6 +18,7 @@ class DataPreprocessor:
         self.categorical_features = ['gender', 'primary_diagnosis', 'discharge_to']
         self.numerical_features = ['age', 'num_procedures', 'days_in_hospital', 'comorbidity_score']
         self.required_features = self.numerical_features + self.categorical_features
+        self.validator = FeatureValidator(self.label_encoders)
 
     def _load_scaler(self) -> StandardScaler:
         """Load the fitted StandardScaler"""
@@ -53,36 +55,10 @@ class DataPreprocessor:
         if missing_features:
             return False, f"Missing required features: {', '.join(missing_features)}"
         
-        # Validate feature values
-        validation_errors = []
-        
-        # Numerical validations
-        if not 0 <= data['age'] <= 120:
-            validation_errors.append("Age must be between 0 and 120")
-            
-        if data['num_procedures'] < 0:
-            validation_errors.append("Number of procedures cannot be negative")
-            
-        if data['days_in_hospital'] < 0:
-            validation_errors.append("Days in hospital cannot be negative")
-            
-        if data['comorbidity_score'] < 0:
-            validation_errors.append("Comorbidity score cannot be negative")
-        
-        # Categorical validations
-        if data['gender'] not in self.label_encoders['gender'].classes_:
-            valid_genders = ', '.join(self.label_encoders['gender'].classes_)
-            validation_errors.append(f"Gender must be one of: {valid_genders}")
-            
-        if data['primary_diagnosis'] not in self.label_encoders['primary_diagnosis'].classes_:
-            validation_errors.append("Invalid primary diagnosis code")
-            
-        if data['discharge_to'] not in self.label_encoders['discharge_to'].classes_:
-            valid_destinations = ', '.join(self.label_encoders['discharge_to'].classes_)
-            validation_errors.append(f"Discharge destination must be one of: {valid_destinations}")
-        
+        # Type, range and category checks compiled from VALIDATION_RULES
+        validation_errors = self.validator.validate_row(data)
         if validation_errors:
-            return False, "; ".join(validation_errors)
+            return False, "; ".join(validation_errors.values())
         
         return True, ""
 
@@ -114,6 +90,24 @@ class DataPreprocessor:
         
         return X_scaled
 
+    def preprocess_frame(self, frame) -> np.ndarray:
+        """
+        Preprocess validated rows of a DataFrame at once; same encoding and
+        scaling as preprocess_features
+        """
+        X = np.empty((len(frame), len(self.required_features)), dtype=np.float64)
+        for i, feature in enumerate(self.numerical_features):
+            X[:, i] = frame[feature].to_numpy(dtype=np.float64)
+        for i, feature in enumerate(self.categorical_features, start=len(self.numerical_features)):
+            classes = self.label_encoders[feature].classes_
+            values = frame[feature].to_numpy(dtype=object)
+            codes = np.searchsorted(classes, values)
+            known = (codes < len(classes)) & (classes[np.minimum(codes, len(classes) - 1)] == values)
+            if not known.all():
+                raise ValueError(f"Invalid value for {feature}: {values[~known][0]}. Valid values are: {classes}")
+            X[:, i] = codes
+        return self.scaler.transform(X)
+
     def get_contributing_factors(self, 
                                data: Dict[str, Any], 
                                feature_importances: np.ndarray,
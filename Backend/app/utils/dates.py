@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Formats accepted for clinical dates, in order of preference
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%Y/%m/%d",
+    "%d-%m-%Y",
+    "%m-%d-%Y"
+]
+# Formats that read the same text with day and month swapped
+DAY_MONTH_PAIRS = {
+    "%d/%m/%Y": "%m/%d/%Y",
+    "%m/%d/%Y": "%d/%m/%Y",
+    "%d-%m-%Y": "%m-%d-%Y",
+    "%m-%d-%Y": "%d-%m-%Y"
+}
+SAMPLE_SIZE = 1000
+READMISSION_WINDOW_DAYS = 30
+
+
+@dataclass
+class ParsedDates:
+    """A column parsed to datetime64, with the rows that need attention"""
+    values: np.ndarray
+    format: Optional[str]
+    invalid: np.ndarray
+    # Parsed, but day and month could be swapped and nothing in the column settles it
+    ambiguous: np.ndarray
+
+    def errors(self, field: str) -> Dict[int, str]:
+        """{row position: message} for invalid and ambiguous rows"""
+        errors = {int(row): f"{field} is not a recognised date" for row in np.flatnonzero(self.invalid)}
+        for row in np.flatnonzero(self.ambiguous):
+            errors[int(row)] = f"{field} is ambiguous: day and month could be either way round"
+        return errors
+
+
+def _as_strings(values: Any) -> pd.Series:
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    return series.astype('string').str.strip().replace('', pd.NA).reset_index(drop=True)
+
+
+def _parse(strings: pd.Series, fmt: str) -> pd.Series:
+    """Parse each distinct value once; admission columns repeat the same few thousand dates"""
+    codes, uniques = pd.factorize(strings)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=fmt, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    values = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+    present = codes >= 0
+    values[present] = parsed[codes[present]]
+    return pd.Series(values)
+
+
+def detect_format(values: Any, sample_size: int = SAMPLE_SIZE, dayfirst: bool = True) -> Tuple[Optional[str], bool]:
+    """
+    Pick the format that parses most of a sample of the column. Returns
+    (format, undecided) where undecided means a day-first and a month-first
+    format fit the sample equally well and dayfirst broke the tie.
+    """
+    strings = _as_strings(values).dropna()
+    if strings.empty:
+        return None, False
+    if len(strings) > sample_size:
+        strings = strings.sample(sample_size, random_state=0)
+
+    scores = {fmt: int(_parse(strings, fmt).notna().sum()) for fmt in DATE_FORMATS}
+    best = max(scores.values())
+    if best == 0:
+        return None, False
+    candidates = [fmt for fmt in DATE_FORMATS if scores[fmt] == best]
+    fmt = candidates[0]
+    undecided = DAY_MONTH_PAIRS.get(fmt) in candidates
+    if undecided and not dayfirst:
+        fmt = DAY_MONTH_PAIRS[fmt]
+    return fmt, undecided
+
+
+def parse_dates(values: Any, fmt: Optional[str] = None, dayfirst: bool = True,
+                sample_size: int = SAMPLE_SIZE) -> ParsedDates:
+    """
+    Parse a whole column to datetime64[ns] with one format, detected from a
+    sample unless given. When the sample cannot tell dd/mm from mm/dd, the
+    full column decides; if it cannot either, rows whose day and month could
+    be swapped are flagged ambiguous (and parsed per dayfirst).
+    """
+    strings = _as_strings(values)
+    missing = strings.isna().to_numpy()
+    undecided = False
+    if fmt is None:
+        fmt, undecided = detect_format(strings, sample_size, dayfirst)
+    if fmt is None:
+        return ParsedDates(np.full(len(strings), np.datetime64('NaT'), dtype='datetime64[ns]'),
+                           None, ~missing, np.zeros(len(strings), dtype=bool))
+
+    parsed = _parse(strings, fmt)
+    ambiguous = np.zeros(len(strings), dtype=bool)
+    if undecided:
+        swapped = _parse(strings, DAY_MONTH_PAIRS[fmt])
+        only_swapped = int((swapped.notna() & parsed.isna()).sum())
+        only_chosen = int((parsed.notna() & swapped.isna()).sum())
+        if only_swapped > only_chosen:
+            fmt, parsed, swapped = DAY_MONTH_PAIRS[fmt], swapped, parsed
+        if not (only_swapped or only_chosen):
+            ambiguous = (parsed.notna() & swapped.notna() & (parsed != swapped)).to_numpy()
+
+    values = parsed.to_numpy(dtype='datetime64[ns]')
+    return ParsedDates(values, fmt, ~missing & np.isnat(values), ambiguous)
+
+
+def days_between(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Whole days from start to end per row, like timedelta.days; NaN where either is missing"""
+    delta = np.asarray(end, dtype='datetime64[ns]') - np.asarray(start, dtype='datetime64[ns]')
+    days = np.floor_divide(delta.astype(np.int64), np.int64(86400 * 10**9)).astype(np.float64)
+    days[np.isnat(delta)] = np.nan
+    return days
+
+
+def readmission_window_end(discharge: np.ndarray, window_days: int = READMISSION_WINDOW_DAYS) -> np.ndarray:
+    """End of each row's readmission window"""
+    return np.asarray(discharge, dtype='datetime64[ns]') + np.timedelta64(window_days, 'D')
+
+
+def readmitted_within(discharge: np.ndarray, readmission: np.ndarray,
+                      window_days: int = READMISSION_WINDOW_DAYS) -> np.ndarray:
+    """Whether each readmission falls within window_days after discharge; False when either is missing"""
+    discharge = np.asarray(discharge, dtype='datetime64[ns]')
+    readmission = np.asarray(readmission, dtype='datetime64[ns]')
+    with np.errstate(invalid='ignore'):
+        return (~np.isnat(discharge) & ~np.isnat(readmission)
+                & (readmission >= discharge) & (readmission <= readmission_window_end(discharge, window_days)))
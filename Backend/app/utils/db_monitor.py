@@ -0,0 +1,176 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+from flask import g, request, has_request_context
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+# Its own logger, so slow commands can be routed to a separate file
+slow_logger = logging.getLogger('app.slow_queries')
+
+# Command fields that hold query values; everything else in a shape is structure
+FILTER_KEYS = ('filter', 'query', 'q')
+
+
+def redact(value: Any) -> Any:
+    """
+    Shape of a filter with every value replaced by '?': field names and
+    operators stay, patient data does not
+    """
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $or / $and branches keep their structure; value lists ($in) collapse
+        if value and all(isinstance(item, dict) for item in value):
+            return [redact(item) for item in value]
+        return ['?'] if value else []
+    return '?'
+
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """Redacted summary of a command: what ran against which collection, never the values"""
+    shape = {'command': command_name}
+    collection = command.get(command_name)
+    if isinstance(collection, str):
+        shape['collection'] = collection
+    for key in FILTER_KEYS:
+        if key in command:
+            shape['filter'] = redact(command[key])
+    if 'sort' in command:
+        shape['sort'] = dict(command['sort'])
+    if 'pipeline' in command:
+        shape['pipeline'] = [{stage: redact(args) if stage == '$match' else '...' for stage, args in step.items()}
+                             for step in command['pipeline']]
+    for key in ('updates', 'deletes'):
+        if command.get(key):
+            shape['filter'] = redact(command[key][0].get('q', {}))
+            shape['batch'] = len(command[key])
+    if 'documents' in command:
+        shape['batch'] = len(command['documents'])
+    return shape
+
+
+@dataclass
+class RequestDbStats:
+    """Database work done while serving one request"""
+    queries: int = 0
+    time_ms: float = 0.0
+    # (duration_ms, command_name, command), shaped only when reported
+    slowest_command: Optional[Tuple[float, str, Dict[str, Any]]] = None
+    started: Dict[int, Any] = field(default_factory=dict)
+
+    @property
+    def slowest(self) -> Optional[Dict[str, Any]]:
+        if self.slowest_command is None:
+            return None
+        duration_ms, command_name, command = self.slowest_command
+        return {**command_shape(command_name, command), 'duration_ms': round(duration_ms, 2)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'queries': self.queries, 'time_ms': round(self.time_ms, 2), 'slowest': self.slowest}
+
+
+class DbMonitor(monitoring.CommandListener):
+    """
+    pymongo command listener: counts each request's round trips and DB time
+    (lazy dereferences included, since they go through the same client),
+    logs commands slower than slow_ms with their redacted shape, and keeps
+    per-route totals for this worker.
+    """
+
+    def __init__(self, slow_ms: float = 100.0):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        # Commands in flight outside any request, for the slow log
+        self._started: Dict[int, Any] = {}
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self._registered = False
+
+    def init_app(self, app):
+        """Register the listener; must run before the Mongo client is created"""
+        self.slow_ms = app.config.get('DB_SLOW_COMMAND_MS', self.slow_ms)
+        if not self._registered:
+            monitoring.register(self)
+            self._registered = True
+        app.before_request(self._begin_request)
+        app.after_request(self._end_request)
+        app.extensions['db_monitor'] = self
+
+    def _current(self) -> Optional[RequestDbStats]:
+        return g.get('db_stats') if has_request_context() else None
+
+    def started(self, event):
+        stats = self._current()
+        pending = stats.started if stats is not None else self._started
+        # Only keep the command; it is redacted if and when it turns out slow
+        pending[event.request_id] = (event.command_name, event.command)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        stats = self._current()
+        pending = stats.started if stats is not None else self._started
+        command_name, command = pending.pop(event.request_id, (event.command_name, {}))
+        duration_ms = event.duration_micros / 1000.0
+
+        if stats is not None:
+            stats.queries += 1
+            stats.time_ms += duration_ms
+            if stats.slowest_command is None or duration_ms > stats.slowest_command[0]:
+                stats.slowest_command = (duration_ms, command_name, command)
+
+        if duration_ms >= self.slow_ms:
+            shape = command_shape(command_name, command)
+            route = self._route() if stats is not None else None
+            slow_logger.warning(f"Slow {command_name} ({duration_ms:.1f} ms) on {route or 'no request'}: {shape}")
+
+    def _route(self) -> str:
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        return f"{request.method} {rule}"
+
+    def _begin_request(self):
+        g.db_stats = RequestDbStats()
+
+    def _end_request(self, response):
+        stats = g.pop('db_stats', None)
+        if stats is None:
+            return response
+        response.headers.add('Server-Timing', f'db;dur={stats.time_ms:.1f};desc="{stats.queries} queries"')
+
+        route = self._route()
+        with self._lock:
+            totals = self._routes.setdefault(route, {
+                'requests': 0, 'queries': 0, 'time_ms': 0.0, 'max_queries': 0, 'max_time_ms': 0.0
+            })
+            totals['requests'] += 1
+            totals['queries'] += stats.queries
+            totals['time_ms'] += stats.time_ms
+            totals['max_queries'] = max(totals['max_queries'], stats.queries)
+            totals['max_time_ms'] = max(totals['max_time_ms'], stats.time_ms)
+        if stats.queries and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{route}: {stats.queries} queries, {stats.time_ms:.1f} ms, slowest {stats.slowest}")
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-route DB totals for this worker, most DB time first"""
+        with self._lock:
+            routes = {route: dict(totals) for route, totals in self._routes.items()}
+        for totals in routes.values():
+            totals['avg_queries'] = round(totals['queries'] / totals['requests'], 2)
+            totals['avg_time_ms'] = round(totals['time_ms'] / totals['requests'], 2)
+            totals['time_ms'] = round(totals['time_ms'], 2)
+            totals['max_time_ms'] = round(totals['max_time_ms'], 2)
+        ordered = sorted(routes.items(), key=lambda item: item[1]['time_ms'], reverse=True)
+        return {'slow_command_ms': self.slow_ms, 'routes': dict(ordered)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+db_monitor = DbMonitor()
@@ -0,0 +1,93 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+try:
+    from gevent import monkey as gevent_monkey
+    from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+except ImportError:
+    gevent_monkey = None
+
+
+class ExecutorBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class BoundedExecutor:
+    """
+    Fixed-size pool for CPU-bound work (inference, password hashing) with
+    a bounded queue in front of it. Callers block until their task is done;
+    once max_workers + max_pending tasks are in the system, new ones are
+    rejected instead of queueing without limit.
+
+    Under the async server (gevent), the pool uses native OS threads so CPU
+    work never stalls the event loop, while the calling request only yields.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._counts = {'completed': 0, 'failed': 0, 'rejected': 0}
+
+    def configure(self, max_workers: int, max_pending: int) -> None:
+        """Resize; takes effect when the pool is next created"""
+        with self._lock:
+            self.max_workers = max_workers
+            self.max_pending = max_pending
+            self._shutdown()
+
+    def _get_pool(self):
+        # Created on first use: after worker processes fork and after gevent patches threading
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if gevent_monkey is not None and gevent_monkey.is_module_patched('threading'):
+                        self._pool = NativeThreadPoolExecutor(self.max_workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+                    self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        return self._pool
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn on the pool and wait for its result"""
+        pool = self._get_pool()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self._counts['rejected'] += 1
+            raise ExecutorBusy(f"The {self.name} executor is saturated")
+        outcome = 'failed'
+        try:
+            result = pool.submit(fn, *args, **kwargs).result()
+            outcome = 'completed'
+            return result
+        finally:
+            slots.release()
+            with self._lock:
+                self._counts[outcome] += 1
+
+    def _shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        self._pool = None
+        self._slots = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'max_workers': self.max_workers, 'max_pending': self.max_pending, **self._counts}
+
+
+inference_executor = BoundedExecutor('inference', max_workers=os.cpu_count() or 1, max_pending=64)
+hashing_executor = BoundedExecutor('hashing', max_workers=2, max_pending=32)
+
+
+def init_executors(app):
+    """Size the executors from the app config"""
+    inference_executor.configure(app.config['INFERENCE_WORKERS'], app.config['EXECUTOR_MAX_PENDING'])
+    hashing_executor.configure(app.config['HASHING_WORKERS'], app.config['EXECUTOR_MAX_PENDING'])
+    app.extensions['executors'] = {'inference': inference_executor, 'hashing': hashing_executor}
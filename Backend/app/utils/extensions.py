@@ -1,33 +1,16 @@
-import os
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from flask_cors import CORS
 from flask_marshmallow import Marshmallow
 from flasgger import Swagger
-from limits.storage import RedisStorage, MemoryStorage
-import redis
+from app.utils.rate_limit import limiter
 
 # Initialize extensions
 ma = Marshmallow()
 swagger = Swagger()
 
 def get_limiter(app):
-    """Create rate limiter with appropriate storage"""
-    try:
-        # Try to use Redis if available
-        redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-        storage = RedisStorage(redis.from_url(redis_url))
-    except Exception as e:
-        app.logger.warning(f"Redis not available, falling back to memory storage: {str(e)}")
-        storage = MemoryStorage()
-
-    return Limiter(
-        app,
-        key_func=get_remote_address,
-        default_limits=["200 per day", "50 per hour"],
-        storage_uri=os.getenv('RATE_LIMIT_STORAGE_URL', 'memory://'),
-        storage=storage
-    )
+    """Configure the rate limiter, sharing buckets through Redis only if it answers"""
+    limiter.init_app(app)
+    return limiter
 
 def init_extensions(app):
     """Initialize Flask extensions"""
@@ -0,0 +1,105 @@
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Optional
+import numpy as np
+
+
+@dataclass
+class CachedPatientFeatures:
+    """A patient's model features and their encoded, scaled row"""
+    patient_id: str
+    medical_record_number: str
+    updated_at: Optional[datetime]
+    model_version: str
+    features: Dict[str, Any]
+    row: np.ndarray
+    checked_at: float = field(default_factory=time.monotonic)
+
+
+class PatientFeatureCache:
+    """
+    In-process LRU of preprocessed patient rows keyed by patient id and
+    updated_at. Entries younger than max_age are served without touching
+    the database; older ones need their updated_at revalidated.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_age: float = 30.0):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: 'OrderedDict[str, CachedPatientFeatures]' = OrderedDict()
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'revalidations': 0, 'misses': 0}
+
+    def init_app(self, app):
+        """Size the cache and drop entries when patients are saved or deleted"""
+        from mongoengine import signals
+        from app.models.patient import Patient
+
+        self.max_entries = app.config.get('FEATURE_CACHE_MAX_ENTRIES', self.max_entries)
+        self.max_age = app.config.get('FEATURE_CACHE_MAX_AGE', self.max_age)
+        signals.post_save.connect(self._on_patient_changed, sender=Patient, weak=False)
+        signals.post_delete.connect(self._on_patient_changed, sender=Patient, weak=False)
+        app.extensions['patient_feature_cache'] = self
+
+    def _on_patient_changed(self, sender, document, **kwargs):
+        self.invalidate(str(document.id))
+
+    def record(self, outcome: str) -> None:
+        """Count a hit, revalidation or miss"""
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def get(self, identifier: str, model_version: str) -> Optional[CachedPatientFeatures]:
+        """Entry for a patient id or record number, fresh or not"""
+        with self._lock:
+            patient_id = self._aliases.get(identifier, identifier)
+            entry = self._entries.get(patient_id)
+            if entry is None or entry.model_version != model_version:
+                return None
+            self._entries.move_to_end(patient_id)
+            return entry
+
+    def is_fresh(self, entry: CachedPatientFeatures) -> bool:
+        return time.monotonic() - entry.checked_at < self.max_age
+
+    def touch(self, entry: CachedPatientFeatures) -> None:
+        """Mark an entry as revalidated against the database"""
+        entry.checked_at = time.monotonic()
+
+    def put(self, entry: CachedPatientFeatures) -> None:
+        with self._lock:
+            self._remove(entry.patient_id)
+            self._entries[entry.patient_id] = entry
+            self._aliases[entry.medical_record_number] = entry.patient_id
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._aliases.pop(evicted.medical_record_number, None)
+
+    def invalidate(self, patient_id: Optional[str] = None, medical_record_number: Optional[str] = None) -> None:
+        """Drop a patient after a write through this process"""
+        with self._lock:
+            if patient_id is None and medical_record_number is not None:
+                patient_id = self._aliases.get(medical_record_number)
+            if patient_id is not None:
+                self._remove(patient_id)
+
+    def _remove(self, patient_id: str) -> None:
+        entry = self._entries.pop(patient_id, None)
+        if entry is not None:
+            self._aliases.pop(entry.medical_record_number, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), **self._counts}
+
+
+patient_feature_cache = PatientFeatureCache()
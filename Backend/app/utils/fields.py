@@ -0,0 +1,39 @@
+from typing import Dict, List, Optional, Tuple
+
+# Response field -> stored fields it is built from
+FieldSources = Dict[str, List[str]]
+
+
+def parse_fields(value: Optional[str], sources: FieldSources) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    Validate a comma-separated fields= parameter against the allowlist.
+    Returns (fields, error); fields is None when the parameter is absent,
+    meaning every field. id is always returned.
+    """
+    if value is None:
+        return None, None
+    fields = ['id']
+    for name in (part.strip() for part in value.split(',')):
+        if not name or name in fields:
+            continue
+        if name not in sources:
+            return None, f"Unknown field: {name}. Allowed fields: {', '.join(sources)}"
+        fields.append(name)
+    return fields, None
+
+
+def projection(fields: Optional[List[str]], sources: FieldSources, *extra: str) -> Dict[str, int]:
+    """Mongo projection reading only what the requested fields are built from"""
+    names = fields if fields is not None else list(sources)
+    stored = {'_id': 1}
+    for name in names:
+        for source in sources[name]:
+            stored[source] = 1
+    for source in extra:
+        stored[source] = 1
+    return stored
+
+
+def etag_parts(fields: Optional[List[str]]) -> tuple:
+    """ETag parts for a field selection; empty for the full representation"""
+    return (tuple(fields),) if fields is not None else ()
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 import re
 import logging
 from http import HTTPStatus
+from .dates import DATE_FORMATS
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -86,18 +87,9 @@ def get_bmi_category(bmi: float) -> str:
 def parse_medical_date(date_str: str) -> Optional[datetime]:
     """
     Parse date string in various medical formats
-    Returns None if parsing fails
+    Returns None if parsing fails; for whole columns use dates.parse_dates
     """
-    formats = [
-        "%Y-%m-%d",
-        "%d/%m/%Y",
-        "%m/%d/%Y",
-        "%Y/%m/%d",
-        "%d-%m-%Y",
-        "%m-%d-%Y"
-    ]
-    
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
             return datetime.strptime(date_str, fmt)
         except ValueError:
@@ -0,0 +1,46 @@
+import hashlib
+from http import HTTPStatus
+from typing import Any, Optional
+from flask import request, Response
+
+# Bump when the JSON shape of cached endpoints changes so old ETags stop matching
+ETAG_SCHEMA_VERSION = '1'
+
+# Suffixes compression adds to an ETag; each encoding is its own representation
+ENCODING_SUFFIXES = ('', '-gzip', '-br')
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the values that determine a response body"""
+    digest = hashlib.sha1(repr((ETAG_SCHEMA_VERSION,) + parts).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def is_not_modified(etag: Optional[str]) -> bool:
+    """Check If-None-Match against any encoded representation of the ETag"""
+    if not etag:
+        return False
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return True
+    return any(if_none_match.contains(etag + suffix) for suffix in ENCODING_SUFFIXES)
+
+
+def not_modified_response(etag: str) -> Response:
+    """Empty 304 response carrying the validator"""
+    response = Response(status=HTTPStatus.NOT_MODIFIED)
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def with_etag(response: Response, etag: Optional[str], status_code: int = HTTPStatus.OK) -> Response:
+    """
+    Give the response its status and attach the ETag only when that is a
+    success; clients revalidate on every poll
+    """
+    response.status_code = status_code
+    if etag and response.status_code == HTTPStatus.OK:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
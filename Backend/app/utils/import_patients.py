@@ -0,0 +1,78 @@
+import sys
+import time
+import argparse
+import itertools
+import logging
+from mongoengine import connect
+from app.config import Config
+from app.models.user import User
+from app.controllers.patient import PatientController, parse_bulk_payload
+from app.utils.json_provider import loads_bytes
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def read_chunks(stream, chunk_rows: int):
+    """Yield lists of rows: NDJSON is streamed, a JSON array is read whole"""
+    first = stream.read(1)
+    while first.isspace():
+        first = stream.read(1)
+    if first == b'[':
+        rows = parse_bulk_payload(first + stream.read())
+        for start in range(0, len(rows), chunk_rows):
+            yield rows[start:start + chunk_rows]
+        return
+
+    chunk = []
+    for line in itertools.chain([first + stream.readline()], stream):
+        if line.strip():
+            chunk.append(loads_bytes(line))
+        if len(chunk) == chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def main():
+    """Bulk upsert patients from an NDJSON or JSON array file"""
+    parser = argparse.ArgumentParser(description='Import patients by medical record number')
+    parser.add_argument('path', help="NDJSON or JSON array file, or '-' for stdin")
+    parser.add_argument('--user', required=True, help='Username recorded on newly created patients')
+    parser.add_argument('--batch-size', type=int, default=Config.BULK_BATCH_SIZE, help='Rows per bulk write')
+    parser.add_argument('--chunk-rows', type=int, default=10000, help='Rows validated together')
+    args = parser.parse_args()
+
+    connect(**Config.MONGODB_SETTINGS)
+    user = User.objects(username=args.user).first()
+    if not user:
+        logger.error(f"User {args.user} not found")
+        sys.exit(1)
+
+    totals = {'received': 0, 'inserted': 0, 'updated': 0, 'superseded': 0, 'failed': 0}
+    started = time.perf_counter()
+    stream = sys.stdin.buffer if args.path == '-' else open(args.path, 'rb')
+    try:
+        offset = 0
+        for rows in read_chunks(stream, args.chunk_rows):
+            response, _ = PatientController.bulk_upsert(rows, user, args.batch_size)
+            for key in totals:
+                totals[key] += response[key]
+            for error in response['errors']:
+                logger.warning(f"Row {offset + error['row']}: {error['errors']}")
+            offset += len(rows)
+            logger.info(f"{offset} rows processed ({response['rows_per_second']} rows/s in last chunk)")
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Imported {totals['received']} rows in {elapsed:.2f}s "
+                f"({totals['received'] / elapsed if elapsed else 0:.0f} rows/s): "
+                f"{totals['inserted']} inserted, {totals['updated']} updated, "
+                f"{totals['superseded']} superseded, {totals['failed']} failed")
+    if totals['failed']:
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
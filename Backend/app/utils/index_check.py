@@ -0,0 +1,255 @@
+import sys
+import json
+import argparse
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+# Flag a plan that examines more than this many documents per document returned
+MAX_DOCS_EXAMINED_RATIO = 10.0
+
+IndexKeys = List[Tuple[str, int]]
+
+
+@dataclass
+class QueryShape:
+    """A query the app issues, and the index expected to serve it"""
+    name: str
+    # Where the query is issued, for the report
+    source: str
+    collection: str
+    # Builds the filter from sample values read from the database
+    filter: Callable[[Dict[str, Any]], Dict[str, Any]]
+    index: IndexKeys
+    sort: Optional[IndexKeys] = None
+    projection: Optional[Dict[str, int]] = None
+    limit: int = 0
+
+
+@dataclass
+class ShapeReport:
+    """What explain() said about one query shape"""
+    shape: QueryShape
+    stages: List[str] = field(default_factory=list)
+    indexes_used: List[str] = field(default_factory=list)
+    docs_examined: int = 0
+    keys_examined: int = 0
+    returned: int = 0
+    index_present: bool = False
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def docs_examined_ratio(self) -> float:
+        return self.docs_examined / max(self.returned, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.shape.name,
+            'source': self.shape.source,
+            'collection': self.shape.collection,
+            'index': [list(key) for key in self.shape.index],
+            'index_present': self.index_present,
+            'stages': self.stages,
+            'indexes_used': self.indexes_used,
+            'docs_examined': self.docs_examined,
+            'keys_examined': self.keys_examined,
+            'returned': self.returned,
+            'docs_examined_ratio': round(self.docs_examined_ratio, 2),
+            'problems': self.problems
+        }
+
+
+# Every query shape the controllers, middleware and background jobs issue on a request path
+QUERY_SHAPES = [
+    QueryShape('login_by_username', 'UserController.login', 'users',
+               lambda s: {'username': s['username']}, [('username', 1)], limit=1),
+    QueryShape('login_by_email', 'UserController.login', 'users',
+               lambda s: {'email': s['email']}, [('email', 1)], limit=1),
+    QueryShape('token_user', 'middleware.auth.token_required', 'users',
+               lambda s: {'_id': s['user_id']}, [('_id', 1)], limit=1),
+    QueryShape('users_etag', 'UserController.get_all_users_etag', 'users',
+               lambda s: {}, [('updated_at', -1)], sort=[('updated_at', -1)],
+               projection={'_id': 0, 'updated_at': 1}, limit=1),
+    QueryShape('patient_lookup', 'PredictionController._load_patient_features', 'patients',
+               lambda s: {'$or': [{'_id': s['patient_id']}, {'medical_record_number': s['medical_record_number']}]},
+               [('medical_record_number', 1)], limit=1),
+    QueryShape('patients_at_risk', 'PatientController.get_patients_at_risk', 'patients',
+               lambda s: {'risk_level': 'High', 'risk_probability': {'$gte': 0.5}},
+               [('risk_level', 1), ('risk_probability', -1)], sort=[('risk_probability', -1)], limit=100),
+    QueryShape('risk_scoring_incremental', 'RiskScoringJob._plan', 'patients',
+               lambda s: {'updated_at': {'$gte': datetime.utcnow() - timedelta(days=1)}}, [('updated_at', 1)]),
+    QueryShape('prediction_history', 'PredictionController.get_prediction_history', 'predictions',
+               lambda s: {'user': s['user_id']}, [('user', 1), ('created_at', -1)], sort=[('created_at', -1)]),
+    QueryShape('prediction_history_etag', 'PredictionController.get_prediction_history_etag', 'predictions',
+               lambda s: {'user': s['user_id']}, [('user', 1), ('updated_at', -1)], sort=[('updated_at', -1)],
+               projection={'_id': 0, 'updated_at': 1}, limit=1),
+    QueryShape('prediction_by_id', 'PredictionController.get_prediction_by_id', 'predictions',
+               lambda s: {'_id': s['prediction_id']}, [('_id', 1)], limit=1),
+    QueryShape('archived_history', 'archive.archived_history', 'prediction_archive',
+               lambda s: {'users': s['user_id']}, [('users', 1), ('month', -1)], projection={'chunks': 1}),
+    QueryShape('archived_prediction', 'archive.find_archived', 'prediction_archive',
+               lambda s: {'prediction_ids': s['prediction_id']}, [('prediction_ids', 1)],
+               projection={'chunks': 1}, limit=1),
+    QueryShape('readmission_rates', 'AnalyticsController.get_readmission_rates', 'readmission_summaries',
+               lambda s: {'dimension': 'primary_diagnosis', 'patients': {'$gt': 0}}, [('dimension', 1), ('key', 1)]),
+    QueryShape('risk_level_counts', 'AnalyticsController.get_risk_level_counts', 'readmission_summaries',
+               lambda s: {'dimension': 'risk_day', 'key': {'$gte': '2024-01-01', '$lte': '2024-12-31'}},
+               [('dimension', 1), ('key', 1)], sort=[('key', 1)]),
+    QueryShape('last_scoring_run', 'PatientController.get_patients_at_risk', 'scoring_runs',
+               lambda s: {'status': 'completed'}, [('status', 1), ('started_at', -1)],
+               sort=[('started_at', -1)], limit=1),
+    QueryShape('active_jobs', 'JobController.submit', 'scoring_jobs',
+               lambda s: {'user': s['user_id'], 'status': {'$in': ['queued', 'running']}},
+               [('user', 1), ('status', 1)]),
+    QueryShape('claim_job', 'JobRunner.claim', 'scoring_jobs',
+               lambda s: {'$or': [
+                   {'status': 'queued'},
+                   {'status': 'running', 'heartbeat_at': {'$lt': datetime.utcnow() - timedelta(minutes=5)}}
+               ]},
+               [('status', 1), ('created_at', 1)], sort=[('created_at', 1)], limit=1)
+]
+
+
+def sample_values(db) -> Dict[str, Any]:
+    """Real values to fill the filters with, so explain() runs against existing documents"""
+    user = db.users.find_one({}, {'username': 1, 'email': 1}) or {}
+    patient = db.patients.find_one({}, {'medical_record_number': 1}) or {}
+    prediction = db.predictions.find_one({}, {'user': 1}) or {}
+    return {
+        'username': user.get('username', 'admin'),
+        'email': user.get('email', 'admin@hospital.com'),
+        # A user with history makes the history shapes return rows
+        'user_id': prediction.get('user') or user.get('_id') or ObjectId(),
+        'patient_id': patient.get('_id') or ObjectId(),
+        'medical_record_number': patient.get('medical_record_number', 'MRN000000'),
+        'prediction_id': prediction.get('_id') or ObjectId()
+    }
+
+
+def plan_stages(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a winning plan into its stages, for classic and slot-based explain output"""
+    plan = plan.get('queryPlan', plan)
+    stages = [plan]
+    for key in ('inputStage', 'outerStage', 'innerStage'):
+        if key in plan:
+            stages.extend(plan_stages(plan[key]))
+    for child in plan.get('inputStages', []):
+        stages.extend(plan_stages(child))
+    return stages
+
+
+def has_index(index_information: Dict[str, Any], keys: IndexKeys) -> bool:
+    """Whether an existing index starts with keys, in either direction"""
+    wanted = [(name, int(direction)) for name, direction in keys]
+    reverse = [(name, -direction) for name, direction in wanted]
+    for index in index_information.values():
+        existing = [(name, int(direction)) for name, direction in index['key']][:len(wanted)]
+        if existing in (wanted, reverse):
+            return True
+    return False
+
+
+def explain_shape(db, shape: QueryShape, samples: Dict[str, Any],
+                  max_ratio: float = MAX_DOCS_EXAMINED_RATIO) -> ShapeReport:
+    """Run explain() on one shape and flag collection scans, in-memory sorts and wasted reads"""
+    collection = db[shape.collection]
+    report = ShapeReport(shape, index_present=has_index(collection.index_information(), shape.index))
+
+    cursor = collection.find(shape.filter(samples), shape.projection)
+    if shape.sort:
+        cursor = cursor.sort(shape.sort)
+    if shape.limit:
+        cursor = cursor.limit(shape.limit)
+    explain = cursor.explain()
+
+    stages = plan_stages(explain['queryPlanner']['winningPlan'])
+    report.stages = [stage['stage'] for stage in stages]
+    report.indexes_used = [stage['indexName'] for stage in stages if 'indexName' in stage]
+    stats = explain.get('executionStats', {})
+    report.docs_examined = stats.get('totalDocsExamined', 0)
+    report.keys_examined = stats.get('totalKeysExamined', 0)
+    report.returned = stats.get('nReturned', 0)
+
+    if 'COLLSCAN' in report.stages:
+        report.problems.append('collection scan')
+    if 'SORT' in report.stages:
+        report.problems.append('in-memory sort')
+    if report.docs_examined_ratio > max_ratio:
+        report.problems.append(f"examined {report.docs_examined} documents for {report.returned} returned")
+    if not report.index_present:
+        report.problems.append(f"missing index {format_keys(shape.index)}")
+    return report
+
+
+def format_keys(keys: IndexKeys) -> str:
+    return '{' + ', '.join(f"{name}: {direction}" for name, direction in keys) + '}'
+
+
+def create_missing_indexes(db, reports: List[ShapeReport]) -> List[str]:
+    """Create the expected index of every shape that has none; returns the created index names"""
+    created = []
+    for report in reports:
+        if report.index_present:
+            continue
+        collection = db[report.shape.collection]
+        # Several shapes can share an index
+        if has_index(collection.index_information(), report.shape.index):
+            continue
+        created.append(f"{report.shape.collection}.{collection.create_index(report.shape.index)}")
+    return created
+
+
+def check_indexes(db, max_ratio: float = MAX_DOCS_EXAMINED_RATIO) -> List[ShapeReport]:
+    """Explain every query shape against db"""
+    samples = sample_values(db)
+    return [explain_shape(db, shape, samples, max_ratio) for shape in QUERY_SHAPES]
+
+
+def main():
+    """Explain the app's query shapes and report the ones no index serves"""
+    from mongoengine import connect
+    from mongoengine.connection import get_db
+    from app.config import Config
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Check that the app's queries are served by indexes")
+    parser.add_argument('--host', default=Config.MONGODB_SETTINGS['host'], help='MongoDB URI, including the database')
+    parser.add_argument('--max-ratio', type=float, default=MAX_DOCS_EXAMINED_RATIO,
+                        help='Documents examined per document returned before a plan is flagged')
+    parser.add_argument('--create', action='store_true', help='Create missing indexes, then check again')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    try:
+        connect(host=args.host)
+        db = get_db()
+        reports = check_indexes(db, args.max_ratio)
+        if args.create:
+            for name in create_missing_indexes(db, reports):
+                logger.info(f"Created index {name}")
+            reports = check_indexes(db, args.max_ratio)
+
+        if args.json:
+            print(json.dumps([report.to_dict() for report in reports], indent=2))
+        else:
+            for report in reports:
+                status = 'FLAG' if report.problems else 'ok'
+                print(f"{status:4}  {report.shape.collection}.{report.shape.name:26} "
+                      f"{' > '.join(report.stages):40} "
+                      f"docs {report.docs_examined}/{report.returned}  {'; '.join(report.problems)}")
+    except Exception as e:
+        logger.error(f"Index check failed: {str(e)}")
+        raise
+
+    flagged = [report for report in reports if report.problems]
+    if flagged:
+        logger.warning(f"{len(flagged)} of {len(reports)} query shapes flagged")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
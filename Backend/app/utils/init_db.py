@@ -55,6 +55,7 @@ def init_database():
         db.patients.create_index('medical_record_number', unique=True)
         db.patients.create_index([('user', 1)])
         db.predictions.create_index([('patient', 1), ('created_at', -1)])
+        db.predictions.create_index([('user', 1), ('created_at', -1)])
         
         # Create default admin user in the application
         default_admin = {
@@ -0,0 +1,333 @@
+import os
+import time
+import socket
+import argparse
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Tuple
+import pandas as pd
+from mongoengine import connect, disconnect
+from pymongo import ReturnDocument
+from app.models.patient import Patient
+from app.models.scoring_job import ScoringJob, JobShard
+from app.utils.config import Config
+from app.utils.json_provider import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+# Filters a scoring job may be submitted with: name -> patient field
+FILTER_FIELDS = {
+    'gender': 'gender',
+    'primary_diagnosis': 'primary_diagnosis',
+    'discharge_to': 'discharge_to'
+}
+MAX_RECORD_NUMBERS = 100000
+# Shard attempts before the job is failed
+MAX_ATTEMPTS = 3
+
+
+def normalize_filters(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validate submitted filters; returns (filters, error)"""
+    filters = {}
+    for name in FILTER_FIELDS:
+        value = data.get(name)
+        if value is None:
+            continue
+        values = value if isinstance(value, list) else [value]
+        if not values or not all(isinstance(v, str) for v in values):
+            return None, f"{name} must be a string or a list of strings"
+        filters[name] = values
+
+    for name in ('created_after', 'created_before'):
+        if data.get(name) is None:
+            continue
+        try:
+            filters[name] = datetime.fromisoformat(str(data[name]))
+        except ValueError:
+            return None, f"{name} must be an ISO date"
+
+    numbers = data.get('medical_record_numbers')
+    if numbers is not None:
+        if not isinstance(numbers, list) or not all(isinstance(n, str) for n in numbers):
+            return None, 'medical_record_numbers must be a list of strings'
+        if len(numbers) > MAX_RECORD_NUMBERS:
+            return None, f"At most {MAX_RECORD_NUMBERS} medical_record_numbers per job"
+        filters['medical_record_numbers'] = numbers
+    return filters, None
+
+
+def build_query(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Raw patient query for a job's filters"""
+    query: Dict[str, Any] = {}
+    for name, field in FILTER_FIELDS.items():
+        if name in filters:
+            query[field] = {'$in': filters[name]}
+    created = {}
+    if filters.get('created_after'):
+        created['$gte'] = filters['created_after']
+    if filters.get('created_before'):
+        created['$lt'] = filters['created_before']
+    if created:
+        query['created_at'] = created
+    if 'medical_record_numbers' in filters:
+        query['medical_record_number'] = {'$in': filters['medical_record_numbers']}
+    return query
+
+
+def job_directory(results_dir: str, job_id: str) -> str:
+    return os.path.join(results_dir, str(job_id))
+
+
+def shard_path(results_dir: str, job_id: str, index: int) -> str:
+    """NDJSON results of one shard"""
+    return os.path.join(job_directory(results_dir, job_id), f"shard-{index:05d}.ndjson")
+
+
+def _init_worker(mongo_settings: Dict[str, Any], niceness: int) -> None:
+    """Pool worker setup: lower priority and a connection of its own"""
+    if niceness:
+        try:
+            os.nice(niceness)
+        except (AttributeError, OSError):
+            pass
+    # A client inherited through fork is not safe to use
+    disconnect()
+    connect(**mongo_settings)
+
+
+def score_shard(job_id: str, shard: Dict[str, Any], query: Dict[str, Any], results_dir: str) -> Dict[str, int]:
+    """
+    Score one shard in a pool worker and write its results file.
+    The file appears atomically, so a crash never leaves a partial shard.
+    """
+    from app.utils.model import get_model_manager
+
+    manager = get_model_manager()
+    shard_query = {'$and': [query, {'_id': {'$gte': shard['start_id'], '$lte': shard['end_id']}}]}
+    projection = {field: 1 for field in ['medical_record_number'] + Config.REQUIRED_FEATURES}
+    documents = list(Patient._get_collection().find(shard_query, projection).sort('_id', 1))
+
+    frame = pd.DataFrame.from_records(documents, columns=['_id', 'medical_record_number'] + Config.REQUIRED_FEATURES)
+    probabilities, levels, errors = manager.score_frame(frame)
+
+    lines = []
+    scored = 0
+    for position, document in enumerate(documents):
+        record = {'patient_id': str(document['_id']), 'medical_record_number': document.get('medical_record_number')}
+        if position in errors:
+            record['errors'] = errors[position]
+        else:
+            record['readmission_probability'] = float(probabilities[scored])
+            record['risk_level'] = levels[scored]
+            record['model_version'] = manager.model_version
+            scored += 1
+        lines.append(dumps_bytes(record))
+
+    path = shard_path(results_dir, job_id, shard['index'])
+    with open(f"{path}.tmp", 'wb') as f:
+        f.write(b''.join(line + b'\n' for line in lines))
+    os.replace(f"{path}.tmp", path)
+    return {'size': len(documents), 'scored': scored, 'failed': len(errors)}
+
+
+class JobRunner:
+    """
+    Claims queued scoring jobs and runs their shards on a local process
+    pool. Shard completion is recorded in Mongo as it happens; a job whose
+    runner stops heartbeating is claimed again and only its unfinished
+    shards are re-run.
+    """
+
+    def __init__(self, mongo_settings: Dict[str, Any], results_dir: str, workers: int = 1,
+                 lease_seconds: float = 60.0, niceness: int = 10):
+        self.mongo_settings = mongo_settings
+        self.results_dir = results_dir
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.niceness = niceness
+        self.runner_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.mongo_settings, self.niceness)
+            )
+        return self._pool
+
+    def _reset_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def claim(self) -> Optional[ScoringJob]:
+        """Take the oldest queued job, or a running one whose runner went silent"""
+        now = datetime.utcnow()
+        document = ScoringJob._get_collection().find_one_and_update(
+            {'$or': [
+                {'status': 'queued'},
+                {'status': 'running', 'heartbeat_at': {'$lt': now - timedelta(seconds=self.lease_seconds)}}
+            ]},
+            {'$set': {'status': 'running', 'runner': self.runner_id, 'heartbeat_at': now}},
+            sort=[('created_at', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if document is None:
+            return None
+        if document.get('started_at') is None:
+            ScoringJob.objects(id=document['_id']).update_one(set__started_at=now)
+        return ScoringJob.objects(id=document['_id']).first()
+
+    def _owned(self, job: ScoringJob) -> Dict[str, Any]:
+        """Match the job only while this runner still holds it and it is running"""
+        return {'_id': job.id, 'runner': self.runner_id, 'status': 'running'}
+
+    def _heartbeat(self, job: ScoringJob) -> bool:
+        """Extend the lease; False once the job was cancelled or taken over"""
+        result = ScoringJob._get_collection().update_one(
+            self._owned(job), {'$set': {'heartbeat_at': datetime.utcnow()}}
+        )
+        return result.matched_count == 1
+
+    def _plan(self, job: ScoringJob, query: Dict[str, Any]) -> List[JobShard]:
+        """Split the matching patients into contiguous _id ranges of shard_size"""
+        from app.utils.model import get_model_manager
+
+        shards = []
+        start = last = None
+        size = 0
+        for document in Patient._get_collection().find(query, {'_id': 1}).sort('_id', 1):
+            if start is None:
+                start, size = document['_id'], 0
+            last = document['_id']
+            size += 1
+            if size == job.shard_size:
+                shards.append(JobShard(index=len(shards), start_id=start, end_id=last, size=size))
+                start = None
+        if start is not None:
+            shards.append(JobShard(index=len(shards), start_id=start, end_id=last, size=size))
+
+        ScoringJob.objects(id=job.id, runner=self.runner_id).update_one(
+            set__shards=shards,
+            set__total=sum(shard.size for shard in shards),
+            set__model_version=get_model_manager().model_version
+        )
+        job.reload()
+        return job.shards
+
+    def _update_shard(self, job: ScoringJob, index: int, fields: Dict[str, Any],
+                      increments: Optional[Dict[str, int]] = None) -> None:
+        update: Dict[str, Any] = {'$set': {f"shards.$.{name}": value for name, value in fields.items()}}
+        if increments:
+            update['$inc'] = increments
+        ScoringJob._get_collection().update_one({**self._owned(job), 'shards.index': index}, update)
+
+    def run_job(self, job: ScoringJob) -> str:
+        """Run the unfinished shards of a claimed job; returns its final status"""
+        query = build_query(job.filters)
+        shards = job.shards or self._plan(job, query)
+        os.makedirs(job_directory(self.results_dir, job.id), exist_ok=True)
+
+        queue = [shard for shard in shards if shard.status != 'completed']
+        if len(queue) < len(shards):
+            logger.info(f"Resuming job {job.id}: {len(shards) - len(queue)} of {len(shards)} shards done")
+        in_flight = {}
+        try:
+            while queue or in_flight:
+                # At most one shard per worker in flight, so cancellation and takeover are noticed quickly
+                while queue and len(in_flight) < self.workers:
+                    shard = queue.pop(0)
+                    shard.attempts += 1
+                    self._update_shard(job, shard.index, {'status': 'running', 'attempts': shard.attempts})
+                    payload = {'index': shard.index, 'start_id': shard.start_id, 'end_id': shard.end_id}
+                    future = self._get_pool().submit(score_shard, str(job.id), payload, query, self.results_dir)
+                    in_flight[future] = shard
+
+                done, _ = wait(in_flight, timeout=self.lease_seconds / 3, return_when=FIRST_COMPLETED)
+                if not self._heartbeat(job):
+                    logger.info(f"Job {job.id} was cancelled or taken over; stopping")
+                    for future in in_flight:
+                        future.cancel()
+                    return 'stopped'
+
+                for future in done:
+                    shard = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            self._reset_pool()
+                        if shard.attempts >= MAX_ATTEMPTS:
+                            raise RuntimeError(f"Shard {shard.index} failed {shard.attempts} times: {str(e)}")
+                        logger.warning(f"Shard {shard.index} of job {job.id} failed, retrying: {str(e)}")
+                        self._update_shard(job, shard.index, {'status': 'pending'})
+                        queue.append(shard)
+                        continue
+                    # Counters and shard state change in one update, so a resume never double counts
+                    self._update_shard(
+                        job, shard.index,
+                        {'status': 'completed', 'size': result['size'], 'scored': result['scored'],
+                         'failed': result['failed'], 'finished_at': datetime.utcnow()},
+                        {'scored': result['scored'], 'failed': result['failed'],
+                         'total': result['size'] - shard.size}
+                    )
+
+            ScoringJob._get_collection().update_one(
+                self._owned(job), {'$set': {'status': 'completed', 'finished_at': datetime.utcnow()}}
+            )
+            return 'completed'
+        except Exception as e:
+            ScoringJob._get_collection().update_one(self._owned(job), {'$set': {
+                'status': 'failed', 'error_message': str(e), 'finished_at': datetime.utcnow()
+            }})
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            return 'failed'
+
+    def run(self, poll_interval: float = 5.0, once: bool = False) -> None:
+        """Process jobs one at a time; with once, stop when the queue is empty"""
+        try:
+            while True:
+                job = self.claim()
+                if job is None:
+                    if once:
+                        return
+                    time.sleep(poll_interval)
+                    continue
+                started = time.perf_counter()
+                status = self.run_job(job)
+                logger.info(f"Job {job.id} {status} in {time.perf_counter() - started:.1f}s")
+        finally:
+            self._reset_pool()
+
+
+def main():
+    """Run the scoring job runner"""
+    from app.config import Config as AppConfig
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Run queued bulk scoring jobs on a local process pool')
+    parser.add_argument('--workers', type=int, default=AppConfig.JOB_WORKERS, help='Worker processes')
+    parser.add_argument('--results-dir', default=AppConfig.JOB_RESULTS_DIR)
+    parser.add_argument('--poll-interval', type=float, default=5.0)
+    parser.add_argument('--once', action='store_true', help='Exit when no job is queued')
+    args = parser.parse_args()
+
+    try:
+        connect(**AppConfig.MONGODB_SETTINGS)
+        runner = JobRunner(
+            AppConfig.MONGODB_SETTINGS, args.results_dir, workers=args.workers,
+            lease_seconds=AppConfig.JOB_LEASE_SECONDS, niceness=AppConfig.JOB_NICENESS
+        )
+        logger.info(f"Job runner {runner.runner_id} started with {args.workers} workers")
+        runner.run(args.poll_interval, args.once)
+    except Exception as e:
+        logger.error(f"Job runner failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
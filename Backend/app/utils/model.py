@@ -1,16 +1,42 @@
 import joblib
 import numpy as np
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional
 import os
+import json
+import threading
 from .config import Config
 from .data_preprocessing import DataPreprocessor
+from .single_flight import SingleFlight
+from .executor import inference_executor
+
+
+def canonical_row(data: Dict[str, Any]) -> Tuple:
+    """
+    Hashable form of the model features of a request: numbers compare by
+    value (65 == 65.0), other fields by type and value, extra keys ignored
+    """
+    row = []
+    for feature in Config.REQUIRED_FEATURES:
+        value = data.get(feature)
+        if isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_)):
+            row.append(float(value))
+        elif value is None or isinstance(value, (str, bool, np.bool_)):
+            row.append((type(value).__name__, value))
+        else:
+            row.append(('repr', repr(value)))
+    return tuple(row)
+
 
 class ModelManager:
     def __init__(self):
         """Initialize the model manager"""
         self.model = self._load_model()
+        self.model_version = self._load_model_version()
         self.preprocessor = DataPreprocessor()
         self.risk_thresholds = Config.RISK_THRESHOLDS
+        # Identical concurrent requests (double submits, several clinicians
+        # opening one patient) share a single computation
+        self.in_flight = SingleFlight()
 
     def _load_model(self):
         """Load the trained model"""
@@ -21,10 +47,29 @@ class ModelManager:
         except Exception as e:
             raise ValueError(f"Error loading model: {str(e)}")
 
+    def _load_model_version(self) -> str:
+        """Version recorded by training, falling back to the configured one"""
+        metadata_path = os.path.join(os.path.dirname(Config.MODEL_PATH), 'model_metadata.json')
+        try:
+            with open(metadata_path, encoding='utf-8') as f:
+                return json.load(f).get('version') or Config.MODEL_VERSION
+        except (OSError, ValueError):
+            return Config.MODEL_VERSION
+
     def predict(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
         """
-        Make a prediction using the loaded model
+        Make a prediction using the loaded model; concurrent calls with the
+        same features wait for one computation and share its result, which
+        runs on the bounded inference executor
         """
+        result, _ = self.in_flight.do(
+            ('predict', self.model_version, canonical_row(data)),
+            lambda: inference_executor.run(self._predict, data)
+        )
+        return result
+
+    def _predict(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """Validate, preprocess and predict one request"""
         try:
             # Validate features
             is_valid, error_message = self.preprocessor.validate_features(data)
@@ -36,7 +81,27 @@ class ModelManager:
 
             # Preprocess features
             X = self.preprocessor.preprocess_features(data)
+            return self._predict_preprocessed(data, X)
+
+        except Exception as e:
+            return {
+                'error': f"Prediction failed: {str(e)}",
+                'status': 'failed'
+            }, 500
+
+    def predict_preprocessed(self, data: Dict[str, Any], X: np.ndarray) -> Tuple[Dict[str, Any], int]:
+        """
+        Make a prediction from already validated features and their
+        encoded, scaled row, deduplicated like predict
+        """
+        result, _ = self.in_flight.do(
+            ('predict', self.model_version, canonical_row(data)),
+            lambda: inference_executor.run(self._predict_preprocessed, data, X)
+        )
+        return result
 
+    def _predict_preprocessed(self, data: Dict[str, Any], X: np.ndarray) -> Tuple[Dict[str, Any], int]:
+        try:
             # Make prediction
             prediction_proba = self.model.predict_proba(X)[0][1]  # Probability of readmission
             
@@ -64,7 +129,7 @@ class ModelManager:
                 'confidence_score': self._calculate_confidence(prediction_proba),
                 'contributing_factors': contributing_factors,
                 'recommendations': recommendations,
-                'model_version': Config.MODEL_VERSION
+                'model_version': self.model_version
             }
             
             return response, 200
@@ -75,6 +140,29 @@ class ModelManager:
                 'status': 'failed'
             }, 500
 
+    def score_frame(self, frame) -> Tuple[np.ndarray, np.ndarray, Dict[int, Dict[str, str]]]:
+        """
+        Vectorized scoring of many rows: returns probabilities and risk levels
+        for the valid rows (in order) and per-row errors for the rest
+        """
+        frame, errors = self.preprocessor.validator.validate_frame(frame)
+        valid = np.ones(len(frame), dtype=bool)
+        valid[list(errors)] = False
+        if not valid.any():
+            return np.empty(0), np.empty(0, dtype=object), errors
+
+        X = self.preprocessor.preprocess_frame(frame[valid])
+        probabilities = self.model.predict_proba(X)[:, 1]
+        return probabilities, self.risk_levels(probabilities), errors
+
+    def risk_levels(self, probabilities: np.ndarray) -> np.ndarray:
+        """Vectorized _determine_risk_level"""
+        return np.select(
+            [probabilities < self.risk_thresholds['low'], probabilities < self.risk_thresholds['medium']],
+            ['Low', 'Medium'],
+            'High'
+        ).astype(object)
+
     def _get_feature_importances(self) -> np.ndarray:
         """Get feature importance scores from the model"""
         try:
@@ -105,4 +193,16 @@ class ModelManager:
         Calculate confidence score
         Higher confidence for probabilities closer to 0 or 1
         """
-        return 1 - 2 * abs(0.5 - probability) 
\ No newline at end of file
+        return 1 - 2 * abs(0.5 - probability)
+
+_model_manager: Optional[ModelManager] = None
+_model_manager_lock = threading.Lock()
+
+def get_model_manager() -> ModelManager:
+    """Return the process-wide ModelManager, loading it on first use"""
+    global _model_manager
+    if _model_manager is None:
+        with _model_manager_lock:
+            if _model_manager is None:
+                _model_manager = ModelManager()
+    return _model_manager
@@ -0,0 +1,154 @@
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+URGENT_PREFIX = 'URGENT: '
+
+
+@dataclass(frozen=True)
+class RuleTable:
+    """
+    One frozen version of the vocabulary compact predictions are written
+    with. Never edit a published table: add a version, and documents keep
+    expanding with the one they were written with.
+    """
+    features: Tuple[str, ...]
+    priorities: Tuple[str, ...]
+    # Rule id n is rules[n - 1]; ids start at 1 so -n can mark the URGENT variant
+    rules: Tuple[str, ...]
+    rule_ids: Dict[str, int] = field(init=False, repr=False, compare=False)
+    feature_codes: Dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'rule_ids', {text: i for i, text in enumerate(self.rules, start=1)})
+        object.__setattr__(self, 'feature_codes', {name: i for i, name in enumerate(self.features)})
+
+
+RULE_TABLES = {
+    1: RuleTable(
+        features=('age', 'gender', 'primary_diagnosis', 'num_procedures',
+                  'days_in_hospital', 'comorbidity_score', 'discharge_to'),
+        priorities=('high_priority', 'medium_priority', 'low_priority'),
+        rules=(
+            # Factor recommendations (DataPreprocessor._get_factor_recommendations)
+            'Schedule comprehensive health assessment',
+            'Review and adjust all medications',
+            'Consider specialist consultations',
+            'Schedule follow-up for major conditions',
+            'Review medication compliance',
+            'Monitor symptoms regularly',
+            'Maintain current treatment plans',
+            'Regular check-ups as scheduled',
+            'Report any new symptoms',
+            'Create detailed post-discharge plan',
+            'Schedule 48-hour follow-up',
+            'Arrange home health services',
+            'Schedule follow-up within 7 days',
+            'Review discharge instructions',
+            'Monitor recovery progress',
+            'Follow discharge instructions',
+            'Schedule routine follow-up',
+            'Monitor for complications',
+            'Urgent specialist consultation',
+            'Review treatment effectiveness',
+            'Consider additional testing',
+            'Schedule specialist follow-up',
+            'Monitor specific symptoms',
+            'Review treatment plan',
+            'Continue prescribed treatment',
+            'Regular monitoring',
+            'Routine check-ups',
+            'Close monitoring of procedure sites',
+            'Schedule post-procedure check-ups',
+            'Watch for complications',
+            'Follow post-procedure care',
+            'Regular wound care if needed',
+            'Report unusual symptoms',
+            'Continue normal recovery',
+            'Basic wound care',
+            'Regular check-ups',
+            'Monitor and maintain current health management plan',
+            # General recommendations (DataPreprocessor._add_general_recommendations)
+            'Schedule immediate follow-up',
+            'Review all medications',
+            'Set up daily monitoring',
+            'Arrange support at home',
+            'Consider home care',
+            'Follow-up within 2 weeks',
+            'Review medications',
+            'Keep health diary',
+            'Know emergency contacts',
+            'Learn warning signs',
+            'Routine follow-up',
+            'Continue medications',
+            'Maintain healthy habits',
+            'Regular exercise',
+            'Balanced diet'
+        )
+    )
+}
+CURRENT_VERSION = max(RULE_TABLES)
+
+
+def _encode_rule(table: RuleTable, text: str) -> Any:
+    urgent = text.startswith(URGENT_PREFIX)
+    rule_id = table.rule_ids.get(text[len(URGENT_PREFIX):] if urgent else text)
+    if rule_id is None:
+        # Text outside the table is kept verbatim
+        return text
+    return -rule_id if urgent else rule_id
+
+
+def _decode_rule(table: RuleTable, value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    text = table.rules[abs(value) - 1]
+    return URGENT_PREFIX + text if value < 0 else text
+
+
+def encode_prediction(features: Dict[str, Any], factors: Dict[str, float],
+                      recommendations: Dict[str, List[str]],
+                      version: int = CURRENT_VERSION) -> Optional[Dict[str, Any]]:
+    """
+    Packed form of a prediction's features, contributing factors and
+    recommendations: values in table feature order, factor codes with their
+    weights, and rule ids per priority. None when the prediction does not
+    fit the table exactly, so it is stored in full instead.
+    """
+    table = RULE_TABLES[version]
+    if set(features) != set(table.features) or not set(factors) <= set(table.feature_codes):
+        return None
+    if tuple(recommendations) != table.priorities:
+        return None
+    return {
+        'x': [features[name] for name in table.features],
+        'f': [table.feature_codes[name] for name in factors],
+        'w': [float(weight) for weight in factors.values()],
+        'r': [[_encode_rule(table, text) for text in recommendations[priority]] for priority in table.priorities]
+    }
+
+
+def decode_features(packed: Dict[str, Any], version: int) -> Dict[str, Any]:
+    return dict(zip(RULE_TABLES[version].features, packed['x']))
+
+
+def decode_factors(packed: Dict[str, Any], version: int) -> Dict[str, float]:
+    features = RULE_TABLES[version].features
+    return {features[code]: weight for code, weight in zip(packed['f'], packed['w'])}
+
+
+def decode_recommendations(packed: Dict[str, Any], version: int) -> Dict[str, List[str]]:
+    table = RULE_TABLES[version]
+    return {
+        priority: [_decode_rule(table, value) for value in values]
+        for priority, values in zip(table.priorities, packed['r'])
+    }
+
+
+def decode_prediction(packed: Dict[str, Any], version: int) -> Tuple[Dict[str, Any], Dict[str, float], Dict[str, List[str]]]:
+    """
+    (input_features, contributing_factors, recommendations) of a packed
+    prediction; each part only needs its own keys of packed, so a projected
+    read can fetch and decode just one
+    """
+    return (decode_features(packed, version), decode_factors(packed, version),
+            decode_recommendations(packed, version))
@@ -0,0 +1,196 @@
+import re
+import time
+import logging
+import threading
+from functools import wraps
+from http import HTTPStatus
+from typing import Dict, Tuple, Optional
+from flask import request, jsonify
+
+try:
+    import redis
+except ImportError:  # Optional: only needed for a shared limit store
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
+_LIMIT_PATTERN = re.compile(r'^\s*(\d+)\s*(?:per|/)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$')
+
+
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """
+    Parse a limit such as "200 per day" or "10/minute" into a token
+    bucket (refill rate in tokens per second, capacity)
+    """
+    match = _LIMIT_PATTERN.match(limit.lower())
+    if not match:
+        raise ValueError(f"Invalid rate limit: {limit}")
+    amount = int(match.group(1))
+    period = int(match.group(2) or 1) * _PERIODS[match.group(3)]
+    return amount / period, float(amount)
+
+
+class MemoryTokenBucketStore:
+    """
+    In-process token buckets, sharded across locks so concurrent
+    requests for different clients rarely contend
+    """
+
+    def __init__(self, shards: int = 64, max_keys_per_shard: int = 10000):
+        self._shards = [(threading.Lock(), {}) for _ in range(shards)]
+        self._max_keys_per_shard = max_keys_per_shard
+
+    def consume(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take cost tokens from the bucket; return (allowed, seconds until retry)"""
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            state = buckets.get(key)
+            if state is None:
+                if len(buckets) >= self._max_keys_per_shard:
+                    self._prune(buckets, now)
+                tokens = capacity
+            else:
+                tokens = min(capacity, state[0] + (now - state[1]) * rate)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            # Remember when the bucket will be full again so idle keys can be pruned
+            buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            return (True, 0.0) if allowed else (False, (cost - tokens) / rate)
+
+    @staticmethod
+    def _prune(buckets: Dict[str, Tuple[float, float, float]], now: float) -> None:
+        """Drop buckets that have refilled completely; they equal a fresh bucket"""
+        stale = [key for key, state in buckets.items() if state[2] <= now]
+        for key in stale:
+            del buckets[key]
+
+    def reset(self) -> None:
+        """Forget every bucket"""
+        for lock, buckets in self._shards:
+            with lock:
+                buckets.clear()
+
+
+class RedisTokenBucketStore:
+    """Token buckets shared by every worker through Redis"""
+
+    # Refill and take atomically on the server
+    _SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 't', 's')
+local tokens = tonumber(state[1]) or capacity
+local stamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 's', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, client, prefix: str = 'ratelimit:'):
+        self._client = client
+        self._prefix = prefix
+        self._script = client.register_script(self._SCRIPT)
+
+    def consume(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take cost tokens from the bucket; return (allowed, seconds until retry)"""
+        allowed, tokens = self._script(
+            keys=[self._prefix + key],
+            args=[rate, capacity, cost, time.time()]
+        )
+        if int(allowed):
+            return True, 0.0
+        return False, (cost - float(tokens)) / rate
+
+
+def connect_redis_store(redis_url: Optional[str]) -> Optional[RedisTokenBucketStore]:
+    """Return a Redis-backed store only if the server actually answers"""
+    if not redis_url or redis is None:
+        return None
+    try:
+        client = redis.Redis.from_url(redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        # from_url connects lazily, so probe before trusting it
+        client.ping()
+        return RedisTokenBucketStore(client)
+    except Exception as e:
+        logger.warning(f"Redis not available at {redis_url}, using in-process rate limits: {str(e)}")
+        return None
+
+
+def rate_limit_key() -> str:
+    """Key limits by authenticated user, falling back to client address"""
+    current_user = getattr(request, 'current_user', None)
+    if current_user is not None:
+        return f"user:{current_user.id}"
+    return f"ip:{request.remote_addr}"
+
+
+class RateLimiter:
+    """Per-user token-bucket rate limits with named budgets per route group"""
+
+    def __init__(self):
+        self.store = None
+        self.local_store = MemoryTokenBucketStore()
+        self.budgets: Dict[str, Tuple[float, float]] = {}
+        self.enabled = True
+
+    def init_app(self, app):
+        """Configure budgets and pick a shared or in-process store"""
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self.budgets = {
+            name: parse_limit(limit)
+            for name, limit in app.config.get('RATELIMIT_BUDGETS', {}).items()
+        }
+        self.store = connect_redis_store(app.config.get('REDIS_URL')) or self.local_store
+        app.extensions['rate_limiter'] = self
+
+    def check(self, budget: str, key: Optional[str] = None, cost: float = 1.0) -> Tuple[bool, float]:
+        """Consume from the named budget for the current client"""
+        rate, capacity = self.budgets.get(budget) or self.budgets['default']
+        bucket_key = f"{budget}:{key or rate_limit_key()}"
+        try:
+            return self.store.consume(bucket_key, rate, capacity, cost)
+        except Exception as e:
+            # A failing shared store must not take the API down with it
+            logger.warning(f"Rate limit store failed, using in-process limits: {str(e)}")
+            return self.local_store.consume(bucket_key, rate, capacity, cost)
+
+    def limit(self, budget: str = 'default', cost: float = 1.0):
+        """
+        Decorator to apply a budget to a route
+        Place it below token_required so limits are keyed by user
+        """
+        def decorator(f):
+            @wraps(f)
+            def decorated(*args, **kwargs):
+                if not self.enabled:
+                    return f(*args, **kwargs)
+                allowed, retry_after = self.check(budget, cost=cost)
+                if not allowed:
+                    response = jsonify({'error': 'Rate limit exceeded', 'retry_after': round(retry_after, 2)})
+                    response.status_code = HTTPStatus.TOO_MANY_REQUESTS
+                    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+                    return response
+                return f(*args, **kwargs)
+            return decorated
+        return decorator
+
+
+limiter = RateLimiter()
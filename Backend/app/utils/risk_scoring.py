@@ -0,0 +1,134 @@
+import time
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, Any, List
+import pandas as pd
+from mongoengine import connect
+from pymongo import UpdateOne
+from app.models.patient import Patient
+from app.models.scoring_run import ScoringRun
+from app.utils.config import Config
+from app.utils.model import get_model_manager
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RISK_FIELDS = ['risk_level', 'risk_probability', 'risk_model_version', 'risk_scored_at']
+
+
+class RiskScoringJob:
+    """
+    Score patients in batches and materialize risk on their documents.
+    Only patients changed since the last completed run are re-scored,
+    unless the model version changed since then.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.manager = get_model_manager()
+
+    def _plan(self, run: ScoringRun, full: bool) -> Dict[str, Any]:
+        """Pick the query for this run and record why"""
+        version = self.manager.model_version
+        last = ScoringRun.objects(status='completed').order_by('-started_at').first()
+        if full:
+            run.full_rescore = 'requested'
+            return {}
+        if last is None or last.model_version != version:
+            run.full_rescore = 'first_run' if last is None else 'model_changed'
+            # Documents already scored by this version (e.g. before a failed run) are skipped
+            return {'risk_model_version': {'$ne': version}}
+        run.watermark = last.started_at
+        return {'updated_at': {'$gte': last.started_at}}
+
+    def _score_batch(self, documents: List[Dict[str, Any]], run: ScoringRun) -> None:
+        """Score one batch and write the results back with a single bulk write"""
+        frame = pd.DataFrame.from_records(documents, columns=['_id', 'updated_at'] + Config.REQUIRED_FEATURES)
+        probabilities, levels, errors = self.manager.score_frame(frame)
+        now = datetime.utcnow()
+
+        operations = []
+        scored = 0
+        for position, document in enumerate(documents):
+            # Matching updated_at keeps a concurrent edit from being overwritten with a stale score;
+            # that patient is picked up again by the next run
+            match = {'_id': document['_id'], 'updated_at': document.get('updated_at')}
+            if position in errors:
+                operations.append(UpdateOne(match, {'$unset': {field: '' for field in RISK_FIELDS}}))
+                continue
+            operations.append(UpdateOne(match, {'$set': {
+                'risk_level': levels[scored],
+                'risk_probability': float(probabilities[scored]),
+                'risk_model_version': self.manager.model_version,
+                'risk_scored_at': now
+            }}))
+            scored += 1
+
+        result = Patient._get_collection().bulk_write(operations, ordered=False)
+        run.scanned += len(documents)
+        run.scored += scored
+        run.failed += len(errors)
+        run.skipped += len(documents) - result.matched_count
+
+    def run(self, full: bool = False) -> ScoringRun:
+        """Run one scoring pass and record it"""
+        run = ScoringRun(model_version=self.manager.model_version, started_at=datetime.utcnow())
+        query = self._plan(run, full)
+        run.save()
+        started = time.perf_counter()
+
+        try:
+            cursor = (Patient.objects(__raw__=query)
+                      .only('id', 'updated_at', *Config.REQUIRED_FEATURES)
+                      .batch_size(self.batch_size)
+                      .as_pymongo())
+            batch = []
+            for document in cursor:
+                batch.append(document)
+                if len(batch) == self.batch_size:
+                    self._score_batch(batch, run)
+                    batch = []
+                    run.save()
+            if batch:
+                self._score_batch(batch, run)
+
+            run.status = 'completed'
+        except Exception as e:
+            run.status = 'failed'
+            run.error_message = str(e)
+            raise
+        finally:
+            run.finished_at = datetime.utcnow()
+            run.save()
+            elapsed = time.perf_counter() - started
+            logger.info(f"Scoring run {run.status}: {run.scanned} scanned, {run.scored} scored, "
+                        f"{run.failed} invalid, {run.skipped} changed mid-run "
+                        f"({run.scanned / elapsed if elapsed else 0:.0f} patients/s)")
+        return run
+
+
+def main():
+    """Run the population risk scoring job once or on an interval"""
+    from app.config import Config as AppConfig
+
+    parser = argparse.ArgumentParser(description='Materialize readmission risk on patients')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--full', action='store_true', help='Re-score every patient')
+    parser.add_argument('--interval', type=float, help='Keep running, sleeping this many seconds between runs')
+    args = parser.parse_args()
+
+    connect(**AppConfig.MONGODB_SETTINGS)
+    job = RiskScoringJob(batch_size=args.batch_size)
+    job.run(full=args.full)
+    while args.interval:
+        time.sleep(args.interval)
+        try:
+            job.run()
+        except Exception as e:
+            logger.error(f"Scoring run failed: {str(e)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from mongoengine import connect, disconnect
 from app.models.user import User
 from app.models.patient import Patient
 from app.models.prediction import Prediction
+from app.models.prediction_archive import PredictionArchive
 from app.utils.config import Config
 import logging
 from werkzeug.security import generate_password_hash
@@ -32,6 +33,7 @@ def setup_indexes():
         # Create indexes for Prediction collection
         logger.info("Creating Prediction indexes...")
         Prediction.ensure_indexes()
+        PredictionArchive.ensure_indexes()
         
         logger.info("All indexes created successfully!")
         
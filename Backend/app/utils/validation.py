@@ -0,0 +1,176 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Tuple, Optional
+from .config import Config
+
+# Fields stored in IntFields; bulk writes bypass mongoengine, so check integrality here
+INTEGER_FEATURES = ['age', 'num_procedures', 'days_in_hospital']
+
+_LABELS = {
+    'age': 'Age',
+    'num_procedures': 'Number of procedures',
+    'days_in_hospital': 'Days in hospital',
+    'comorbidity_score': 'Comorbidity score'
+}
+
+# Errors are {row position: {field: message}}; one message per field, the first check that failed
+RowErrors = Dict[str, str]
+FrameErrors = Dict[int, RowErrors]
+
+
+def _range_message(feature: str, rule: Dict[str, Any]) -> str:
+    label = _LABELS.get(feature, feature)
+    if 'max' in rule:
+        return f"{label} must be between {rule.get('min', 0)} and {rule['max']}"
+    return f"{label} cannot be negative" if rule.get('min') == 0 else f"{label} must be at least {rule['min']}"
+
+
+def _category_message(feature: str, classes: np.ndarray) -> str:
+    if feature == 'primary_diagnosis':
+        return "Invalid primary diagnosis code"
+    label = {'gender': 'Gender', 'discharge_to': 'Discharge destination'}.get(feature, feature)
+    return f"{label} must be one of: {', '.join(map(str, classes))}"
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_number(value: Any) -> Optional[float]:
+    """
+    Same coercion as pd.to_numeric: numbers and numeric strings, never
+    booleans. Infinities and NaN are not numbers either.
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return None
+    if isinstance(value, (int, float, np.number)):
+        try:
+            number = float(value)
+        except OverflowError:
+            return None
+    elif isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+    else:
+        return None
+    return number if math.isfinite(number) else None
+
+
+class FeatureValidator:
+    """
+    Validator compiled once from VALIDATION_RULES and the label encoders'
+    classes. Bounds, class sets and messages are resolved up front, so a
+    single row is checked with a few comparisons and a frame with one
+    vectorized pass per feature; both apply exactly the same rules.
+    """
+
+    def __init__(self, label_encoders: Dict[str, Any], rules: Optional[Dict[str, Dict[str, Any]]] = None,
+                 required: Optional[List[str]] = None):
+        rules = Config.VALIDATION_RULES if rules is None else rules
+        self.required = list(required or Config.REQUIRED_FEATURES)
+        self.numeric = []
+        for feature in Config.NUMERICAL_FEATURES:
+            rule = rules.get(feature, {})
+            label = _LABELS.get(feature, feature)
+            self.numeric.append((
+                feature,
+                float(rule['min']) if 'min' in rule else -np.inf,
+                float(rule['max']) if 'max' in rule else np.inf,
+                feature in INTEGER_FEATURES,
+                f"{label} must be a number",
+                f"{label} must be a whole number",
+                _range_message(feature, rule)
+            ))
+        self.categorical = []
+        for feature in Config.CATEGORICAL_FEATURES:
+            classes = label_encoders[feature].classes_
+            self.categorical.append((feature, classes, frozenset(classes.tolist()), _category_message(feature, classes)))
+
+    def validate_row(self, data: Dict[str, Any], required: Optional[List[str]] = None) -> RowErrors:
+        """Errors of one row as {field: message}; empty when valid"""
+        errors: RowErrors = {}
+        for feature in required or self.required:
+            if _is_missing(data.get(feature)):
+                errors[feature] = f"{feature} is required"
+
+        for feature, low, high, integer, not_number, not_whole, out_of_range in self.numeric:
+            value = data.get(feature)
+            if feature in errors or _is_missing(value):
+                continue
+            number = _to_number(value)
+            if number is None:
+                errors[feature] = not_number
+            elif integer and number % 1 != 0:
+                errors[feature] = not_whole
+            elif number < low or number > high:
+                errors[feature] = out_of_range
+
+        for feature, _, allowed, message in self.categorical:
+            value = data.get(feature)
+            if feature in errors or _is_missing(value):
+                continue
+            try:
+                known = value in allowed
+            except TypeError:
+                known = False
+            if not known:
+                errors[feature] = message
+        return errors
+
+    def validate_frame(self, frame: pd.DataFrame,
+                       required: Optional[List[str]] = None) -> Tuple[pd.DataFrame, FrameErrors]:
+        """
+        Validate every row of a frame at once. Returns the frame with numeric
+        columns coerced and {row position: {field: message}} for failed rows.
+        """
+        n_rows = len(frame)
+        frame = frame.copy()
+        checks = []
+
+        for feature in required or self.required:
+            if feature not in frame.columns:
+                frame[feature] = None
+            checks.append((feature, frame[feature].isna().to_numpy(), f"{feature} is required"))
+
+        for feature, low, high, integer, not_number, not_whole, out_of_range in self.numeric:
+            if feature not in frame.columns:
+                frame[feature] = None
+            raw = frame[feature]
+            values = pd.to_numeric(raw, errors='coerce')
+            invalid = (values.isna() & raw.notna()).to_numpy()
+            # Booleans coerce to 0/1; reject them like any other non-number
+            if raw.dtype == bool:
+                invalid = np.ones(n_rows, dtype=bool)
+            elif raw.dtype == object:
+                invalid = invalid | raw.map(type).isin([bool, np.bool_]).to_numpy()
+            numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            # Infinities coerce to floats; reject them like any other non-number
+            invalid = invalid | (~np.isfinite(numbers) & raw.notna().to_numpy())
+            checks.append((feature, invalid, not_number))
+
+            with np.errstate(invalid='ignore'):
+                if integer:
+                    checks.append((feature, np.isfinite(numbers) & (numbers % 1 != 0), not_whole))
+                checks.append((feature, (numbers < low) | (numbers > high), out_of_range))
+            frame[feature] = values
+
+        for feature, classes, _, message in self.categorical:
+            if feature not in frame.columns:
+                frame[feature] = None
+            column = frame[feature]
+            checks.append((feature, (column.notna() & ~column.isin(classes)).to_numpy(), message))
+
+        # Only failing rows pay for building messages
+        errors: FrameErrors = {}
+        for feature, mask, message in checks:
+            for row in np.flatnonzero(mask):
+                errors.setdefault(int(row), {}).setdefault(feature, message)
+        return frame, errors
+
+    def validate_columns(self, columns: Dict[str, Any],
+                         required: Optional[List[str]] = None) -> Tuple[pd.DataFrame, FrameErrors]:
+        """validate_frame for a batch given as {field: sequence of values}"""
+        return self.validate_frame(pd.DataFrame(columns), required)
@@ -0,0 +1,8 @@
+"""
+Microbenchmarks for the API hot paths.
+
+Run from the Backend directory:
+
+    python -m benchmarks.run --output benchmarks/results/baseline.json
+    python -m benchmarks.run --compare benchmarks/results/baseline.json
+"""
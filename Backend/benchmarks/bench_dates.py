@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from .common import benchmark, SEED
+
+N_ROWS = 100000
+
+
+def _date_strings(n: int, fmt: str = '%d/%m/%Y'):
+    """Admission-like dates spread over four years"""
+    rng = np.random.default_rng(SEED)
+    days = np.datetime64('2020-01-01') + rng.integers(0, 1500, size=n).astype('timedelta64[D]')
+    return pd.Series(days).dt.strftime(fmt).tolist()
+
+
+@benchmark('dates.parse_medical_date.scalar_100000')
+def bench_parse_scalar():
+    from app.utils.helpers import parse_medical_date
+    values = _date_strings(N_ROWS)
+    return lambda: [parse_medical_date(value) for value in values]
+
+
+@benchmark('dates.parse_dates.column_100000')
+def bench_parse_column():
+    from app.utils.dates import parse_dates
+    values = _date_strings(N_ROWS)
+    return lambda: parse_dates(values)
+
+
+@benchmark('dates.days_and_windows_100000')
+def bench_days_and_windows():
+    from app.utils.dates import parse_dates, days_between, readmitted_within
+    admission = parse_dates(_date_strings(N_ROWS)).values
+    discharge = admission + np.timedelta64(5, 'D')
+    readmission = discharge + np.timedelta64(20, 'D')
+
+    def run():
+        days_between(admission, discharge)
+        readmitted_within(discharge, readmission)
+    return run
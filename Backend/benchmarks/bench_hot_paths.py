@@ -0,0 +1,173 @@
+from datetime import datetime
+import jwt
+from bson import ObjectId
+from flask import Flask
+from .common import benchmark, synthetic_rows
+
+# Created lazily so artifacts are in place before models load
+_state = {}
+
+
+def _model_manager():
+    """Shared ModelManager built from the active artifacts"""
+    if 'model_manager' not in _state:
+        from app.utils.model import ModelManager
+        _state['model_manager'] = ModelManager()
+    return _state['model_manager']
+
+
+def _prediction_result():
+    """A completed prediction response for a fixed row"""
+    if 'prediction_result' not in _state:
+        response, _ = _model_manager().predict(synthetic_rows(1)[0])
+        _state['prediction_result'] = response
+    return _state['prediction_result']
+
+
+def _documents():
+    """In-memory User, Patient and Prediction documents (never saved)"""
+    from app.models.user import User
+    from app.models.patient import Patient
+    from app.models.prediction import Prediction
+
+    created = datetime(2024, 1, 15, 9, 30, 0, 123456)
+    user = User(
+        id=ObjectId('65a4f0c2e13b8c0a1b2c3d4e'),
+        username='dr.hassan',
+        email='dr.hassan@hospital.com',
+        password_hash='pbkdf2:sha256:600000$bench$0000',
+        full_name='Dr. Hassan Ali',
+        role='doctor',
+        created_at=created,
+        updated_at=created
+    )
+    row = synthetic_rows(1)[0]
+    patient = Patient(
+        id=ObjectId('65a4f0c2e13b8c0a1b2c3d4f'),
+        medical_record_number='MRN-20240115-0001',
+        user=user,
+        created_at=created,
+        updated_at=created,
+        **row
+    )
+    result = _prediction_result()
+    prediction = Prediction(
+        id=ObjectId('65a4f0c2e13b8c0a1b2c3d50'),
+        patient=patient,
+        user=user,
+        input_features=row,
+        readmission_probability=result['readmission_probability'],
+        risk_level=result['risk_level'],
+        confidence_score=result['confidence_score'],
+        contributing_factors=result['contributing_factors'],
+        recommendations=result['recommendations'],
+        model_version=result['model_version'],
+        status='completed',
+        created_at=created,
+        updated_at=created
+    )
+    return user, patient, prediction
+
+
+@benchmark('preprocessor.validate_features')
+def bench_validate_features():
+    preprocessor = _model_manager().preprocessor
+    row = synthetic_rows(1)[0]
+    return lambda: preprocessor.validate_features(row)
+
+
+@benchmark('preprocessor.preprocess_features')
+def bench_preprocess_features():
+    preprocessor = _model_manager().preprocessor
+    row = synthetic_rows(1)[0]
+    return lambda: preprocessor.preprocess_features(row)
+
+
+@benchmark('preprocessor.get_contributing_factors')
+def bench_contributing_factors():
+    manager = _model_manager()
+    importances = manager._get_feature_importances()
+    row = synthetic_rows(1)[0]
+    return lambda: manager.preprocessor.get_contributing_factors(row, importances)
+
+
+@benchmark('preprocessor.generate_recommendations')
+def bench_generate_recommendations():
+    preprocessor = _model_manager().preprocessor
+    result = _prediction_result()
+    factors = result['contributing_factors']
+    probability = result['readmission_probability']
+    return lambda: preprocessor.generate_recommendations(factors, probability)
+
+
+@benchmark('model_manager.predict.single')
+def bench_predict_single():
+    manager = _model_manager()
+    row = synthetic_rows(1)[0]
+    return lambda: manager.predict(row)
+
+
+@benchmark('model_manager.predict.batch_100')
+def bench_predict_batch():
+    manager = _model_manager()
+    rows = synthetic_rows(100)
+
+    def run():
+        for row in rows:
+            manager.predict(row)
+    return run
+
+
+@benchmark('model.predict_proba.matrix_1000')
+def bench_predict_proba_matrix():
+    manager = _model_manager()
+    X = manager.preprocessor.scaler.transform([
+        [float(row[f]) for f in manager.preprocessor.numerical_features] +
+        [float(manager.preprocessor.label_encoders[f].transform([row[f]])[0])
+         for f in manager.preprocessor.categorical_features]
+        for row in synthetic_rows(1000)
+    ])
+    return lambda: manager.model.predict_proba(X)
+
+
+@benchmark('serialize.prediction.to_dict')
+def bench_prediction_to_dict():
+    _, _, prediction = _documents()
+    return prediction.to_dict
+
+
+@benchmark('serialize.user.to_dict')
+def bench_user_to_dict():
+    user, _, _ = _documents()
+    return user.to_dict
+
+
+def _jwt_app():
+    """Minimal app context so UserController can read SECRET_KEY"""
+    app = Flask('benchmarks')
+    app.config['SECRET_KEY'] = 'benchmark-secret-key'
+    return app
+
+
+@benchmark('jwt.encode')
+def bench_jwt_encode():
+    from app.controllers.user import UserController
+    user, _, _ = _documents()
+    app = _jwt_app()
+
+    def run():
+        with app.app_context():
+            UserController.generate_token(user)
+    return run
+
+
+@benchmark('jwt.decode')
+def bench_jwt_decode():
+    from app.controllers.user import UserController
+    user, _, _ = _documents()
+    app = _jwt_app()
+    with app.app_context():
+        token = UserController.generate_token(user)
+    secret = app.config['SECRET_KEY']
+    # Same call the token_required middleware makes on every request
+    return lambda: jwt.decode(token, secret, algorithms=['HS256'])
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.utils.json_provider import FastJSONProvider
+from .bench_hot_paths import _documents
+from .common import benchmark
+
+SIZES = {'1k': 1000, '10k': 10000}
+
+# Providers hold only a weak reference to their app; keep the apps alive here
+_apps = []
+
+
+def _prediction_payload(n: int, legacy: bool):
+    """
+    History-shaped payload of n predictions. legacy=True reproduces the
+    previous to_dict output (isoformat strings) for the default provider.
+    """
+    _, _, prediction = _documents()
+    template = prediction.to_dict()
+    start = datetime(2024, 1, 1)
+    items = []
+    for i in range(n):
+        item = dict(template)
+        item['id'] = str(ObjectId.from_datetime(start + timedelta(minutes=i)))
+        stamp = start + timedelta(minutes=i, microseconds=123000)
+        item['created_at'] = stamp.isoformat() if legacy else stamp
+        item['updated_at'] = stamp.isoformat() if legacy else stamp
+        items.append(item)
+    return {'predictions': items}
+
+
+def _user_payload(n: int, legacy: bool):
+    """User listing of n users in either encoding"""
+    user, _, _ = _documents()
+    template = user.to_dict()
+    items = []
+    for i in range(n):
+        item = dict(template, username=f"user{i}", email=f"user{i}@hospital.com")
+        if legacy:
+            item['created_at'] = item['created_at'].isoformat()
+            item['updated_at'] = item['updated_at'].isoformat()
+        items.append(item)
+    return items
+
+
+def _register(name, payload_factory, n):
+    """Register default and fast provider cases for one payload"""
+    @benchmark(f"json.{name}.default_provider")
+    def default_case():
+        app = Flask('benchmarks')
+        _apps.append(app)
+        provider = DefaultJSONProvider(app)
+        payload = payload_factory(n, legacy=True)
+        return lambda: provider.response(payload)
+
+    @benchmark(f"json.{name}.fast_provider")
+    def fast_case():
+        app = Flask('benchmarks')
+        _apps.append(app)
+        provider = FastJSONProvider(app)
+        payload = payload_factory(n, legacy=False)
+        return lambda: provider.response(payload)
+
+
+for label, size in SIZES.items():
+    _register(f"predictions_{label}", _prediction_payload, size)
+    _register(f"users_{label}", _user_payload, size)
@@ -0,0 +1,61 @@
+import threading
+import time
+from bson import ObjectId
+from flask import Flask, request
+from app.utils.rate_limit import MemoryTokenBucketStore, RateLimiter
+from .common import benchmark
+
+# Generous budget so the benchmark measures the allowed path
+RATE, CAPACITY = 1e9, 1e9
+
+
+@benchmark('rate_limit.memory.consume.hot_key')
+def bench_consume_hot_key():
+    store = MemoryTokenBucketStore()
+    return lambda: store.consume('predict:user:1', RATE, CAPACITY)
+
+
+@benchmark('rate_limit.memory.consume.10k_keys')
+def bench_consume_many_keys():
+    store = MemoryTokenBucketStore()
+    keys = [f"default:user:{i}" for i in range(10000)]
+    state = {'i': 0}
+
+    def run():
+        i = state['i'] = (state['i'] + 1) % len(keys)
+        store.consume(keys[i], RATE, CAPACITY)
+    return run
+
+
+@benchmark('rate_limit.memory.consume.8_threads')
+def bench_consume_contended():
+    """Per-check cost while 7 other threads hammer the same store"""
+    store = MemoryTokenBucketStore()
+    stop = threading.Event()
+
+    def background(n):
+        key = f"default:user:{n}"
+        while not stop.is_set():
+            store.consume(key, RATE, CAPACITY)
+            time.sleep(0)
+
+    for n in range(7):
+        threading.Thread(target=background, args=(n,), daemon=True).start()
+    return lambda: store.consume('default:user:main', RATE, CAPACITY), stop.set
+
+
+@benchmark('rate_limit.limiter.check')
+def bench_limiter_check():
+    """Full check as routes run it: key from the authenticated user, budget lookup, consume"""
+    app = Flask('benchmarks')
+    app.config['RATELIMIT_BUDGETS'] = {'default': '1000000000 per second'}
+    limiter = RateLimiter()
+    limiter.init_app(app)
+
+    class CurrentUser:
+        id = ObjectId('65a4f0c2e13b8c0a1b2c3d4e')
+
+    context = app.test_request_context('/api/predictions/')
+    context.push()
+    request.current_user = CurrentUser()
+    return lambda: limiter.check('default'), context.pop
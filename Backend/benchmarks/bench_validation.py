@@ -0,0 +1,43 @@
+import pandas as pd
+from .common import benchmark, synthetic_rows
+from .bench_hot_paths import _model_manager
+
+# Batch sizes from a single request up to a large bulk import
+BATCH_SIZES = [1, 100, 10000, 100000]
+
+
+def _rows_with_errors(n: int):
+    """Synthetic rows with about one in ten invalid, so error paths are timed too"""
+    rows = synthetic_rows(n)
+    for i in range(0, n, 10):
+        rows[i] = dict(rows[i], age='unknown' if i % 20 else 150)
+    return rows
+
+
+@benchmark('validator.row')
+def bench_validate_row():
+    validator = _model_manager().preprocessor.validator
+    row = synthetic_rows(1)[0]
+    return lambda: validator.validate_row(row)
+
+
+def _register_frame(n: int):
+    @benchmark(f"validator.frame_{n}")
+    def bench_validate_frame():
+        validator = _model_manager().preprocessor.validator
+        frame = pd.DataFrame.from_records(_rows_with_errors(n))
+        return lambda: validator.validate_frame(frame)
+
+
+def _register_rows(n: int):
+    # The per-row path over the same batch, for comparison with the frame pass
+    @benchmark(f"validator.rows_{n}")
+    def bench_validate_rows():
+        validator = _model_manager().preprocessor.validator
+        rows = _rows_with_errors(n)
+        return lambda: [validator.validate_row(row) for row in rows]
+
+
+for _n in BATCH_SIZES:
+    _register_frame(_n)
+    _register_rows(_n)
@@ -0,0 +1,163 @@
+import os
+import time
+import atexit
+import shutil
+import statistics
+import tempfile
+from typing import Dict, Any, List, Callable, Optional
+import numpy as np
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+
+# Fixed seed so every run benchmarks identical inputs
+SEED = 42
+
+CATEGORIES = {
+    'gender': ['Female', 'Male', 'Other'],
+    'primary_diagnosis': ['COPD', 'Diabetes', 'Heart Disease', 'Hypertension', 'Kidney Disease'],
+    'discharge_to': ['Home', 'Home Health Care', 'Rehabilitation Facility', 'Skilled Nursing Facility']
+}
+CATEGORICAL_FEATURES = ['gender', 'primary_diagnosis', 'discharge_to']
+NUMERICAL_FEATURES = ['age', 'num_procedures', 'days_in_hospital', 'comorbidity_score']
+
+# Registered benchmarks: name -> factory returning the callable to time
+_REGISTRY: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark factory under the given name"""
+    def decorator(factory):
+        if name in _REGISTRY:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        _REGISTRY[name] = factory
+        return factory
+    return decorator
+
+
+def registered_benchmarks() -> Dict[str, Callable[[], Callable[[], Any]]]:
+    """Return all registered benchmark factories"""
+    return dict(_REGISTRY)
+
+
+def synthetic_rows(n: int, seed: int = SEED) -> List[Dict[str, Any]]:
+    """Generate n valid patient feature rows from a fixed seed"""
+    rng = np.random.default_rng(seed)
+    ages = rng.integers(18, 95, size=n)
+    procedures = rng.integers(0, 10, size=n)
+    days = rng.integers(1, 15, size=n)
+    comorbidity = rng.integers(0, 5, size=n)
+    picks = {
+        feature: rng.integers(0, len(values), size=n)
+        for feature, values in CATEGORIES.items()
+    }
+    return [
+        {
+            'age': int(ages[i]),
+            'gender': CATEGORIES['gender'][picks['gender'][i]],
+            'primary_diagnosis': CATEGORIES['primary_diagnosis'][picks['primary_diagnosis'][i]],
+            'num_procedures': int(procedures[i]),
+            'days_in_hospital': int(days[i]),
+            'comorbidity_score': float(comorbidity[i]),
+            'discharge_to': CATEGORIES['discharge_to'][picks['discharge_to'][i]]
+        }
+        for i in range(n)
+    ]
+
+
+def build_synthetic_artifacts(output_dir: str, n_rows: int = 2000) -> str:
+    """
+    Fit a model, scaler and label encoders shaped like the production
+    artifacts on synthetic data and write them to output_dir.
+    Returns the model path to use as Config.MODEL_PATH.
+    """
+    rows = synthetic_rows(n_rows)
+    rng = np.random.default_rng(SEED)
+
+    label_encoders = {}
+    for feature in CATEGORICAL_FEATURES:
+        le = LabelEncoder()
+        le.fit(CATEGORIES[feature])
+        label_encoders[feature] = le
+
+    X = np.array([
+        [float(row[f]) for f in NUMERICAL_FEATURES] +
+        [float(label_encoders[f].transform([row[f]])[0]) for f in CATEGORICAL_FEATURES]
+        for row in rows
+    ])
+    # Readmission loosely driven by comorbidity and length of stay
+    logits = 0.6 * X[:, 3] + 0.15 * X[:, 2] - 2.5 + rng.normal(0, 1, size=n_rows)
+    y = (logits > 0).astype(int)
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=SEED)
+    model.fit(X_scaled, y)
+
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, 'readmission_model.pkl')
+    joblib.dump(model, model_path)
+    joblib.dump(scaler, os.path.join(output_dir, 'scaler.pkl'))
+    joblib.dump(label_encoders, os.path.join(output_dir, 'label_encoders.pkl'))
+    joblib.dump(NUMERICAL_FEATURES + CATEGORICAL_FEATURES, os.path.join(output_dir, 'feature_names.pkl'))
+    return model_path
+
+
+_artifact_dir: Optional[str] = None
+
+
+def use_artifacts(model_path: Optional[str] = None) -> str:
+    """
+    Point Config.MODEL_PATH at the given artifacts, or at synthetic ones
+    built once per process. Returns the model path in use.
+    """
+    global _artifact_dir
+    from app.utils.config import Config
+
+    if model_path is None:
+        if _artifact_dir is None:
+            _artifact_dir = tempfile.mkdtemp(prefix='bench_artifacts_')
+            atexit.register(shutil.rmtree, _artifact_dir, True)
+            build_synthetic_artifacts(_artifact_dir)
+        model_path = os.path.join(_artifact_dir, 'readmission_model.pkl')
+
+    Config.MODEL_PATH = model_path
+    return model_path
+
+
+def measure(func: Callable[[], Any],
+            repeat: int = 5,
+            min_time: float = 0.2) -> Dict[str, Any]:
+    """
+    Time func like timeit.autorange: pick a loop count that runs for at
+    least min_time, then report per-call statistics over repeat rounds.
+    """
+    # Warm up caches and lazy imports
+    func()
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed > 0 else 10
+
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - start) / number)
+
+    per_call_us = [t * 1e6 for t in per_call]
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min_us': min(per_call_us),
+        'median_us': statistics.median(per_call_us),
+        'mean_us': statistics.mean(per_call_us),
+        'stdev_us': statistics.stdev(per_call_us) if repeat > 1 else 0.0
+    }
@@ -0,0 +1,502 @@
+"""
+End-to-end load test against the real Flask app over HTTP.
+
+Each server configuration forks `workers` processes that share one
+listening socket, each serving requests from a pool of `threads`
+threads (like gunicorn's gthread worker), or with --modes async, from a
+pool of that many greenlets under gevent (like serve_async.py). Each run
+reports worker RSS so thread and async modes can be compared at equal
+memory. By default every worker runs against its own in-memory
+mongomock database seeded with identical, deterministic data, so no
+external services are needed; pass --mongo-uri to use a local mongod
+instead (mongomock is CPU-bound, so only a real mongod shows the gain
+from not holding a thread per blocked request).
+
+    python -m benchmarks.loadtest --workers 1,2,4 --threads 4,16 --duration 15
+    python -m benchmarks.loadtest --modes thread,async --threads 16,256 --concurrency 256
+"""
+import os
+import json
+import time
+import socket
+import random
+import hashlib
+import argparse
+import logging
+import threading
+import http.client
+import multiprocessing
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple, Optional
+import numpy as np
+import mongoengine
+from bson import ObjectId
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+from .common import use_artifacts, synthetic_rows
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIX = 'login=1,predict=2,history=3,get_prediction=4'
+SEED_PASSWORD = 'LoadTest#2024'
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), 'results', 'loadtest.json')
+
+
+def seeded_id(kind: str, index: int) -> ObjectId:
+    """Deterministic ObjectId so every worker's database agrees on ids"""
+    return ObjectId(hashlib.md5(f"{kind}-{index}".encode()).hexdigest()[:24])
+
+
+def mongo_settings(mongo_uri: Optional[str]) -> Dict[str, Any]:
+    """Connection settings for a local mongod or the in-memory stand-in"""
+    if mongo_uri:
+        return {'host': mongo_uri}
+    # mongoengine 0.27 replaced the mongomock:// scheme with mongo_client_class
+    if mongoengine.VERSION >= (0, 27, 0):
+        import mongomock
+        return {'db': 'hospital_loadtest', 'host': 'mongodb://localhost', 'mongo_client_class': mongomock.MongoClient}
+    return {'db': 'hospital_loadtest', 'host': 'mongomock://localhost'}
+
+
+def seed_database(n_users: int, n_patients: int, n_predictions: int) -> None:
+    """Insert users, patients and predictions with deterministic ids"""
+    from app.models.user import User
+    from app.models.patient import Patient
+    from app.models.prediction import Prediction
+    from app.utils.model import get_model_manager
+
+    for document in (User, Patient, Prediction):
+        document.drop_collection()
+
+    now = datetime(2024, 6, 1)
+    # Hash once: pbkdf2 is deliberately slow and identical for every user
+    password_hash = generate_password_hash(SEED_PASSWORD)
+    roles = ['doctor', 'user', 'admin']
+    User._get_collection().insert_many([
+        {
+            '_id': seeded_id('user', i),
+            'username': f"loaduser{i}",
+            'email': f"loaduser{i}@hospital.com",
+            'password_hash': password_hash,
+            'full_name': f"Load User {i}",
+            'role': roles[i % len(roles)],
+            'is_active': True,
+            'created_at': now,
+            'updated_at': now
+        }
+        for i in range(n_users)
+    ])
+
+    rows = synthetic_rows(n_patients)
+    Patient._get_collection().insert_many([
+        dict(
+            _id=seeded_id('patient', i),
+            medical_record_number=f"MRN-20240601-{i:04d}",
+            user=seeded_id('user', i % n_users),
+            readmitted=False,
+            created_at=now,
+            updated_at=now,
+            **rows[i]
+        )
+        for i in range(n_patients)
+    ])
+
+    # Score a small sample and cycle it: predictions only need realistic shape
+    manager = get_model_manager()
+    samples = [(row, manager.predict(row)[0]) for row in rows[:25]]
+    Prediction._get_collection().insert_many([
+        {
+            '_id': seeded_id('prediction', i),
+            'patient': seeded_id('patient', i % n_patients),
+            'user': seeded_id('user', i % n_users),
+            'input_features': samples[i % len(samples)][0],
+            'readmission_probability': samples[i % len(samples)][1]['readmission_probability'],
+            'risk_level': samples[i % len(samples)][1]['risk_level'],
+            'confidence_score': float(samples[i % len(samples)][1]['confidence_score']),
+            'contributing_factors': {k: float(v) for k, v in samples[i % len(samples)][1]['contributing_factors'].items()},
+            'recommendations': samples[i % len(samples)][1]['recommendations'],
+            'model_version': samples[i % len(samples)][1]['model_version'],
+            'prediction_type': 'readmission',
+            'status': 'completed',
+            'created_at': now - timedelta(minutes=i),
+            'updated_at': now - timedelta(minutes=i)
+        }
+        for i in range(n_predictions)
+    ])
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI server that handles connections on a fixed-size thread pool"""
+    multithread = True
+
+    def __init__(self, *args, threads: int = 8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Skip per-request access logging, which would dominate the profile"""
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve_worker(fd: int, host: str, port: int, threads: int, options: Dict[str, Any], ready,
+                 mode: str = 'thread') -> None:
+    """Worker process: build the app, seed its database and serve on the shared socket"""
+    if mode == 'async':
+        # First thing in the forked child, before the app opens any connection
+        from gevent import monkey
+        monkey.patch_all()
+
+    from app import create_app
+    from app.config import Config
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    use_artifacts(options['model_path'])
+
+    class LoadTestConfig(Config):
+        MONGODB_SETTINGS = mongo_settings(options['mongo_uri'])
+        # The harness deliberately exceeds per-user budgets
+        RATELIMIT_ENABLED = False
+
+    app = create_app(LoadTestConfig)
+    if not options['mongo_uri']:
+        seed_database(options['users'], options['patients'], options['predictions'])
+
+    if mode == 'async':
+        from gevent.pool import Pool
+        from gevent.pywsgi import WSGIServer
+        server = WSGIServer(socket.socket(fileno=fd), app, spawn=Pool(threads), log=None)
+    else:
+        server = PooledWSGIServer(host, port, app, handler=QuietRequestHandler, threads=threads, fd=fd)
+    ready.set()
+    server.serve_forever()
+
+
+def resident_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process from /proc, where available"""
+    try:
+        with open(f"/proc/{pid}/status", encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class LoadClient:
+    """Issues one request per operation over a fresh HTTP connection"""
+
+    def __init__(self, host: str, port: int, options: Dict[str, Any], tokens: Dict[int, str], seed: int):
+        self.host = host
+        self.port = port
+        self.options = options
+        self.tokens = tokens
+        self.rng = random.Random(seed)
+        self.rows = synthetic_rows(64, seed=seed)
+
+    def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None,
+                token: Optional[str] = None) -> Tuple[int, bytes]:
+        headers = {'Connection': 'close'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    def _doctor(self) -> Tuple[int, str]:
+        """Pick a seeded doctor (every third user) and its token"""
+        doctors = [i for i in self.tokens if i % 3 == 0]
+        index = self.rng.choice(doctors)
+        return index, self.tokens[index]
+
+    def login(self) -> int:
+        index = self.rng.randrange(self.options['users'])
+        status, _ = self.request('POST', '/api/users/login', {
+            'username': f"loaduser{index}",
+            'password': SEED_PASSWORD
+        })
+        return status
+
+    def predict(self) -> int:
+        _, token = self._doctor()
+        body = dict(self.rng.choice(self.rows))
+        body['patient_id'] = str(seeded_id('patient', self.rng.randrange(self.options['patients'])))
+        status, _ = self.request('POST', '/api/predictions/', body, token)
+        return status
+
+    def history(self) -> int:
+        _, token = self._doctor()
+        user_id = seeded_id('user', self.rng.randrange(self.options['users']))
+        status, _ = self.request('GET', f"/api/predictions/history/{user_id}", token=token)
+        return status
+
+    def get_prediction(self) -> int:
+        _, token = self._doctor()
+        prediction_id = seeded_id('prediction', self.rng.randrange(self.options['predictions']))
+        status, _ = self.request('GET', f"/api/predictions/{prediction_id}", token=token)
+        return status
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'login=1,predict=2' into normalised operation weights"""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if not hasattr(LoadClient, name) or name.startswith('_') or name == 'request':
+            raise ValueError(f"Unknown operation in mix: {name}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def wait_for_server(host: str, port: int, timeout: float = 120) -> None:
+    """Block until the health endpoint answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+            conn.request('GET', '/health', headers={'Connection': 'close'})
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on {host}:{port} did not become ready")
+
+
+def summarize(samples: List[Tuple[str, int, float]], elapsed: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles per route and overall"""
+    by_route: Dict[str, List[Tuple[int, float]]] = {}
+    for route, status, latency in samples:
+        by_route.setdefault(route, []).append((status, latency))
+    by_route['all'] = [(status, latency) for _, status, latency in samples]
+
+    summary = {}
+    for route, entries in by_route.items():
+        latencies = np.array([latency for _, latency in entries]) * 1000
+        errors = sum(1 for status, _ in entries if status >= 400 or status == 0)
+        summary[route] = {
+            'requests': len(entries),
+            'errors': errors,
+            'throughput_rps': len(entries) / elapsed if elapsed else 0.0,
+            'mean_ms': float(latencies.mean()) if len(entries) else None,
+            'p50_ms': float(np.percentile(latencies, 50)) if len(entries) else None,
+            'p95_ms': float(np.percentile(latencies, 95)) if len(entries) else None,
+            'p99_ms': float(np.percentile(latencies, 99)) if len(entries) else None,
+            'max_ms': float(latencies.max()) if len(entries) else None
+        }
+    return summary
+
+
+def drive(host: str, port: int, options: Dict[str, Any], mix: Dict[str, float]) -> Dict[str, Any]:
+    """Run the configured mix at fixed client concurrency for the configured duration"""
+    # Log every seeded user in once so operations can authenticate
+    bootstrap = LoadClient(host, port, options, {}, seed=0)
+    tokens = {}
+    for index in range(options['users']):
+        status, body = bootstrap.request('POST', '/api/users/login', {
+            'username': f"loaduser{index}",
+            'password': SEED_PASSWORD
+        })
+        if status != 200:
+            raise RuntimeError(f"Login for loaduser{index} failed with {status}: {body[:200]!r}")
+        tokens[index] = json.loads(body)['token']
+
+    operations = list(mix)
+    weights = [mix[name] for name in operations]
+    samples: List[Tuple[str, int, float]] = []
+    samples_lock = threading.Lock()
+    stop_at = time.perf_counter() + options['warmup'] + options['duration']
+    record_from = time.perf_counter() + options['warmup']
+
+    def client_loop(seed: int):
+        client = LoadClient(host, port, options, tokens, seed)
+        local = []
+        while True:
+            start = time.perf_counter()
+            if start >= stop_at:
+                break
+            name = client.rng.choices(operations, weights)[0]
+            try:
+                status = getattr(client, name)()
+            except OSError:
+                status = 0
+            end = time.perf_counter()
+            if start >= record_from:
+                local.append((name, status, end - start))
+        with samples_lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client_loop, args=(seed,)) for seed in range(1, options['concurrency'] + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return summarize(samples, options['duration'])
+
+
+def run_configuration(workers: int, threads: int, options: Dict[str, Any], mix: Dict[str, float],
+                      mode: str = 'thread') -> Dict[str, Any]:
+    """Start a server with the given worker/thread counts, load it, and tear it down"""
+    host = '127.0.0.1'
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, 0))
+    listener.listen(1024)
+    port = listener.getsockname()[1]
+
+    context = multiprocessing.get_context('fork')
+    processes = []
+    try:
+        for _ in range(workers):
+            ready = context.Event()
+            process = context.Process(
+                target=serve_worker,
+                args=(listener.fileno(), host, port, threads, options, ready, mode),
+                daemon=True
+            )
+            process.start()
+            processes.append((process, ready))
+        for process, ready in processes:
+            if not ready.wait(timeout=300):
+                raise RuntimeError("Worker failed to start")
+        wait_for_server(host, port)
+
+        logger.info(f"mode={mode} workers={workers} threads={threads} concurrency={options['concurrency']}: "
+                    f"running for {options['duration']}s")
+        summary = drive(host, port, options, mix)
+        # Measured under load, while every request slot has been in use
+        rss = [resident_mb(process.pid) for process, _ in processes]
+    finally:
+        for process, _ in processes:
+            process.terminate()
+        for process, _ in processes:
+            process.join(timeout=10)
+        listener.close()
+
+    return {
+        'mode': mode,
+        'workers': workers,
+        'threads': threads,
+        'concurrency': options['concurrency'],
+        'rss_mb': sum(rss) if None not in rss else None,
+        'routes': summary
+    }
+
+
+def print_report(runs: List[Dict[str, Any]]) -> None:
+    """Per-route tables for each run, then the scaling curve"""
+    for run in runs:
+        logger.info(f"\nmode={run['mode']} workers={run['workers']} threads={run['threads']} "
+                    f"concurrency={run['concurrency']}")
+        logger.info(f"  {'route':<16}{'reqs':>8}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for route, stats in sorted(run['routes'].items()):
+            if not stats['requests']:
+                continue
+            logger.info(f"  {route:<16}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput_rps']:>10.1f}"
+                        f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+
+    logger.info("\nScaling curve (all routes):")
+    logger.info(f"  {'mode':>8}{'workers':>8}{'threads':>8}{'rss MB':>9}{'rps':>10}{'err':>6}"
+                f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for run in runs:
+        stats = run['routes']['all']
+        if not stats['requests']:
+            continue
+        rss = f"{run['rss_mb']:.0f}" if run['rss_mb'] is not None else '-'
+        logger.info(f"  {run['mode']:>8}{run['workers']:>8}{run['threads']:>8}{rss:>9}"
+                    f"{stats['throughput_rps']:>10.1f}{stats['errors']:>6}"
+                    f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+
+
+def int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(',') if v]
+
+
+def main():
+    """Main function to run the load test matrix"""
+    parser = argparse.ArgumentParser(description='Load test the API at controlled concurrency')
+    parser.add_argument('--workers', type=int_list, default=[1], help='Comma-separated worker process counts')
+    parser.add_argument('--threads', type=int_list, default=[8],
+                        help='Comma-separated threads (greenlets in async mode) per worker')
+    parser.add_argument('--modes', default='thread', help='Comma-separated server modes: thread, async')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--duration', type=float, default=10.0, help='Measured seconds per configuration')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Unmeasured seconds before each measurement')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Operation weights (default {DEFAULT_MIX})")
+    parser.add_argument('--users', type=int, default=30)
+    parser.add_argument('--patients', type=int, default=500)
+    parser.add_argument('--predictions', type=int, default=3000)
+    parser.add_argument('--mongo-uri', help='Use a local mongod (its database is dropped and reseeded)')
+    parser.add_argument('--model-path', help='Use real trained artifacts instead of synthetic ones')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Where to write JSON results')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    if not set(modes) <= {'thread', 'async'}:
+        parser.error('--modes must be thread and/or async')
+    options = {
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'users': args.users,
+        'patients': args.patients,
+        'predictions': args.predictions,
+        'mongo_uri': args.mongo_uri,
+        # Build synthetic artifacts once in the parent; forked workers inherit them
+        'model_path': use_artifacts(args.model_path)
+    }
+
+    if args.mongo_uri:
+        # One shared database: seed it once before any worker starts
+        mongoengine.connect(**mongo_settings(args.mongo_uri))
+        seed_database(args.users, args.patients, args.predictions)
+        mongoengine.disconnect()
+
+    runs = []
+    for mode in modes:
+        for workers in args.workers:
+            for threads in args.threads:
+                runs.append(run_configuration(workers, threads, options, mix, mode))
+
+    print_report(runs)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.utcnow().isoformat(),
+            'mix': mix,
+            'options': {k: v for k, v in options.items() if k != 'model_path'},
+            'runs': runs
+        }, f, indent=2)
+    logger.info(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import sys
+import json
+import argparse
+import fnmatch
+import importlib
+import pkgutil
+import platform
+import logging
+from datetime import datetime
+from typing import Dict, Any, List
+import numpy as np
+import sklearn
+from .common import registered_benchmarks, measure, use_artifacts
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), 'results', 'latest.json')
+
+
+def discover():
+    """Import every benchmarks.bench_* module so its cases register"""
+    package_dir = os.path.dirname(__file__)
+    for module in pkgutil.iter_modules([package_dir]):
+        if module.name.startswith('bench_'):
+            importlib.import_module(f"{__package__}.{module.name}")
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine so results are only compared like-for-like"""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'scikit_learn': sklearn.__version__
+    }
+
+
+def run_benchmarks(patterns: List[str], repeat: int, min_time: float) -> Dict[str, Any]:
+    """Run the registered benchmarks matching any of the patterns"""
+    results = {}
+    for name, factory in sorted(registered_benchmarks().items()):
+        if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+        # Factories may return (func, teardown) to clean up threads or contexts
+        func = factory()
+        teardown = None
+        if isinstance(func, tuple):
+            func, teardown = func
+        try:
+            stats = measure(func, repeat=repeat, min_time=min_time)
+        finally:
+            if teardown:
+                teardown()
+        results[name] = stats
+        logger.info(f"{name:<45} {stats['median_us']:>12.2f} us  (min {stats['min_us']:.2f}, n={stats['number']})")
+    return results
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compare median timings between two result files.
+    A ratio above 1 + threshold is a regression, below 1 - threshold an improvement.
+    """
+    rows = []
+    for name, stats in current['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if not base:
+            rows.append({'name': name, 'status': 'new', 'ratio': None})
+            continue
+        ratio = stats['median_us'] / base['median_us'] if base['median_us'] else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'unchanged'
+        rows.append({
+            'name': name,
+            'status': status,
+            'ratio': ratio,
+            'baseline_us': base['median_us'],
+            'current_us': stats['median_us']
+        })
+    return rows
+
+
+def main():
+    """Main function to run and optionally compare benchmarks"""
+    parser = argparse.ArgumentParser(description='Run API hot-path microbenchmarks')
+    parser.add_argument('-k', '--filter', action='append', default=[],
+                        help='Glob pattern of benchmark names to run (repeatable)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Where to write JSON results')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative median change treated as significant (default 0.10)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Minimum seconds per timing round')
+    parser.add_argument('--model-path',
+                        help='Use real trained artifacts instead of synthetic ones')
+    args = parser.parse_args()
+
+    model_path = use_artifacts(args.model_path)
+    discover()
+
+    results = {
+        'created_at': datetime.utcnow().isoformat(),
+        'model_path': args.model_path or 'synthetic',
+        'environment': environment(),
+        'benchmarks': run_benchmarks(args.filter, args.repeat, args.min_time)
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"\nResults written to {args.output} (artifacts: {model_path})")
+
+    if not args.compare:
+        return
+
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    if baseline.get('environment') != results['environment']:
+        logger.warning("Baseline was recorded on a different environment; ratios may not be meaningful")
+
+    rows = compare(baseline, results, args.threshold)
+    logger.info(f"\nComparison against {args.compare} (threshold {args.threshold:.0%}):")
+    for row in rows:
+        if row['ratio'] is None:
+            logger.info(f"  {row['name']:<45} new")
+        else:
+            logger.info(f"  {row['name']:<45} {row['baseline_us']:>10.2f} -> {row['current_us']:>10.2f} us  "
+                        f"x{row['ratio']:.2f}  {row['status']}")
+
+    regressions = [row['name'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        logger.error(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
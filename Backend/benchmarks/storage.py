@@ -0,0 +1,137 @@
+"""
+Storage cost of prediction documents, full vs compact encoding.
+
+Scores a sample of synthetic patients, builds `--predictions` documents
+each way through the Prediction model, and reports the average BSON
+document size and the data size per million predictions. With
+--mongo-uri both sets are inserted into scratch collections with the
+Prediction indexes, and collStats adds on-disk (compressed) data and
+index sizes, so index-plus-data per million can be compared; the scratch
+collections are dropped afterwards.
+
+    python -m benchmarks.storage --predictions 50000
+    python -m benchmarks.storage --mongo-uri mongodb://localhost:27017/storage_bench
+"""
+import os
+import json
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+import bson
+from bson import ObjectId
+from .common import use_artifacts, synthetic_rows
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+PER_MILLION = 1_000_000
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), 'results', 'storage.json')
+
+
+def build_documents(n_predictions: int, n_samples: int = 200) -> Dict[str, List[Dict[str, Any]]]:
+    """The same predictions as full and compact raw documents"""
+    from app.models.prediction import Prediction
+    from app.utils.model import get_model_manager
+
+    manager = get_model_manager()
+    rows = synthetic_rows(n_samples)
+    # Score a sample and cycle it: recommendations repeat across patients just the same
+    samples = [(row, manager.predict(row)[0]) for row in rows]
+    now = datetime(2024, 6, 1)
+
+    documents = {'full': [], 'compact': []}
+    for i in range(n_predictions):
+        features, result = samples[i % len(samples)]
+        fields = dict(
+            id=ObjectId(),
+            patient=ObjectId(),
+            user=ObjectId(),
+            readmission_probability=result['readmission_probability'],
+            risk_level=result['risk_level'],
+            confidence_score=float(result['confidence_score']),
+            model_version=result['model_version'],
+            status='completed',
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(minutes=i)
+        )
+        factors = {k: float(v) for k, v in result['contributing_factors'].items()}
+        documents['full'].append(Prediction(
+            input_features=features, contributing_factors=factors,
+            recommendations=result['recommendations'], **fields
+        ).to_mongo().to_dict())
+        documents['compact'].append(Prediction.create(
+            input_features=features, contributing_factors=factors,
+            recommendations=result['recommendations'], **fields
+        ).to_mongo().to_dict())
+    return documents
+
+
+def bson_sizes(documents: List[Dict[str, Any]]) -> Dict[str, float]:
+    total = sum(len(bson.encode(document)) for document in documents)
+    return {
+        'avg_document_bytes': round(total / len(documents), 1),
+        'data_mb_per_million': round(total / len(documents) * PER_MILLION / 2**20, 1)
+    }
+
+
+def collection_sizes(db, name: str, documents: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Insert into a scratch collection with the Prediction indexes and read collStats"""
+    from app.models.prediction import Prediction
+
+    collection = db[name]
+    collection.drop()
+    for spec in Prediction._meta['index_specs']:
+        collection.create_index(spec['fields'])
+    collection.insert_many(documents)
+    stats = db.command('collStats', name)
+    collection.drop()
+    scale = PER_MILLION / stats['count'] / 2**20
+    return {
+        'avg_document_bytes': stats['avgObjSize'],
+        'data_mb_per_million': round(stats['size'] * scale, 1),
+        'storage_mb_per_million': round(stats['storageSize'] * scale, 1),
+        'index_mb_per_million': round(stats['totalIndexSize'] * scale, 1),
+        'index_plus_data_mb_per_million': round((stats['storageSize'] + stats['totalIndexSize']) * scale, 1)
+    }
+
+
+def main():
+    """Main function to run the storage benchmark"""
+    parser = argparse.ArgumentParser(description='Compare full and compact prediction storage')
+    parser.add_argument('--predictions', type=int, default=20000)
+    parser.add_argument('--mongo-uri', help='Measure collStats on a local mongod (scratch collections are dropped)')
+    parser.add_argument('--model-path', help='Use real trained artifacts instead of synthetic ones')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Where to write JSON results')
+    args = parser.parse_args()
+
+    use_artifacts(args.model_path)
+    documents = build_documents(args.predictions)
+    results: Dict[str, Dict[str, Optional[float]]] = {name: bson_sizes(docs) for name, docs in documents.items()}
+
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        db = MongoClient(args.mongo_uri).get_default_database()
+        for name, docs in documents.items():
+            results[name].update(collection_sizes(db, f"storage_bench_{name}", docs))
+
+    logger.info(f"{args.predictions} predictions")
+    logger.info(f"  {'encoding':<10}{'avg bytes':>11}{'data MB/M':>12}{'disk MB/M':>12}{'index MB/M':>12}{'total MB/M':>12}")
+    for name, sizes in results.items():
+        cells = [sizes.get(key) for key in ('storage_mb_per_million', 'index_mb_per_million',
+                                            'index_plus_data_mb_per_million')]
+        logger.info(f"  {name:<10}{sizes['avg_document_bytes']:>11}{sizes['data_mb_per_million']:>12}"
+                    + ''.join(f"{'-' if cell is None else cell:>12}" for cell in cells))
+    if not args.mongo_uri:
+        logger.info("  (disk and index sizes need --mongo-uri)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'created_at': datetime.utcnow().isoformat(), 'predictions': args.predictions,
+                   'results': results}, f, indent=2)
+    logger.info(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
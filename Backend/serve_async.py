@@ -0,0 +1,50 @@
+"""
+Async serving mode: the same create_app() under gevent's WSGI server.
+
+Each request runs on a greenlet rather than an OS thread, and pymongo's
+socket I/O yields cooperatively once the standard library is patched, so
+requests blocked on Mongo cost a few KiB instead of a thread stack and
+concurrency is capped by ASYNC_MAX_CONNECTIONS, not thread count.
+Inference and password hashing still run on the bounded executors in
+app.utils.executor, which use native threads here so CPU work never
+stalls the event loop.
+
+    python serve_async.py
+"""
+# Patch before anything imports socket, ssl or threading
+from gevent import monkey
+monkey.patch_all()
+
+import os
+import sys
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+from run import logger, setup_signal_handlers, validate_environment
+from app import create_app
+
+def main():
+    """Serve the application on greenlets"""
+    try:
+        setup_signal_handlers()
+        validate_environment()
+
+        app = create_app()
+        host = os.getenv('FLASK_HOST', '127.0.0.1')
+        port = int(os.getenv('FLASK_PORT', 5000))
+        max_connections = app.config['ASYNC_MAX_CONNECTIONS']
+
+        logger.info(f"Starting async server on {host}:{port} "
+                    f"(max {max_connections} concurrent requests, "
+                    f"{app.config['INFERENCE_WORKERS']} inference workers)")
+        server = WSGIServer((host, port), app, spawn=Pool(max_connections), log=None)
+        server.serve_forever()
+
+    except OSError as e:
+        logger.error(f"OS Error: {str(e)}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Error starting server: {str(e)}", exc_info=True)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import pytest
 from app import create_app
 from app.models.user import User
+from app.controllers.user import UserController
 from mongoengine import connect, disconnect
 import os
 from dotenv import load_dotenv
@@ -12,7 +13,8 @@ load_dotenv()
 def app():
     """Create application for the tests."""
     # Set up test database
-    test_app = create_app('testing')
+    test_app = create_app()
+    test_app.config['TESTING'] = True
     
     # Setup test database
     test_db = os.getenv('MONGODB_DB', 'hospital_db') + '_test'
@@ -21,7 +23,8 @@ def app():
     # Create test client
     with test_app.test_client() as client:
         with test_app.app_context():
-            # Connect to test database
+            # Connect to test database instead of the app's default one
+            disconnect()
             connect(test_db,
                    host=os.getenv('MONGODB_HOST', 'mongodb://localhost:27017/'),
                    username=os.getenv('MONGODB_USERNAME'),
@@ -40,9 +43,11 @@ def auth_headers(app):
         username='testadmin',
         email='testadmin@test.com',
         role='admin'
-    ).save()
+    )
+    user.set_password('testadmin-password')
+    user.save()
     
     # Generate token
-    token = user.generate_token()
+    token = UserController.generate_token(user)
     
     return {'Authorization': f'Bearer {token}'} 
\ No newline at end of file
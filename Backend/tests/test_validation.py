@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+from app.utils.validation import FeatureValidator
+
+
+@pytest.fixture
+def validator():
+    """Validator over a small fixed vocabulary, no trained model needed"""
+    classes = {
+        'gender': ['Female', 'Male', 'Other'],
+        'primary_diagnosis': ['Diabetes', 'Heart Disease'],
+        'discharge_to': ['Home', 'Nursing Facility']
+    }
+    return FeatureValidator({feature: LabelEncoder().fit(values) for feature, values in classes.items()})
+
+
+VALID_ROW = {
+    'age': 65, 'gender': 'Male', 'primary_diagnosis': 'Diabetes', 'num_procedures': 2,
+    'days_in_hospital': 5, 'comorbidity_score': 1.5, 'discharge_to': 'Home'
+}
+
+
+@pytest.mark.parametrize('value, message', [
+    (float('inf'), 'must be a number'),
+    (float('-inf'), 'must be a number'),
+    (1e999, 'must be a number'),
+    ('inf', 'must be a number'),
+    ('-Infinity', 'must be a number'),
+    ('nan', 'must be a number'),
+    (True, 'must be a number'),
+    (np.bool_(False), 'must be a number'),
+    ('abc', 'must be a number'),
+    ('2.5', 'must be a whole number'),
+])
+@pytest.mark.parametrize('feature', ['age', 'num_procedures', 'days_in_hospital'])
+def test_integer_features_reject_non_numbers(validator, feature, value, message):
+    row = {**VALID_ROW, feature: value}
+    assert message in validator.validate_row(row)[feature]
+    _, errors = validator.validate_frame(pd.DataFrame([VALID_ROW, row]))
+    assert list(errors) == [1]
+    assert message in errors[1][feature]
+
+
+@pytest.mark.parametrize('value', [float('inf'), 1e999, 'inf', 'nan', True])
+def test_comorbidity_score_rejects_non_numbers(validator, value):
+    row = {**VALID_ROW, 'comorbidity_score': value}
+    assert validator.validate_row(row) == {'comorbidity_score': 'Comorbidity score must be a number'}
+    _, errors = validator.validate_frame(pd.DataFrame([VALID_ROW, row]))
+    assert errors == {1: {'comorbidity_score': 'Comorbidity score must be a number'}}
+
+
+def test_nan_value_is_missing(validator):
+    row = {**VALID_ROW, 'days_in_hospital': float('nan')}
+    assert validator.validate_row(row) == {'days_in_hospital': 'days_in_hospital is required'}
+    _, errors = validator.validate_frame(pd.DataFrame([VALID_ROW, row]))
+    assert errors == {1: {'days_in_hospital': 'days_in_hospital is required'}}
+
+
+def test_numeric_strings_are_accepted(validator):
+    row = {**VALID_ROW, 'age': '65', 'num_procedures': '2.0', 'days_in_hospital': ' 5 ', 'comorbidity_score': '1.5'}
+    assert validator.validate_row(row) == {}
+    frame, errors = validator.validate_frame(pd.DataFrame([row]))
+    assert errors == {}
+    assert frame.loc[0, 'age'] == 65
+
+
+def test_infinite_columns_are_rejected(validator):
+    # A float64 column takes the vectorized path without any object coercion
+    frame = pd.DataFrame([VALID_ROW] * 3)
+    frame['comorbidity_score'] = [1.0, np.inf, -np.inf]
+    _, errors = validator.validate_frame(frame)
+    assert sorted(errors) == [1, 2]